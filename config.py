@@ -49,6 +49,116 @@ ML_MODEL_CONFIG = {
 
 DEFAULT_MODEL = 'default'
 
+# Online updates applied by MLModel.update: samples are buffered and applied
+# batch_size at a time (extra boosting rounds for xgboost, replacement trees
+# for random forests, partial_fit otherwise); history_size recent samples
+# are kept for an explicit MLModel.refit()
+ONLINE_UPDATE_CONFIG = {
+    'batch_size': 32,
+    'boost_rounds': 1,
+    'forest_trees': 1,
+    'history_size': 10000,
+    # Share of matches RetrainingService keeps out of training to check a
+    # retrained model against before swapping it in
+    'holdout_fraction': 0.2
+}
+
+# Prediction memoization: continuous features are rounded to these steps
+# before the cache lookup (and the prediction is made on the rounded state)
+PREDICTION_CACHE_CONFIG = {
+    'max_size': 100000,
+    'quantization': {
+        'current_ball_speed': 5.0,
+        'current_ball_spin': 250.0,
+        'fatigue_1': 0.05,
+        'fatigue_2': 0.05
+    }
+}
+
+# Shadow evaluation: states priced by the live model are scored by the
+# shadow models batch_size at a time in a background thread, and reliability
+# is reported over calibration_bins equal-width probability bins
+SHADOW_CONFIG = {
+    'batch_size': 256,
+    'calibration_bins': 10
+}
+
+# Published odds (models/odds_publisher.py) are rounded to a bookmaker tick
+# ladder of (upper bound, tick) bands from min_odds up, and changes within
+# coalesce_window seconds of the last publication are merged into one update
+ODDS_PUBLISHER_CONFIG = {
+    'min_odds': 1.01,
+    'ladder': [(2.0, 0.01), (3.0, 0.02), (4.0, 0.05), (6.0, 0.1), (10.0, 0.2),
+               (20.0, 0.5), (30.0, 1.0), (50.0, 2.0), (100.0, 5.0), (1000.0, 10.0)],
+    'coalesce_window': 0.05
+}
+
+# Local odds feed (models/odds_feed.py): engine events, scores and published
+# odds are streamed to subscribers at address (a Unix socket path or
+# tcp://host:port) as 'ndjson' lines or 'binary' length-prefixed frames.
+# Each subscriber queues at most queue_size messages; a slow subscriber's
+# queued odds/score updates are replaced ('coalesce') or its oldest
+# messages dropped ('drop'). A subscriber that accepts nothing for
+# send_timeout seconds is disconnected
+ODDS_FEED_CONFIG = {
+    'enabled': False,
+    'address': 'tcp://127.0.0.1:8765',
+    'framing': 'ndjson',
+    'queue_size': 1000,
+    'policy': 'coalesce',
+    'send_timeout': 5.0
+}
+
+# Synthetic datasets larger than memory are written as shards of
+# chunk_size rows ('npz', or 'parquet' when pyarrow is installed) with a
+# manifest.json describing them
+DATA_GENERATION_CONFIG = {
+    'data_dir': 'data/synthetic',
+    'chunk_size': 100000,
+    'shard_format': 'npz'
+}
+
+# Encoded feature matrices and fitted preprocessors, keyed by dataset and
+# preprocessing settings, so repeat training runs skip preprocessing
+FEATURE_CACHE_CONFIG = {
+    'cache_dir': 'data/feature_cache',
+    'enabled': True
+}
+
+# Training from shards without loading them (train/out_of_core.py): the
+# neural network makes epochs passes over the shards with partial_fit
+OUT_OF_CORE_CONFIG = {
+    'epochs': 5
+}
+
+# Test-set evaluation (train/model_evaluation.py): probabilities are scored
+# chunk_size rows at a time into calibration_bins reliability bins, and
+# latency is timed on latency_rows single-row calls and up to latency_batches
+# batches of batch_size rows
+EVALUATION_CONFIG = {
+    'chunk_size': 10000,
+    'calibration_bins': 10,
+    'latency_rows': 500,
+    'batch_size': 1000,
+    'latency_batches': 20
+}
+
+# Successive-halving hyperparameter search (train/tuning.py): n_candidates
+# are scored with cv folds on min_resources rows, and the best 1/factor move
+# on to factor times more rows each round. Progress is saved in state_dir.
+TUNING_CONFIG = {
+    'n_candidates': 27,
+    'factor': 3,
+    'cv': 3,
+    'min_resources': 500,
+    'early_stopping_rounds': 10,
+    # Share of a candidate's training rows held out to pick its xgboost
+    # stopping round
+    'early_stopping_fraction': 0.2,
+    'state_dir': 'data/tuning',
+    'seed': 42
+}
+
 # Simulation Configuration
 SIMULATION_RUNS = 1000
 
@@ -1,11 +1,16 @@
 # main.py
 
+import os
 from simulation.player import create_player, ShotType, Weakness, Strength, TournamentResult, InjurySeverity
 from simulation.match_formats import create_match_format
 from simulation.match import Surface, Weather
 from simulation.engine import SimulationEngine
-from models.ml_model import MLModel
+from models.ml_model import load_model
 from models.odds_calculator import OddsCalculator
+from models.odds_publisher import OddsPublisher
+from models.odds_feed import OddsFeed
+from models.prediction_cache import CachedModel
+from models.shadow import ShadowEvaluator, print_shadow_report
 import config
 
 def main():
@@ -80,8 +85,17 @@ def main():
     event_country = "USA"  # or any other country where the event is taking place
     
     # Initialize ML model and odds calculator
-    ml_model = MLModel(config.ML_MODEL_CONFIG[config.DEFAULT_MODEL]['path'])
+    ml_model = CachedModel(load_model(config.ML_MODEL_CONFIG[config.DEFAULT_MODEL]['path']))
+    # The other trained models score the same states in shadow mode
+    shadows = {name: load_model(model_config['path']) for name, model_config in config.ML_MODEL_CONFIG.items()
+               if name != config.DEFAULT_MODEL and os.path.exists(model_config['path'])}
+    if shadows:
+        ml_model = ShadowEvaluator(ml_model, shadows, primary_name=config.DEFAULT_MODEL)
     odds_calculator = OddsCalculator()
+    # Only odds that move by a bookmaker tick are published
+    odds_publisher = OddsPublisher()
+    # Subscribers follow the match with python -m models.odds_feed
+    feed = OddsFeed().start() if config.ODDS_FEED_CONFIG['enabled'] else None
 
     # Create simulation engine
     engine = SimulationEngine(
@@ -93,7 +107,10 @@ def main():
         weather, 
         event_country,
         ml_model, 
-        odds_calculator
+        odds_calculator,
+        odds_publisher=odds_publisher,
+        feed=feed,
+        match_id='main'
     )
 
     # Run simulation
@@ -110,6 +127,14 @@ def main():
         for stat, value in stats.items():
             print(f"    {stat}: {value}")
     print(f"Final Odds: {results['final_odds']}")
+    print(f"Prediction cache: {ml_model.get_stats()}")
+    print(f"Odds publisher: {odds_publisher.get_stats()}")
+    if feed is not None:
+        feed.close()
+        print(f"Odds feed: {feed.get_stats()}")
+    if isinstance(ml_model, ShadowEvaluator):
+        ml_model.close()
+        print_shadow_report(ml_model.get_report())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,44 @@
 # models/__init__.py
 
+import importlib
+
 from config import VERSION as __version__
 
-from .ml_model import MLModel
-from .odds_calculator import OddsCalculator
+# MLModel pulls in pandas and scikit-learn, so submodules are only imported
+# the first time one of their names is accessed.
+_LAZY_IMPORTS = {
+    'MLModel': '.ml_model',
+    'load_model': '.ml_model',
+    'clear_model_cache': '.ml_model',
+    'get_student_path': '.ml_model',
+    'OddsCalculator': '.odds_calculator',
+    'OddsPublisher': '.odds_publisher',
+    'OddsFeed': '.odds_feed',
+    'CachedModel': '.prediction_cache',
+    'RetrainingService': '.retraining',
+    'ShadowEvaluator': '.shadow'
+}
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
 __all__ = [
     'MLModel',
-    'OddsCalculator'
-]
\ No newline at end of file
+    'load_model',
+    'clear_model_cache',
+    'get_student_path',
+    'OddsCalculator',
+    'OddsPublisher',
+    'OddsFeed',
+    'CachedModel',
+    'RetrainingService',
+    'ShadowEvaluator'
+]
@@ -0,0 +1,225 @@
+# models/feature_encoder.py
+
+import threading
+import numpy as np
+
+class FeatureEncoder:
+    """Encodes a state dict exactly like a fitted ColumnTransformer.
+
+    The scaler statistics and one-hot category positions (or ordinal
+    category codes) are read from the fitted preprocessor once, so encoding
+    a single state is a handful of
+    dict lookups and one vectorized scale instead of building a DataFrame
+    and running the full ColumnTransformer. Rows are written in dtype, so
+    a float32 encoder halves the memory of every encoded batch.
+    """
+
+    def __init__(self, preprocessor, dtype=np.float64):
+        if not hasattr(preprocessor, 'transformers_'):
+            raise ValueError("Preprocessor must be a fitted ColumnTransformer")
+
+        self.sparse_output = bool(getattr(preprocessor, 'sparse_output_', False))
+        self.dtype = np.dtype(dtype)
+        self.numeric_features = []
+        self.numeric_columns = []
+        means = []
+        scales = []
+        self.categorical_features = []
+        self.category_columns = []
+        self.handle_unknown = []
+        self.ordinal_features = []
+        self.ordinal_columns = []
+        self.ordinal_codes = []
+        self.unknown_values = []
+        self.boolean_features = []
+        self.boolean_columns = []
+
+        position = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            columns = list(columns)
+            if transformer == 'drop' or len(columns) == 0:
+                continue
+            kind = type(transformer).__name__
+            if kind == 'StandardScaler':
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                self.numeric_features.extend(columns)
+                self.numeric_columns.extend(range(position, position + len(columns)))
+                means.extend(mean)
+                scales.extend(scale)
+                position += len(columns)
+            elif kind == 'OneHotEncoder':
+                if transformer.drop_idx_ is not None or getattr(transformer, '_infrequent_enabled', False):
+                    raise ValueError("OneHotEncoder with drop or infrequent categories is not supported")
+                for feature, categories in zip(columns, transformer.categories_):
+                    self.categorical_features.append(feature)
+                    self.category_columns.append({category: position + i for i, category in enumerate(categories)})
+                    self.handle_unknown.append(transformer.handle_unknown)
+                    position += len(categories)
+            elif kind == 'OrdinalEncoder':
+                if getattr(transformer, '_infrequent_enabled', False):
+                    raise ValueError("OrdinalEncoder with infrequent categories is not supported")
+                # One column of integer codes per feature; unknown categories
+                # get unknown_value (None raises, as handle_unknown='error')
+                unknown_value = transformer.unknown_value if transformer.handle_unknown == 'use_encoded_value' else None
+                for feature, categories in zip(columns, transformer.categories_):
+                    self.ordinal_features.append(feature)
+                    self.ordinal_columns.append(position)
+                    self.ordinal_codes.append({str(category): transformer.encoded_missing_value
+                                               if isinstance(category, float) and np.isnan(category) else i
+                                               for i, category in enumerate(categories)})
+                    self.unknown_values.append(unknown_value)
+                    position += 1
+            elif transformer == 'passthrough' or (kind == 'FunctionTransformer' and transformer.func is None):
+                # Passthrough columns are the boolean flags
+                self.boolean_features.extend(columns)
+                self.boolean_columns.extend(range(position, position + len(columns)))
+                position += len(columns)
+            else:
+                raise ValueError(f"Unsupported transformer '{name}': {kind}")
+
+        self.n_columns = position
+        self.feature_names = (self.numeric_features + self.categorical_features + self.ordinal_features
+                              + self.boolean_features)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self._full_plan = self._plan(self.feature_names)
+        self._local = threading.local()
+
+    def _plan(self, features) -> tuple:
+        # Which features to write, and where, for a subset of the inputs
+        features = set(features)
+        numeric = [i for i, f in enumerate(self.numeric_features) if f in features]
+        categorical = [i for i, f in enumerate(self.categorical_features) if f in features]
+        ordinal = [i for i, f in enumerate(self.ordinal_features) if f in features]
+        boolean = [i for i, f in enumerate(self.boolean_features) if f in features]
+        return (
+            [self.numeric_features[i] for i in numeric],
+            np.asarray([self.numeric_columns[i] for i in numeric], dtype=np.intp),
+            self.means[numeric],
+            self.scales[numeric],
+            [(self.categorical_features[i], self.category_columns[i], self.handle_unknown[i]) for i in categorical],
+            [(self.ordinal_features[i], self.ordinal_columns[i], self.ordinal_codes[i], self.unknown_values[i])
+             for i in ordinal],
+            [(self.boolean_features[i], self.boolean_columns[i]) for i in boolean]
+        )
+
+    def _write(self, row: np.ndarray, features: dict, plan: tuple):
+        numeric_features, numeric_columns, means, scales, categorical, ordinal, boolean = plan
+        try:
+            if numeric_features:
+                numeric = np.fromiter((features[f] for f in numeric_features), dtype=np.float64,
+                                      count=len(numeric_features))
+                row[0, numeric_columns] = (numeric - means) / scales
+            for feature, columns, handle_unknown in categorical:
+                column = columns.get(str(features[feature]))
+                if column is not None:
+                    row[0, column] = 1.0
+                elif handle_unknown == 'error':
+                    raise ValueError(f"Unknown category {features[feature]!r} for feature {feature}")
+            for feature, column, codes, unknown_value in ordinal:
+                code = codes.get(str(features[feature]), unknown_value)
+                if code is None:
+                    raise ValueError(f"Unknown category {features[feature]!r} for feature {feature}")
+                row[0, column] = code
+            for feature, column in boolean:
+                row[0, column] = bool(features[feature])
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}") from None
+
+    def _row(self) -> np.ndarray:
+        # Each thread reuses its own preallocated row
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.n_columns), dtype=self.dtype)
+        return row
+
+    def encode_static(self, features: dict) -> 'StaticFeatureBlock':
+        return StaticFeatureBlock(self, features)
+
+    def encode(self, features: dict, static: 'StaticFeatureBlock' = None, out: np.ndarray = None) -> np.ndarray:
+        """Return a (1, n_columns) row for features.
+
+        With a static block from this encoder only the remaining (dynamic)
+        features are encoded on top of its precomputed columns. Without out,
+        the row is a per-thread buffer that is overwritten by the next call,
+        so callers that keep it must copy it.
+        """
+        row = self._row() if out is None else out
+        if static is not None and static.encoder is self:
+            np.copyto(row, static.row)
+            self._write(row, features, static.dynamic_plan)
+        else:
+            row.fill(0.0)
+            self._write(row, features, self._full_plan)
+        return row
+
+    def encode_batch(self, data, out: np.ndarray = None) -> np.ndarray:
+        """Return an (n, n_columns) matrix for many states.
+
+        data is either a list of state dicts or a mapping of feature name to
+        a column of values (a dict of lists/arrays or a DataFrame).
+        """
+        if isinstance(data, (list, tuple)):
+            try:
+                columns = {f: [row[f] for row in data] for f in self.feature_names}
+            except KeyError as e:
+                raise ValueError(f"Missing feature: {e.args[0]}") from None
+            n_rows = len(data)
+        else:
+            missing = [f for f in self.feature_names if f not in data]
+            if missing:
+                raise ValueError(f"Missing feature: {missing[0]}")
+            columns = data
+            n_rows = len(data[self.feature_names[0]]) if self.feature_names else 0
+
+        X = np.zeros((n_rows, self.n_columns), dtype=self.dtype) if out is None else out
+        if out is not None:
+            X.fill(0.0)
+        rows = np.arange(n_rows)
+        for feature, column, mean, scale in zip(self.numeric_features, self.numeric_columns, self.means, self.scales):
+            X[:, column] = (np.asarray(columns[feature], dtype=np.float64) - mean) / scale
+        for feature, category_columns, handle_unknown in zip(self.categorical_features, self.category_columns, self.handle_unknown):
+            # Look up each distinct value once
+            values, inverse = np.unique(np.asarray(columns[feature]).astype(str), return_inverse=True)
+            lookup = np.array([category_columns.get(v, -1) for v in values], dtype=np.intp)
+            targets = lookup[inverse.reshape(-1)]
+            known = targets >= 0
+            if handle_unknown == 'error' and not known.all():
+                raise ValueError(f"Unknown category {values[lookup < 0][0]!r} for feature {feature}")
+            X[rows[known], targets[known]] = 1.0
+        for feature, column, codes, unknown_value in zip(self.ordinal_features, self.ordinal_columns,
+                                                         self.ordinal_codes, self.unknown_values):
+            values, inverse = np.unique(np.asarray(columns[feature]).astype(str), return_inverse=True)
+            lookup = np.array([codes.get(v, np.nan if unknown_value is None else unknown_value) for v in values],
+                              dtype=np.float64)
+            if unknown_value is None and np.isnan(lookup).any():
+                raise ValueError(f"Unknown category {values[np.isnan(lookup)][0]!r} for feature {feature}")
+            X[:, column] = lookup[inverse.reshape(-1)]
+        for feature, column in zip(self.boolean_features, self.boolean_columns):
+            X[:, column] = np.asarray(columns[feature]).astype(bool)
+        return X
+
+    def to_model_input(self, X: np.ndarray):
+        # Match the container the classifier was trained on; xgboost treats
+        # implicit zeros in sparse input as missing values.
+        if self.sparse_output:
+            from scipy import sparse
+            return sparse.csr_matrix(X)
+        return X
+
+class StaticFeatureBlock:
+    """Encoded columns for the features that stay fixed during a match.
+
+    Built once per match; key identifies the static inputs so per-match
+    caches can be shared between engines pricing the same fixture.
+    """
+
+    def __init__(self, encoder: FeatureEncoder, features: dict):
+        self.encoder = encoder
+        self.feature_names = [f for f in encoder.feature_names if f in features]
+        self.key = hash(tuple((f, features[f]) for f in self.feature_names))
+        self.row = np.zeros((1, encoder.n_columns), dtype=encoder.dtype)
+        encoder._write(self.row, features, encoder._plan(self.feature_names))
+        static = set(self.feature_names)
+        self.dynamic_plan = encoder._plan([f for f in encoder.feature_names if f not in static])
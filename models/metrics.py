@@ -0,0 +1,90 @@
+# models/metrics.py
+
+from typing import Dict, List
+import numpy as np
+
+# Probability scores shared by offline evaluation (train/model_evaluation.py)
+# and shadow evaluation of live models (models/shadow.py).
+
+def log_loss(outcomes: np.ndarray, probabilities: np.ndarray, eps: float = 1e-15) -> float:
+    p = np.clip(probabilities, eps, 1 - eps)
+    return float(-np.mean(outcomes * np.log(p) + (1 - outcomes) * np.log(1 - p)))
+
+def calibration_table(outcomes: np.ndarray, probabilities: np.ndarray, n_bins: int = 10) -> List[Dict]:
+    """Mean predicted probability against observed frequency per bin."""
+    bins = np.minimum((probabilities * n_bins).astype(int), n_bins - 1)
+    table = []
+    for b in range(n_bins):
+        in_bin = bins == b
+        count = int(in_bin.sum())
+        if count:
+            table.append({
+                'bin': (b / n_bins, (b + 1) / n_bins),
+                'count': count,
+                'mean_predicted': float(probabilities[in_bin].mean()),
+                'observed': float(outcomes[in_bin].mean())
+            })
+    return table
+
+def expected_calibration_error(table: List[Dict]) -> float:
+    total = sum(row['count'] for row in table)
+    if not total:
+        return 0.0
+    return sum(row['count'] * abs(row['mean_predicted'] - row['observed']) for row in table) / total
+
+class ProbabilityMetrics:
+    """Running classification, log-loss, Brier and reliability statistics
+    over batches of probabilities; only the sums are kept, so the number of
+    rows scored is unbounded."""
+
+    def __init__(self, n_bins: int = 10, eps: float = 1e-15):
+        self.n_bins = n_bins
+        self.eps = eps
+        self.n_rows = 0
+        self.log_loss_sum = 0.0
+        self.brier_sum = 0.0
+        self.confusion = np.zeros(4, dtype=np.int64)  # tn, fp, fn, tp
+        self.bin_counts = np.zeros(self.n_bins, dtype=np.int64)
+        self.bin_predicted = np.zeros(self.n_bins)
+        self.bin_observed = np.zeros(self.n_bins)
+
+    def add(self, outcomes, probabilities):
+        outcomes = np.asarray(outcomes, dtype=np.float64)
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        # Same clipping as log_loss
+        p = np.clip(probabilities, self.eps, 1 - self.eps)
+        self.log_loss_sum -= float(np.sum(outcomes * np.log(p) + (1 - outcomes) * np.log(1 - p)))
+        self.brier_sum += float(np.sum((probabilities - outcomes) ** 2))
+        predicted = probabilities >= 0.5
+        self.confusion += np.bincount(2 * outcomes.astype(np.int64) + predicted, minlength=4)
+        # Same bins as calibration_table
+        bins = np.minimum((probabilities * self.n_bins).astype(int), self.n_bins - 1)
+        self.bin_counts += np.bincount(bins, minlength=self.n_bins)
+        self.bin_predicted += np.bincount(bins, weights=probabilities, minlength=self.n_bins)
+        self.bin_observed += np.bincount(bins, weights=outcomes, minlength=self.n_bins)
+        self.n_rows += len(outcomes)
+
+    def calibration(self):
+        return [{
+            'bin': (b / self.n_bins, (b + 1) / self.n_bins),
+            'count': int(self.bin_counts[b]),
+            'mean_predicted': float(self.bin_predicted[b] / self.bin_counts[b]),
+            'observed': float(self.bin_observed[b] / self.bin_counts[b])
+        } for b in range(self.n_bins) if self.bin_counts[b]]
+
+    def results(self) -> Dict:
+        tn, fp, fn, tp = (int(count) for count in self.confusion)
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        table = self.calibration()
+        return {
+            'n_rows': self.n_rows,
+            'accuracy': (tp + tn) / self.n_rows if self.n_rows else 0.0,
+            'precision': precision,
+            'recall': recall,
+            'f1_score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            'log_loss': self.log_loss_sum / self.n_rows if self.n_rows else 0.0,
+            'brier_score': self.brier_sum / self.n_rows if self.n_rows else 0.0,
+            'expected_calibration_error': expected_calibration_error(table),
+            'calibration': table
+        }
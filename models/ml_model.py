@@ -1,31 +1,98 @@
 # models/ml_model.py
 
+import os
+import copy
+import threading
+from collections import deque
 import numpy as np
-import pandas as pd
 from sklearn.base import BaseEstimator, ClassifierMixin
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
 from joblib import load
+from config import ONLINE_UPDATE_CONFIG
+from .schema import CATEGORICAL_FEATURES, BOOLEAN_FEATURES
+
+# Process-wide cache of loaded models:
+# (absolute path, mmap_mode, dtype) -> (mtime, MLModel)
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+def get_student_path(model_path: str) -> str:
+    # Distilled students are saved next to their teacher
+    root, ext = os.path.splitext(model_path)
+    return f"{root}_student{ext}"
+
+def load_model(model_path='models/tennis_model_v1.joblib', mmap_mode='r', use_student=False,
+               dtype=None) -> 'MLModel':
+    """Return the shared MLModel for model_path, loading it on first use.
+
+    Every caller in the process asking for the same mmap_mode and dtype gets
+    the same instance until the file's mtime changes, at which point it is
+    reloaded. Models are loaded with
+    joblib's mmap_mode so numpy arrays stored in the file are mapped from the
+    page cache and shared between worker processes instead of copied.
+    With use_student, the distilled student saved next to model_path is
+    loaded instead.
+    """
+    if use_student:
+        model_path = get_student_path(model_path)
+    abs_path = os.path.abspath(model_path)
+    mtime = os.path.getmtime(abs_path)
+    key = (abs_path, mmap_mode, None if dtype is None else np.dtype(dtype))
+    with _MODEL_CACHE_LOCK:
+        cached = _MODEL_CACHE.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        model = MLModel(abs_path, mmap_mode=mmap_mode, dtype=dtype)
+        _MODEL_CACHE[key] = (mtime, model)
+        return model
+
+def clear_model_cache():
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE.clear()
 
 class MLModel(BaseEstimator, ClassifierMixin):
-    def __init__(self, model_path='models/tennis_model_v1.joblib'):
-        self.model_data = load(model_path)
+    def __init__(self, model_path='models/tennis_model_v1.joblib', mmap_mode='r', compile_trees=True,
+                 use_student=False, dtype=None):
+        self.model_path = model_path
+        self.mmap_mode = mmap_mode
+        self.compile_trees = compile_trees
+        self.use_student = use_student
+        self.dtype = dtype
+        # Arrays saved uncompressed are memory-mapped read-only. Note that
+        # scikit-learn trees copy their nodes into private buffers when
+        # unpickled, so forests are best loaded before forking workers.
+        self.model_data = load(get_student_path(model_path) if use_student else model_path, mmap_mode=mmap_mode)
         self.feature_names = self.model_data.get('feature_names', [])
-        self.categorical_features = [
-            'surface', 'weather', 'event_country', 
-            'player1_weakness', 'player2_weakness', 
-            'player1_strength', 'player2_strength',
-            'player1_current_injuries', 'player2_current_injuries',
-            'player1_previous_injuries', 'player2_previous_injuries',
-            'player1_country', 'player2_country',
-            'current_shot_type',
-            'player1_previous_tournament_results', 'player2_previous_tournament_results'
-        ]
-        self.boolean_features = ['is_indoor', 'is_tiebreak', 'is_match_tiebreak']
+        # Models trained with float32 features are also served in float32
+        # unless dtype overrides it
+        self.float_dtype = np.dtype(dtype or self.model_data.get('dtype', 'float64'))
+        # Kinds come from the shared schema, restricted to the model's inputs
+        self.categorical_features = [f for f in CATEGORICAL_FEATURES if f in self.feature_names or not self.feature_names]
+        self.boolean_features = [f for f in BOOLEAN_FEATURES if f in self.feature_names or not self.feature_names]
         self.numeric_features = [f for f in self.feature_names if f not in self.categorical_features and f not in self.boolean_features]
         
+        # Use the trained pipeline when one was saved; the default pipeline
+        # is only built when there is nothing to load.
+        if 'pipeline' in self.model_data and 'model_params' not in self.model_data:
+            self.pipeline = self.model_data['pipeline']
+        else:
+            self.pipeline = self._create_default_pipeline()
+            if 'model_params' in self.model_data:
+                self.pipeline.set_params(**self.model_data['model_params'])
+            else:
+                print("Warning: No pre-trained model parameters found. Using default RandomForestClassifier.")
+        self._compile()
+
+        self.online_config = dict(ONLINE_UPDATE_CONFIG)
+        self._update_buffer = []
+        self._update_history = deque(maxlen=self.online_config['history_size'])
+        self._owns_classifier = False
+
+    def _create_default_pipeline(self):
+        from sklearn.preprocessing import StandardScaler, OneHotEncoder
+        from sklearn.compose import ColumnTransformer
+        from sklearn.pipeline import Pipeline
+        from sklearn.ensemble import RandomForestClassifier
+
         # Create the preprocessor
         preprocessor = ColumnTransformer(
             transformers=[
@@ -35,27 +102,46 @@ class MLModel(BaseEstimator, ClassifierMixin):
             ])
         
         # Create the full pipeline
-        self.pipeline = Pipeline([
+        return Pipeline([
             ('preprocessor', preprocessor),
             ('classifier', RandomForestClassifier(n_estimators=100, random_state=42))  # Default parameters
         ])
-        
-        # Load the trained model parameters if available
-        if 'model_params' in self.model_data:
-            self.pipeline.set_params(**self.model_data['model_params'])
-        elif 'pipeline' in self.model_data:
-            self.pipeline = self.model_data['pipeline']
-        else:
-            print("Warning: No pre-trained model parameters found. Using default RandomForestClassifier.")
 
-    def predict(self, features: dict) -> float:
-        # Ensure all required features are present
-        for feature in self.feature_names:
-            if feature not in features:
-                raise ValueError(f"Missing feature: {feature}")
-        
+    def _compile(self):
+        # Fall back to the DataFrame path for preprocessors the compiled
+        # encoder can't reproduce exactly, or pipelines that aren't fitted,
+        # and to the classifier itself for models without a flat-array form.
+        from .feature_encoder import FeatureEncoder
+        self.classifier = self.pipeline.steps[-1][1]
+        try:
+            self.encoder = FeatureEncoder(self.pipeline.steps[0][1], dtype=self.float_dtype) if len(self.pipeline.steps) == 2 else None
+        except ValueError:
+            self.encoder = None
+        self._compile_trees()
+
+    def _compile_trees(self):
+        from .tree_ensemble import export_ensemble
+        self.tree_ensemble = None
+        if self.compile_trees and self.encoder is not None and not self.encoder.sparse_output:
+            try:
+                self.tree_ensemble = export_ensemble(self.classifier)
+                if self.float_dtype == np.float32:
+                    self.tree_ensemble = self.tree_ensemble.to_compact()
+            except (ValueError, AttributeError):
+                self.tree_ensemble = None
+
+    def _predict_encoded(self, X) -> np.ndarray:
+        if self.tree_ensemble is not None and isinstance(X, np.ndarray):
+            return self.tree_ensemble.predict_proba(X)[:, 1]
+        if self.encoder is not None:
+            X = self.encoder.to_model_input(X)
+        return self.classifier.predict_proba(X)[:, 1]
+
+    def _to_frame(self, rows: list):
+        import pandas as pd
+
         # Convert to DataFrame
-        X = pd.DataFrame([features])
+        X = pd.DataFrame(rows)
         
         # Convert categorical features to strings
         for cat_feature in self.categorical_features:
@@ -64,30 +150,175 @@ class MLModel(BaseEstimator, ClassifierMixin):
         # Ensure boolean features are treated as such
         for bool_feature in self.boolean_features:
             X[bool_feature] = X[bool_feature].astype(bool)
+        return X
+
+    def encode_static(self, static_features: dict, block=None):
+        """Encode the per-match static features once.
+
+        Returns block unchanged while it still belongs to the current
+        encoder, so callers can refresh it cheaply after the model changes.
+        Returns None when predictions go through the DataFrame path.
+        """
+        if self.encoder is None:
+            return None
+        if block is not None and block.encoder is self.encoder:
+            return block
+        return self.encoder.encode_static(static_features)
+
+    def predict(self, features: dict, static=None) -> float:
+        if self.encoder is not None:
+            X = self.encoder.encode(features, static)
+            return self._predict_encoded(X)[0]  # Probability of player 1 winning
+
+        # Ensure all required features are present
+        for feature in self.feature_names:
+            if feature not in features:
+                raise ValueError(f"Missing feature: {feature}")
         
-        # Debug information
-        # print("Feature types:")
-        # print(X.dtypes)
-        # print("\nCategorical feature values:")
-        for cat_feature in self.categorical_features:
-            print(f"{cat_feature}: {X[cat_feature].values}")
-        
+        X = self._to_frame([features])
         return self.pipeline.predict_proba(X)[0][1]  # Probability of player 1 winning
 
-    def update(self, features: dict, outcome: int):
-        X = pd.DataFrame([features])
-        y = np.array([outcome])
-        
-        # Convert categorical features to strings
-        for cat_feature in self.categorical_features:
-            X[cat_feature] = X[cat_feature].astype(str)
-        
-        # Ensure boolean features are treated as such
-        for bool_feature in self.boolean_features:
-            X[bool_feature] = X[bool_feature].astype(bool)
-        
-        self.pipeline.fit(X, y)
-        print(">>>>>>>>> Model updated.")
+    def predict_batch(self, data, chunk_size: int = None) -> np.ndarray:
+        """Probabilities of player 1 winning for many states at once.
+
+        data may be a list of state dicts, a mapping of feature columns (dict
+        of arrays or a DataFrame), or a matrix that is already encoded by the
+        model's preprocessor. Rows are scored chunk_size at a time to bound
+        memory; each chunk is a single predict_proba call.
+        """
+        n_rows = data.shape[0] if hasattr(data, 'shape') else self._batch_length(data)
+        chunk_size = chunk_size or max(n_rows, 1)
+        probabilities = np.empty(n_rows)
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            probabilities[start:stop] = self._predict_chunk(self._batch_slice(data, start, stop))
+        return probabilities
+
+    def _batch_length(self, data) -> int:
+        if isinstance(data, (list, tuple)):
+            return len(data)
+        return len(next(iter(data.values()))) if len(data) else 0
+
+    def _batch_slice(self, data, start: int, stop: int):
+        if hasattr(data, 'iloc'):
+            return data.iloc[start:stop]
+        if hasattr(data, 'shape') or isinstance(data, (list, tuple)):
+            return data[start:stop]
+        return {k: v[start:stop] for k, v in data.items()}
+
+    def _predict_chunk(self, data) -> np.ndarray:
+        if hasattr(data, 'shape') and not hasattr(data, 'iloc'):
+            # Already encoded
+            return self._predict_encoded(data)
+        if self.encoder is not None:
+            return self._predict_encoded(self.encoder.encode_batch(data))
+        import pandas as pd
+        rows = data if isinstance(data, (list, tuple)) else pd.DataFrame(data).to_dict('records')
+        return self.pipeline.predict_proba(self._to_frame(rows))[:, 1]
+
+    def update(self, features: dict, outcome: int) -> bool:
+        """Record a labelled state for online learning.
+
+        Samples are buffered and applied incrementally once batch_size of
+        them are collected; the preprocessing stays fixed and the trained
+        model is extended rather than refitted. Returns True when the model
+        changed.
+        """
+        self._update_buffer.append((features, outcome))
+        self._update_history.append((features, outcome))
+        if len(self._update_buffer) < self.online_config['batch_size']:
+            return False
+        return self.flush_updates()
+
+    def flush_updates(self) -> bool:
+        if not self._update_buffer:
+            return False
+        rows, outcomes = zip(*self._update_buffer)
+        applied = self._partial_update(self._encode_rows(list(rows)), np.asarray(outcomes, dtype=int))
+        if applied is None:
+            # Not enough information yet (e.g. a single class for a forest)
+            return False
+        self._update_buffer.clear()
+        if applied:
+            print(">>>>>>>>> Model updated.")
+        return applied
+
+    def refit(self):
+        """Refit the whole pipeline, preprocessing included, on the recent
+        samples passed to update()."""
+        if not self._update_history:
+            raise ValueError("No samples to refit on")
+        rows, outcomes = zip(*self._update_history)
+        self.pipeline.fit(self._to_frame(list(rows)), np.asarray(outcomes, dtype=int))
+        self._update_buffer.clear()
+        self._compile()
+        print(">>>>>>>>> Model refitted.")
+
+    def _encode_rows(self, rows: list):
+        if self.encoder is not None:
+            return self.encoder.to_model_input(self.encoder.encode_batch(rows))
+        return self.pipeline.steps[0][1].transform(self._to_frame(rows))
+
+    def _writable_classifier(self):
+        # Loaded arrays may be read-only memory maps shared with other
+        # processes, so the classifier is copied before its first update.
+        if not self._owns_classifier:
+            name = self.pipeline.steps[-1][0]
+            self.classifier = copy.deepcopy(self.classifier)
+            self.pipeline.steps[-1] = (name, self.classifier)
+            self._owns_classifier = True
+        return self.classifier
+
+    def _partial_update(self, X, y):
+        kind = type(self.classifier).__name__
+        if kind == 'XGBClassifier':
+            import xgboost as xgb
+            classifier = self._writable_classifier()
+            n_trees = classifier.get_booster().num_boosted_rounds()
+            params = {k: v for k, v in classifier.get_xgb_params().items() if v is not None}
+            # Ordinal models keep their categorical feature types, so the new
+            # rounds split on category sets like the trained ones
+            dtrain = xgb.DMatrix(X, label=y, feature_types=classifier.get_booster().feature_types,
+                                 enable_categorical=bool(classifier.enable_categorical))
+            booster = xgb.train(params, dtrain, num_boost_round=self.online_config['boost_rounds'],
+                                xgb_model=classifier.get_booster())
+            classifier._Booster = booster
+            classifier.n_estimators = booster.num_boosted_rounds()
+            if self.tree_ensemble is not None:
+                # Only the new rounds need exporting
+                from .tree_ensemble import FlatTreeEnsemble
+                self.tree_ensemble = self.tree_ensemble.concatenate(FlatTreeEnsemble.from_xgboost(booster[n_trees:]))
+            return True
+        elif kind == 'RandomForestClassifier':
+            if len(np.unique(y)) < 2:
+                return None
+            # Grow trees on the new samples and retire the oldest ones, so the
+            # forest keeps its size and most of what it learned before.
+            classifier = self._writable_classifier()
+            n_trees = len(classifier.estimators_)
+            classifier.set_params(warm_start=True, n_estimators=n_trees + self.online_config['forest_trees'])
+            classifier.fit(X, y)
+            classifier.estimators_ = classifier.estimators_[-n_trees:]
+            classifier.set_params(warm_start=False, n_estimators=n_trees)
+            self._compile_trees()
+            return True
+        elif hasattr(self.classifier, 'partial_fit'):
+            classifier = self._writable_classifier()
+            early_stopping = getattr(classifier, 'early_stopping', False)
+            if early_stopping:
+                # partial_fit has no validation split to stop early on
+                classifier.early_stopping = False
+                if getattr(classifier, 'best_loss_', 0) is None:
+                    classifier.best_loss_ = np.inf
+            try:
+                classifier.partial_fit(X, y)
+            finally:
+                if early_stopping:
+                    classifier.early_stopping = True
+            self._compile_trees()
+            return True
+        # Models without an incremental path only keep samples for refit()
+        return False
 
     def prepare_features(self, match_state: dict, player_stats: list) -> dict:
         features = {}
@@ -3,6 +3,9 @@
 from typing import List, Dict
 from simulation.events import TennisEvent, ShotOutcome
 import math
+import numpy as np
+
+POINT_VALUES = {'0': 0, '15': 1, '30': 2, '40': 3, 'Ad': 4}
 
 class OddsCalculator:
     def calculate(self, prediction: float, match_state: Dict, recent_events: List[TennisEvent]) -> Dict[str, List[float]]:
@@ -19,6 +22,69 @@ class OddsCalculator:
             'game_winner': self.calculate_game_odds(adjusted_odds, match_state)
         }
     
+    def calculate_batch(self, predictions, match_states, momentum_factors=None) -> Dict[str, np.ndarray]:
+        """calculate for many states in one vectorized pass.
+
+        match_states holds one array per state column (a DataFrame or a dict
+        of arrays); missing columns take the same defaults as calculate.
+        momentum_factors are the calculate_momentum_factor of each state's
+        recent events, 1 when omitted. Every market is an (n, 2) array of
+        player 1 and player 2 odds, equal to calculate's row by row.
+        """
+        predictions = np.asarray(predictions, dtype=np.float64)
+        n = len(predictions)
+
+        def column(name, default):
+            return np.broadcast_to(np.asarray(match_states.get(name, default)), (n,))
+
+        factors = np.ones(n) if momentum_factors is None else np.asarray(momentum_factors, dtype=np.float64)
+        match_odds = self.convert_probabilities_to_odds(predictions)
+        match_odds[:, 0] *= factors
+        match_odds[:, 1] /= factors
+        # Every market starts from player 1's adjusted match odds
+        win_prob = self.odds_to_probabilities(match_odds[:, 0])
+
+        # Set winner, as calculate_set_odds
+        sets_to_win = 3
+        set_difference = column('set_score_1', 0).astype(np.float64) - column('set_score_2', 0)
+        game_difference = column('game_score_1', 0).astype(np.float64) - column('game_score_2', 0)
+        set_win_prob = np.where(set_difference > 0, win_prob + (1 - win_prob) * (set_difference / sets_to_win),
+                                np.where(set_difference < 0, win_prob * (1 + set_difference / sets_to_win), win_prob))
+        set_win_prob = np.clip(set_win_prob + (1 - set_win_prob) * (game_difference / 12), 0, 1)
+
+        # Game winner, as calculate_game_odds
+        point_difference = (self.point_values(column('point_score_1', '0'))
+                            - self.point_values(column('point_score_2', '0')))
+        game_odds = self.convert_probabilities_to_odds(np.clip(1 / (1 + np.exp(-point_difference)), 0, 1))
+        game_odds = np.where((column('server', 0) == 0)[:, None], game_odds, game_odds[:, ::-1])
+
+        return {
+            'match_winner': match_odds,
+            'set_winner': self.convert_probabilities_to_odds(set_win_prob),
+            'game_winner': game_odds
+        }
+
+    def point_values(self, point_scores) -> np.ndarray:
+        # POINT_VALUES of each score, 0 for anything else
+        point_scores = np.asarray(point_scores)
+        if point_scores.dtype.kind != 'U':
+            # Categoricals and mixed columns compare element by element
+            point_scores = point_scores.astype(object)
+        values = np.zeros(len(point_scores))
+        for score, value in POINT_VALUES.items():
+            values[point_scores == score] = value
+        return values
+
+    def convert_probabilities_to_odds(self, probabilities: np.ndarray) -> np.ndarray:
+        # convert_probability_to_odds for an array, as (n, 2) odds
+        odds = np.full((len(probabilities), 2), 100.0)
+        np.divide(1, probabilities, out=odds[:, 0], where=probabilities > 0)
+        np.divide(1, 1 - probabilities, out=odds[:, 1], where=probabilities < 1)
+        return odds
+
+    def odds_to_probabilities(self, odds: np.ndarray) -> np.ndarray:
+        return np.divide(1, odds, out=np.zeros(len(odds)), where=odds > 0)
+
     def convert_probability_to_odds(self, probability: float) -> List[float]:
         odds_player1 = 1 / probability if probability > 0 else 100
         odds_player2 = 1 / (1 - probability) if probability < 1 else 100
@@ -73,8 +139,7 @@ class OddsCalculator:
             game_win_prob = 1 - game_win_prob
         
         # Adjust for current point score
-        point_values = {'0': 0, '15': 1, '30': 2, '40': 3, 'Ad': 4}
-        point_difference = point_values.get(point_score_1, 0) - point_values.get(point_score_2, 0)
+        point_difference = POINT_VALUES.get(point_score_1, 0) - POINT_VALUES.get(point_score_2, 0)
         
         # Use logistic function to adjust game win probability based on point difference
         game_win_prob = 1 / (1 + math.exp(-point_difference))
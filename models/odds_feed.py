@@ -0,0 +1,265 @@
+# models/odds_feed.py
+
+import os
+import json
+import time
+import socket
+import struct
+import threading
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple, Union
+from config import ODDS_FEED_CONFIG
+
+# Event, score and odds updates from simulation engines, streamed to local
+# subscribers over a Unix socket or TCP on localhost. Messages are JSON
+# objects framed either one per line ('ndjson') or behind a 4-byte
+# big-endian length ('binary').
+
+HEADER = struct.Struct('!I')
+
+def parse_address(address: Union[str, Tuple[str, int]]) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """Socket family and address for a Unix socket path, 'tcp://host:port'
+    or a (host, port) tuple."""
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    if address.startswith('tcp://'):
+        host, port = address[len('tcp://'):].rsplit(':', 1)
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+def encode_frame(message: Dict, framing: str) -> bytes:
+    payload = json.dumps(message, separators=(',', ':')).encode()
+    if framing == 'ndjson':
+        return payload + b'\n'
+    if framing == 'binary':
+        return HEADER.pack(len(payload)) + payload
+    raise ValueError(f"Unsupported framing: {framing}")
+
+class Subscriber:
+    """One connected client: a bounded queue of frames drained by a writer
+    thread, so a slow client only ever holds up its own queue. A client
+    that accepts nothing for send_timeout seconds is disconnected; one that
+    keeps reading is not, however long its queued frames take to send."""
+
+    def __init__(self, connection: socket.socket, queue_size: int, policy: str,
+                 send_timeout: Optional[float] = None):
+        self.connection = connection
+        connection.settimeout(send_timeout)
+        self.queue_size = queue_size
+        self.policy = policy
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._run, name='odds-feed-writer', daemon=True)
+        self._writer.start()
+
+    def put(self, key, frame: bytes):
+        with self._condition:
+            if len(self._queue) >= self.queue_size:
+                self._make_room(key)
+            self._queue.append((key, frame))
+            self._condition.notify()
+
+    def _make_room(self, key):
+        # 'coalesce' replaces the queued update of the same match and type
+        # (odds, score) by the new one; otherwise the oldest frame goes
+        if self.policy == 'coalesce' and key is not None:
+            for i, (queued_key, _) in enumerate(self._queue):
+                if queued_key == key:
+                    del self._queue[i]
+                    self.coalesced += 1
+                    return
+        self._queue.popleft()
+        self.dropped += 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self.closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                frames = [frame for _, frame in self._queue]
+                self._queue.clear()
+            try:
+                self._send(b''.join(frames))
+            except OSError:
+                self.close()
+                return
+            self.sent += len(frames)
+
+    def _send(self, data: bytes):
+        # send() rather than sendall(): the socket timeout then bounds each
+        # write rather than the whole batch
+        view = memoryview(data)
+        while view:
+            view = view[self.connection.send(view):]
+
+    def close(self, wait: bool = False):
+        # With wait, frames already queued are sent first
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+        if wait and threading.current_thread() is not self._writer:
+            self._writer.join()
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+class OddsFeed:
+    """Local pub/sub server for engine updates.
+
+    publish() frames the message once and appends it to every subscriber's
+    queue without waiting on any socket, so the simulation loop is never
+    blocked by a client. Each queue holds at most queue_size frames; when a
+    slow client's queue is full, policy 'coalesce' replaces its queued
+    update of the same match and type (odds and score only), and 'drop'
+    discards its oldest frame. Messages carry a sequence number so clients
+    can detect gaps.
+    """
+
+    COALESCED_TYPES = ('odds', 'score')
+
+    def __init__(self, address: Union[str, Tuple[str, int], None] = None, framing: Optional[str] = None,
+                 queue_size: Optional[int] = None, policy: Optional[str] = None,
+                 send_timeout: Optional[float] = None):
+        self.family, self.address = parse_address(address or ODDS_FEED_CONFIG['address'])
+        self.framing = framing or ODDS_FEED_CONFIG['framing']
+        self.queue_size = queue_size or ODDS_FEED_CONFIG['queue_size']
+        self.policy = policy or ODDS_FEED_CONFIG['policy']
+        self.send_timeout = send_timeout or ODDS_FEED_CONFIG['send_timeout']
+        if self.policy not in ('coalesce', 'drop'):
+            raise ValueError(f"Unsupported policy: {self.policy}")
+        if self.framing not in ('ndjson', 'binary'):
+            raise ValueError(f"Unsupported framing: {self.framing}")
+        self.published = 0
+        self.subscribers = []
+        # Counts of disconnected subscribers
+        self._retired = {'sent': 0, 'dropped': 0, 'coalesced': 0}
+        self._lock = threading.Lock()
+        self._server = None
+        self._acceptor = None
+
+    def start(self) -> 'OddsFeed':
+        self._server = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_UNIX:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+        else:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(self.address)
+        # TCP port 0 binds a free port
+        self.address = self._server.getsockname()
+        self._server.listen()
+        self._acceptor = threading.Thread(target=self._accept, name='odds-feed-acceptor', daemon=True)
+        self._acceptor.start()
+        return self
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.subscribers.append(Subscriber(connection, self.queue_size, self.policy, self.send_timeout))
+
+    def publish(self, message: Dict):
+        with self._lock:
+            message = dict(message, seq=self.published)
+            self.published += 1
+            self._retire([s for s in self.subscribers if s.closed])
+            if not self.subscribers:
+                return
+            frame = encode_frame(message, self.framing)
+            key = (message.get('match_id'), message['type']) if message.get('type') in self.COALESCED_TYPES else None
+            for subscriber in self.subscribers:
+                subscriber.put(key, frame)
+
+    def _retire(self, subscribers):
+        for subscriber in subscribers:
+            self.subscribers.remove(subscriber)
+            for name in self._retired:
+                self._retired[name] += getattr(subscriber, name)
+
+    def close(self):
+        """Stop accepting clients, send what is queued and disconnect."""
+        if self._server is not None:
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._acceptor.join()
+            self._server = None
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.close(wait=True)
+        with self._lock:
+            self._retire(subscribers)
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            subscribers = list(self.subscribers)
+            stats = {'published': self.published, 'subscribers': sum(not s.closed for s in subscribers)}
+            for name, retired in self._retired.items():
+                stats[name] = retired + sum(getattr(s, name) for s in subscribers)
+        return stats
+
+def subscribe(address: Union[str, Tuple[str, int], None] = None, framing: Optional[str] = None,
+              timeout: Optional[float] = None) -> Iterator[Dict]:
+    """Connect to a feed and yield its messages until it closes."""
+    family, address = parse_address(address or ODDS_FEED_CONFIG['address'])
+    framing = framing or ODDS_FEED_CONFIG['framing']
+    with socket.socket(family, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(address)
+        buffer = b''
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                return
+            buffer += chunk
+            while True:
+                if framing == 'ndjson':
+                    end = buffer.find(b'\n')
+                    if end < 0:
+                        break
+                    payload, buffer = buffer[:end], buffer[end + 1:]
+                else:
+                    if len(buffer) < HEADER.size:
+                        break
+                    (length,) = HEADER.unpack_from(buffer)
+                    if len(buffer) < HEADER.size + length:
+                        break
+                    payload, buffer = buffer[HEADER.size:HEADER.size + length], buffer[HEADER.size + length:]
+                yield json.loads(payload)
+
+def wait_for_subscribers(feed: OddsFeed, n: int, timeout: float = 5.0) -> bool:
+    # Connections are accepted on a background thread
+    deadline = time.monotonic() + timeout
+    while feed.get_stats()['subscribers'] < n:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+if __name__ == "__main__":
+    import sys
+
+    # Print the messages of a running feed: python -m models.odds_feed [address]
+    for message in subscribe(sys.argv[1] if len(sys.argv) > 1 else None):
+        print(json.dumps(message))
@@ -0,0 +1,96 @@
+# models/odds_publisher.py
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from config import ODDS_PUBLISHER_CONFIG
+
+def round_to_ladder(odds: float, ladder: List[Tuple[float, float]], min_odds: float) -> float:
+    """odds rounded to the nearest price of the tick ladder, within
+    [min_odds, last band's upper bound]."""
+    lower = 1.0
+    for upper, tick in ladder:
+        if odds <= upper:
+            price = lower + round((odds - lower) / tick) * tick
+            return round(max(price, min_odds), 2)
+        lower = upper
+    return round(lower, 2)
+
+class OddsPublisher:
+    """Forwards odds to callback only when a market moves by a tick.
+
+    Every update is rounded to the tick ladder; one that rounds to the
+    odds already published (or already waiting) is suppressed. A change
+    arriving within window seconds of the last publication is held, and
+    replaced by any later change, so a burst of changes goes out as a
+    single update once the window has passed. flush() publishes a held
+    update straight away.
+    """
+
+    def __init__(self, callback: Optional[Callable[[Dict], None]] = None,
+                 ladder: Optional[List[Tuple[float, float]]] = None, min_odds: Optional[float] = None,
+                 window: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.callback = callback
+        self.ladder = ladder or ODDS_PUBLISHER_CONFIG['ladder']
+        self.min_odds = min_odds or ODDS_PUBLISHER_CONFIG['min_odds']
+        self.window = ODDS_PUBLISHER_CONFIG['coalesce_window'] if window is None else window
+        self.clock = clock
+        self.published: Optional[Dict[str, List[float]]] = None
+        self.pending: Optional[Dict[str, List[float]]] = None
+        self.last_publish_time = None
+        self.updates = 0
+        self.emitted = 0
+        self.suppressed = 0
+        self.coalesced = 0
+
+    def to_ticks(self, odds: Dict[str, List[float]]) -> Dict[str, List[float]]:
+        return {market: [round_to_ladder(price, self.ladder, self.min_odds) for price in prices]
+                for market, prices in odds.items()}
+
+    def update(self, odds: Dict[str, List[float]], now: Optional[float] = None) -> Optional[Dict[str, List[float]]]:
+        """Offer new odds; returns them rounded if they were published."""
+        self.updates += 1
+        ticked = self.to_ticks(odds)
+        previous = self.pending
+        # A change that moves back to the published prices cancels the
+        # held update
+        self.pending = None if ticked == self.published else ticked
+        if self.pending == previous:
+            self.suppressed += 1
+        elif previous is not None:
+            self.coalesced += 1
+        return self._publish_due(self.clock() if now is None else now)
+
+    def _publish_due(self, now: float) -> Optional[Dict[str, List[float]]]:
+        if self.pending is None:
+            return None
+        if self.last_publish_time is not None and now - self.last_publish_time < self.window:
+            return None
+        return self._publish(now)
+
+    def _publish(self, now: float) -> Dict[str, List[float]]:
+        odds, self.pending = self.pending, None
+        self.published = odds
+        self.last_publish_time = now
+        self.emitted += 1
+        if self.callback is not None:
+            self.callback(odds)
+        return odds
+
+    def poll(self, now: Optional[float] = None) -> Optional[Dict[str, List[float]]]:
+        # Publish a held update whose window has passed, without new odds
+        return self._publish_due(self.clock() if now is None else now)
+
+    def flush(self, now: Optional[float] = None) -> Optional[Dict[str, List[float]]]:
+        if self.pending is None:
+            return None
+        return self._publish(self.clock() if now is None else now)
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'updates': self.updates,
+            'emitted': self.emitted,
+            'suppressed': self.suppressed,
+            'coalesced': self.coalesced,
+            'pending': int(self.pending is not None),
+            'emit_rate': self.emitted / self.updates if self.updates else 0.0
+        }
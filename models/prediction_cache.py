@@ -0,0 +1,116 @@
+# models/prediction_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import PREDICTION_CACHE_CONFIG
+
+class CachedModel:
+    """LRU memoization in front of an MLModel.
+
+    Entries are keyed on the match's static feature block plus the dynamic
+    features, with continuous features rounded to the configured steps.
+    The prediction for a miss is made on the rounded state, so a cached
+    value does not depend on which state filled it. Pass quantize=False to
+    key on the exact feature values instead.
+    """
+
+    def __init__(self, model, max_size: int = None, quantization: Optional[Dict[str, float]] = None,
+                 quantize: bool = True):
+        self.model = model
+        self.max_size = max_size or PREDICTION_CACHE_CONFIG['max_size']
+        if quantization is None:
+            quantization = PREDICTION_CACHE_CONFIG['quantization']
+        self.quantization = dict(quantization) if quantize else {}
+        self._cache = OrderedDict()
+        self._key_features = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getattr__(self, name):
+        # Everything else (encode_static, feature names, ...) is the model's
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _features_for_key(self, static) -> tuple:
+        static_key = static.key if static is not None else None
+        names = self._key_features.get(static_key)
+        if names is None:
+            encoder = getattr(self.model, 'encoder', None)
+            names = encoder.feature_names if encoder is not None else self.model.feature_names
+            if static is not None:
+                fixed = set(static.feature_names)
+                names = [f for f in names if f not in fixed]
+            names = self._key_features[static_key] = tuple(names)
+        return names
+
+    def _quantize(self, features: dict) -> dict:
+        quantized = dict(features)
+        for feature, step in self.quantization.items():
+            if feature in quantized:
+                quantized[feature] = round(quantized[feature] / step) * step
+        return quantized
+
+    def predict(self, features: dict, static=None) -> float:
+        if self.quantization:
+            features = self._quantize(features)
+        try:
+            key = (static.key if static is not None else None,
+                   tuple(features[f] for f in self._features_for_key(static)))
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}") from None
+
+        with self._lock:
+            prediction = self._cache.get(key)
+            if prediction is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return prediction
+
+        model = self.model
+        prediction = model.predict(features, static=static)
+        with self._lock:
+            self.misses += 1
+            if self.model is not model:
+                # Swapped while predicting; don't cache the old model's value
+                return prediction
+            self._cache[key] = prediction
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+        return prediction
+
+    def update(self, features: dict, outcome: int) -> bool:
+        updated = self.model.update(features, outcome)
+        if updated:
+            self.clear()
+        return updated
+
+    def swap_model(self, model):
+        with self._lock:
+            self.model = model
+            self._cache.clear()
+            self._key_features.clear()
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._key_features.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'size': len(self._cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate
+        }
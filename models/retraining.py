@@ -0,0 +1,180 @@
+# models/retraining.py
+
+import os
+import time
+import threading
+import weakref
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+from joblib import dump
+from config import ML_MODEL_CONFIG, DEFAULT_MODEL, ONLINE_UPDATE_CONFIG
+from .metrics import log_loss
+from .ml_model import MLModel, load_model
+
+def holdout_log_loss(model: MLModel, samples: list) -> float:
+    rows, outcomes = zip(*samples)
+    return log_loss(np.asarray(outcomes, dtype=np.float64), model.predict_batch(list(rows)))
+
+def retrain_model(model_path: str, output_path: str, samples: list, holdout: list, version: int) -> Dict:
+    """Extend the saved model with labelled samples and save it to
+    output_path, unless it scores worse than before on holdout.
+
+    The fitted preprocessing is kept and the classifier is updated
+    incrementally (see MLModel.update), so what the model learned from its
+    training set is kept. Runs in the retraining worker process.
+    """
+    start = time.perf_counter()
+    model = MLModel(model_path, mmap_mode=None)
+    base_log_loss = holdout_log_loss(model, holdout)
+    # All states of a match share its label, so samples are shuffled for
+    # every update batch to mix matches
+    for i in np.random.default_rng(version).permutation(len(samples)):
+        model.update(*samples[i])
+    model.flush_updates()
+    candidate_log_loss = holdout_log_loss(model, holdout)
+    accepted = candidate_log_loss <= base_log_loss
+    if accepted:
+        model_data = {key: value for key, value in model.model_data.items() if key != 'pipeline'}
+        model_data.update({'pipeline': model.pipeline, 'version': version})
+        dump(model_data, output_path)
+    return {
+        'version': version,
+        'model_path': output_path if accepted else None,
+        'accepted': accepted,
+        'n_samples': len(samples),
+        'n_holdout': len(holdout),
+        'base_log_loss': base_log_loss,
+        'holdout_log_loss': candidate_log_loss,
+        'training_seconds': time.perf_counter() - start
+    }
+
+class RetrainingService:
+    """Retrains a model in a background process every retrain_interval
+    labelled states and swaps the result into all registered engines.
+
+    record_match() labels the states of a finished match with its winner,
+    the target the models are trained on. holdout_fraction of the matches
+    are kept out of training as a holdout, and a retrained model is only
+    swapped in if it scores at least as well on it as the current one.
+    record_match() only appends to buffers, and training, saving and
+    loading all happen off the pricing thread, so simulation never waits
+    on a retrain. The swap itself is an attribute assignment per engine.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, retrain_interval: Optional[int] = None,
+                 max_samples: Optional[int] = None, output_dir: Optional[str] = None,
+                 model_path: Optional[str] = None, holdout_fraction: Optional[float] = None):
+        model_config = ML_MODEL_CONFIG[model_name]
+        self.model_name = model_name
+        self.base_path = model_path or model_config['path']
+        self.retrain_interval = retrain_interval or model_config['retrain_interval']
+        self.output_dir = output_dir or os.path.dirname(os.path.abspath(self.base_path))
+        self.model = load_model(self.base_path)
+        self.model_path = self.base_path
+        self.version = 0
+        self.reports: List[Dict] = []
+        self.holdout_fraction = (ONLINE_UPDATE_CONFIG['holdout_fraction'] if holdout_fraction is None
+                                 else holdout_fraction)
+        self._samples = deque(maxlen=max_samples or ONLINE_UPDATE_CONFIG['history_size'])
+        self._holdout = deque(maxlen=max_samples or ONLINE_UPDATE_CONFIG['history_size'])
+        self._matches = 0
+        self._engines = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._future = None
+
+    def register(self, engine):
+        with self._lock:
+            self._engines.add(engine)
+            engine.set_model(self.model)
+
+    def record_match(self, states: List[dict], winner_index: int):
+        outcome = 1 if winner_index == 0 else 0
+        samples = [(features, outcome) for features in states]
+        with self._lock:
+            self._matches += 1
+            # Whole matches are held out, as the states of a match are
+            # strongly correlated
+            if int(self._matches * self.holdout_fraction) > int((self._matches - 1) * self.holdout_fraction):
+                self._holdout.extend(samples)
+            else:
+                self._samples.extend(samples)
+            self._submit_due()
+
+    def _submit_due(self):
+        # Called with the lock held
+        if len(self._samples) >= self.retrain_interval and self._holdout and self._future is None:
+            self._submit()
+
+    def _submit(self):
+        # Called with the lock held
+        if self._executor is None:
+            # spawn: forking a process that runs pricing threads is unsafe
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        version = self.version + 1
+        root, ext = os.path.splitext(os.path.basename(self.base_path))
+        output_path = os.path.join(self.output_dir, f"{root}_v{version}{ext}")
+        # The current model already learned from earlier samples, so each
+        # retrain only sees the new ones
+        samples = list(self._samples)
+        self._samples.clear()
+        self._future = self._executor.submit(retrain_model, self.model_path, output_path, samples,
+                                             list(self._holdout), version)
+        self._future.add_done_callback(self._on_retrained)
+
+    def _on_retrained(self, future):
+        # Runs on the executor's callback thread, never on the pricing thread
+        try:
+            report = future.result()
+            new_model = load_model(report['model_path']) if report['accepted'] else None
+        except Exception as e:
+            print(f">>>>>>>>> Retraining failed: {e}")
+            with self._lock:
+                self._future = None
+            return
+
+        with self._lock:
+            if new_model is not None:
+                start = time.perf_counter()
+                for engine in list(self._engines):
+                    engine.set_model(new_model)
+                report['swap_latency_ms'] = (time.perf_counter() - start) * 1000
+                self.model = new_model
+                self.model_path = report['model_path']
+                self.version = report['version']
+            self.reports.append(report)
+            self._future = None
+            self._submit_due()
+        if new_model is None:
+            print(f">>>>>>>>> Model v{report['version']} rejected: holdout log-loss {report['holdout_log_loss']:.4f} "
+                  f"against {report['base_log_loss']:.4f} for the current model")
+            return
+        print(f">>>>>>>>> Model v{report['version']} swapped in: trained on {report['n_samples']} samples "
+              f"in {report['training_seconds']:.2f}s, swap took {report['swap_latency_ms']:.3f}ms")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the running retrain (if any) has been swapped in."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                future = self._future
+            if future is None:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                pass
+            time.sleep(0.01)
+
+    def shutdown(self, wait: bool = True):
+        if wait:
+            self.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,118 @@
+# models/schema.py
+
+import numpy as np
+import pandas as pd
+
+# Compact dtype of every match-state column, shared by the data generators
+# (train/data_generation.py, train/simulation_data.py), training and
+# MLModel. Integers use the smallest type that holds their range, measured
+# values are float32 and string features are categoricals.
+
+PLAYER_SCHEMA = {
+    'serve_accuracy': 'float32',
+    'ground_accuracy': 'float32',
+    'volley_accuracy': 'float32',
+    'atp_rank': 'int16',
+    'previous_atp_rank': 'int16',
+    'wins_vs_opponent': 'int8',
+    'weakness': 'category',
+    'strength': 'category',
+    'previous_tournament_results': 'category',
+    'current_injuries': 'category',
+    'previous_injuries': 'category',
+    'country': 'category',
+    # Match statistics, only in simulated states
+    'aces': 'int16',
+    'double_faults': 'int16',
+    'winners': 'int16',
+    'unforced_errors': 'int16'
+}
+
+MATCH_SCHEMA = {
+    'surface': 'category',
+    'is_indoor': 'bool',
+    'weather': 'category',
+    'event_country': 'category',
+    'average_winning_odd': 'float32',
+    'average_losing_odd': 'float32',
+    'set_score_1': 'int8',
+    'set_score_2': 'int8',
+    'game_score_1': 'int8',
+    'game_score_2': 'int8',
+    'fatigue_1': 'float32',
+    'fatigue_2': 'float32',
+    'current_shot_type': 'category',
+    'current_ball_speed': 'float32',
+    'current_ball_spin': 'float32',
+    # Reported by Match.get_current_state only
+    'server': 'int8',
+    'receiver': 'int8',
+    'point_score_1': 'category',
+    'point_score_2': 'category',
+    'current_set': 'int8',
+    'is_tiebreak': 'bool',
+    'is_match_tiebreak': 'bool',
+    'outcome': 'int8'
+}
+
+FEATURE_SCHEMA = dict(MATCH_SCHEMA, **{f'player{i}_{name}': dtype for i in (1, 2)
+                                       for name, dtype in PLAYER_SCHEMA.items()})
+
+CATEGORICAL_FEATURES = [name for name, dtype in FEATURE_SCHEMA.items() if dtype == 'category']
+BOOLEAN_FEATURES = [name for name, dtype in FEATURE_SCHEMA.items() if dtype == 'bool']
+
+def cast_column(name: str, values, float_dtype: str = 'float32'):
+    """values in the schema dtype of column name, float columns in
+    float_dtype. Raises ValueError for integers outside the dtype's range.
+    Columns outside the schema are downcast by kind."""
+    dtype = FEATURE_SCHEMA.get(name)
+    if dtype == 'category':
+        if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+            return values
+        values = pd.Series(values)
+        # Non-string values are categorized by their string form, as
+        # MLModel encodes them
+        if values.dtype != object:
+            values = values.astype(str)
+        return pd.Categorical(values)
+    values = np.asarray(values)
+    if dtype is None:
+        if values.dtype.kind == 'f':
+            return values.astype(float_dtype, copy=False)
+        if values.dtype.kind in 'iu':
+            return pd.to_numeric(values, downcast='integer')
+        return values
+    if dtype == 'float32':
+        return values.astype(float_dtype, copy=False)
+    if dtype != 'bool' and len(values):
+        limits = np.iinfo(dtype)
+        if values.min() < limits.min or values.max() > limits.max:
+            raise ValueError(f"Values of {name} outside the range of {dtype}: {values.min()} to {values.max()}")
+    return values.astype(dtype, copy=False)
+
+def apply_schema(df: pd.DataFrame, float_dtype: str = 'float32') -> pd.DataFrame:
+    """df with every column in its compact dtype (see cast_column)."""
+    return pd.DataFrame({name: cast_column(name, df[name], float_dtype) for name in df.columns}, index=df.index)
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Bytes per column of df, next to the bytes of the same column with
+    pandas' default int64/float64/object dtypes."""
+    rows = []
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            default = column.astype(object)
+        elif column.dtype.kind in 'iuf':
+            default = column.astype(np.float64 if column.dtype.kind == 'f' else np.int64)
+        else:
+            default = column
+        rows.append({'column': name, 'dtype': str(column.dtype), 'bytes': int(column.memory_usage(index=False, deep=True)),
+                     'default_bytes': int(default.memory_usage(index=False, deep=True))})
+    return pd.DataFrame(rows).set_index('column')
+
+def print_memory_report(report: pd.DataFrame):
+    print("Memory per Column:")
+    for name, row in report.iterrows():
+        print(f"{name}: {row['dtype']}, {row['bytes'] / 1e6:.2f} MB (default dtypes {row['default_bytes'] / 1e6:.2f} MB)")
+    total, default = report['bytes'].sum(), report['default_bytes'].sum()
+    print(f"Total: {total / 1e6:.2f} MB (default dtypes {default / 1e6:.2f} MB, {default / max(total, 1):.1f}x)")
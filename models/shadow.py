@@ -0,0 +1,153 @@
+# models/shadow.py
+
+import time
+import queue
+import threading
+from typing import Dict, Optional
+from config import SHADOW_CONFIG
+from .metrics import ProbabilityMetrics
+from .prediction_cache import CachedModel
+
+class ModelStats:
+    """Running scores and scoring time collected for one model."""
+
+    def __init__(self, name: str, n_bins: Optional[int] = None):
+        self.name = name
+        self.metrics = ProbabilityMetrics(n_bins or SHADOW_CONFIG['calibration_bins'])
+        self.seconds = 0.0
+        self.n_predictions = 0
+
+    def add(self, probabilities, outcomes, seconds: float):
+        self.metrics.add(outcomes, probabilities)
+        self.seconds += seconds
+        self.n_predictions += len(probabilities)
+
+    def report(self) -> Dict:
+        report = {
+            'n_predictions': self.n_predictions,
+            'latency_us': self.seconds / self.n_predictions * 1e6 if self.n_predictions else 0.0,
+            'throughput': self.n_predictions / self.seconds if self.seconds else 0.0
+        }
+        if self.metrics.n_rows:
+            results = self.metrics.results()
+            report.update({name: results[name] for name in
+                           ('log_loss', 'brier_score', 'accuracy', 'expected_calibration_error', 'calibration')})
+        return report
+
+class ShadowEvaluator:
+    """Prices with a primary model while shadow models score the same states.
+
+    predict() returns the primary model's prediction and only keeps a
+    reference to the state; record_match() labels the states priced during
+    the match with its winner, the target the models are trained on, and
+    hands them to a background thread, which scores them
+    through predict_batch with every shadow model and with the primary's
+    own model (behind any prediction cache), so every model's scores and
+    latency per row come from the same path. The primary's time per live
+    call, cache included, is reported as live_latency_us.
+    """
+
+    def __init__(self, primary, shadows: Dict[str, object], primary_name: str = 'primary',
+                 batch_size: Optional[int] = None, calibration_bins: Optional[int] = None):
+        self.primary = primary
+        self.shadows = dict(shadows)
+        self.primary_name = primary_name
+        self.batch_size = batch_size or SHADOW_CONFIG['batch_size']
+        self.calibration_bins = calibration_bins or SHADOW_CONFIG['calibration_bins']
+        self.stats = {name: ModelStats(name, self.calibration_bins) for name in [primary_name, *self.shadows]}
+        self._pending_states = []
+        self._live_seconds = 0.0
+        self._live_predictions = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name='shadow-evaluator', daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name):
+        # encode_static, feature names, ... come from the primary model
+        if name == 'primary':
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    def predict(self, features: dict, static=None) -> float:
+        start = time.perf_counter()
+        prediction = self.primary.predict(features, static=static)
+        self._live_seconds += time.perf_counter() - start
+        self._live_predictions += 1
+        self._pending_states.append(features)
+        return prediction
+
+    def record_match(self, winner_index: int):
+        """Label every state priced since the last match with its winner."""
+        if not self._pending_states:
+            return
+        outcome = 1 if winner_index == 0 else 0
+        self._queue.put((self._pending_states, [outcome] * len(self._pending_states)))
+        self._pending_states = []
+
+    def swap_model(self, model):
+        if hasattr(self.primary, 'swap_model'):
+            self.primary.swap_model(model)
+        else:
+            self.primary = model
+
+    def _run(self):
+        states, outcomes = [], []
+        while True:
+            item = self._queue.get()
+            if item is not None:
+                states.extend(item[0])
+                outcomes.extend(item[1])
+            if states and (item is None or len(states) >= self.batch_size):
+                self._score(states, outcomes)
+                states, outcomes = [], []
+            self._queue.task_done()
+            if item is None:
+                return
+
+    def _score(self, states: list, outcomes: list):
+        # Resolved per batch, as swap_model may replace it
+        primary = self.primary.model if isinstance(self.primary, CachedModel) else self.primary
+        for name, model in [(self.primary_name, primary), *self.shadows.items()]:
+            start = time.perf_counter()
+            try:
+                probabilities = model.predict_batch(states)
+            except Exception as e:
+                # A broken model must never affect live pricing
+                print(f">>>>>>>>> Shadow scoring with {name} failed: {e}")
+                continue
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self.stats[name].add(probabilities, outcomes, seconds)
+
+    def flush(self):
+        """Score everything labelled so far, including a partial batch."""
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = threading.Thread(target=self._run, name='shadow-evaluator', daemon=True)
+            self._worker.start()
+
+    def close(self):
+        if self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join()
+
+    def get_report(self) -> Dict[str, Dict]:
+        with self._lock:
+            report = {name: stats.report() for name, stats in self.stats.items()}
+        report[self.primary_name]['live_latency_us'] = (self._live_seconds / self._live_predictions * 1e6
+                                                        if self._live_predictions else 0.0)
+        return report
+
+def print_shadow_report(report: Dict[str, Dict]):
+    print("Shadow Evaluation Results:")
+    for name, stats in report.items():
+        line = (f"  {name}: {stats['n_predictions']} predictions, {stats['latency_us']:.1f} us/prediction batched, "
+                f"{stats['throughput']:.0f} predictions/s")
+        if 'live_latency_us' in stats:
+            line += f", {stats['live_latency_us']:.1f} us/live call"
+        if 'log_loss' in stats:
+            line += (f", log-loss {stats['log_loss']:.4f}, Brier {stats['brier_score']:.4f}, "
+                     f"ECE {stats['expected_calibration_error']:.4f}")
+        print(line)
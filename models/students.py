@@ -0,0 +1,72 @@
+# models/students.py
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+
+# Small models distilled from the tree/neural pipelines (see
+# train/distillation.py). Both are fitted on encoded feature rows with the
+# teacher's probabilities as targets and predict with plain NumPy.
+
+class LinearStudent(BaseEstimator, ClassifierMixin):
+    """Logistic regression fitted to soft (probability) targets."""
+
+    def __init__(self, C=1.0, max_iter=1000):
+        self.C = C
+        self.max_iter = max_iter
+
+    def fit(self, X, y):
+        from sklearn.linear_model import LogisticRegression
+
+        # Cross-entropy against a soft target p is the same as weighting a
+        # copy of each row labelled 1 by p and a copy labelled 0 by 1 - p.
+        X = np.asarray(X, dtype=np.float64)
+        p = np.clip(np.asarray(y, dtype=np.float64), 0.0, 1.0)
+        X_doubled = np.vstack([X, X])
+        y_doubled = np.concatenate([np.ones(len(X)), np.zeros(len(X))])
+        weights = np.concatenate([p, 1.0 - p])
+        regression = LogisticRegression(C=self.C, max_iter=self.max_iter)
+        regression.fit(X_doubled, y_doubled, sample_weight=weights)
+        self.coef_ = regression.coef_[0].copy()
+        self.intercept_ = float(regression.intercept_[0])
+        self.classes_ = np.array([0, 1])
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-(np.asarray(X) @ self.coef_ + self.intercept_)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+class ScoreTableStudent(BaseEstimator, ClassifierMixin):
+    """Mean teacher probability per score state.
+
+    columns are the encoded-row positions of the score features; unseen
+    states fall back to the overall mean.
+    """
+
+    def __init__(self, columns=None):
+        self.columns = columns
+
+    def _keys(self, X) -> list:
+        values = np.round(np.asarray(X)[:, self.columns], 6)
+        return [tuple(row) for row in values.tolist()]
+
+    def fit(self, X, y):
+        p = np.asarray(y, dtype=np.float64)
+        sums = {}
+        counts = {}
+        for key, value in zip(self._keys(X), p):
+            sums[key] = sums.get(key, 0.0) + value
+            counts[key] = counts.get(key, 0) + 1
+        self.table_ = {key: sums[key] / counts[key] for key in sums}
+        self.default_ = float(p.mean()) if len(p) else 0.5
+        self.classes_ = np.array([0, 1])
+        return self
+
+    def predict_proba(self, X) -> np.ndarray:
+        positive = np.array([self.table_.get(key, self.default_) for key in self._keys(X)])
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
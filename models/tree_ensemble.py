@@ -0,0 +1,261 @@
+# models/tree_ensemble.py
+
+import json
+import numpy as np
+
+class FlatTreeEnsemble:
+    """A fitted tree ensemble stored as contiguous node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right,
+    value) and roots holds the index of each tree's first node. Leaves point
+    back at themselves, so evaluation advances every tree one level per step
+    for max_depth steps with no per-node branching in Python.
+
+    A sample goes left when x <= threshold, with x cast to float32 the way
+    scikit-learn and xgboost do. Categorical splits (xgboost's native
+    categorical support) have category_set >= 0 instead: a sample goes
+    right when its integer code is in row category_set of the boolean
+    category_sets matrix, and negative or NaN codes count as missing. Predictions are either the mean of the leaf
+    probabilities (random forest) or the sigmoid of the summed leaf margins
+    plus base_margin (gradient boosting).
+
+    A compact ensemble stores indices as int32 and thresholds and leaf
+    values as float32, about half the memory. Thresholds are rounded down
+    to float32, which keeps every split decision on float32 inputs
+    unchanged; only the leaf values lose precision.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots,
+                 aggregation: str, base_margin: float = 0.0, compact: bool = False,
+                 category_set=None, category_sets=None):
+        if aggregation not in ('mean', 'logistic'):
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+        index_dtype = np.int32 if compact else np.intp
+        float_dtype = np.float32 if compact else np.float64
+        if compact:
+            threshold = np.asarray(threshold, dtype=np.float64)
+            rounded = threshold.astype(np.float32)
+            above = rounded > threshold
+            rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+            threshold = rounded
+        self.feature = np.ascontiguousarray(feature, dtype=index_dtype)
+        self.threshold = np.ascontiguousarray(threshold, dtype=float_dtype)
+        self.left = np.ascontiguousarray(left, dtype=index_dtype)
+        self.right = np.ascontiguousarray(right, dtype=index_dtype)
+        self.value = np.ascontiguousarray(value, dtype=float_dtype)
+        self.missing_left = np.ascontiguousarray(missing_left, dtype=bool)
+        self.roots = np.ascontiguousarray(roots, dtype=index_dtype)
+        if category_set is not None and np.any(np.asarray(category_set) >= 0):
+            self.category_set = np.ascontiguousarray(category_set, dtype=index_dtype)
+            self.category_sets = np.ascontiguousarray(category_sets, dtype=bool)
+            self._build_category_lookup()
+        else:
+            self.category_set = None
+            self.category_sets = None
+        self.compact = compact
+        self.aggregation = aggregation
+        self.base_margin = float(base_margin)
+        self.max_depth = self._max_depth()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value,
+                                      self.missing_left, self.roots, self.category_set, self.category_sets)
+                   if a is not None)
+
+    def _max_depth(self) -> int:
+        depth = 0
+        nodes = self.roots
+        while True:
+            internal = nodes[self.left[nodes] != nodes]
+            if len(internal) == 0:
+                return depth
+            nodes = np.concatenate([self.left[internal], self.right[internal]])
+            depth += 1
+
+    def leaves(self, X) -> np.ndarray:
+        """Leaf index reached in every tree, shape (n_samples, n_trees)."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        check_missing = np.isnan(X).any()
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[node]
+            if self.category_set is not None:
+                go_left = self._categorical_split(x, node, go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _build_category_lookup(self):
+        # Direction of every categorical split for every code: row 0 is a
+        # placeholder for numeric nodes, column 0 is missing (negative or
+        # NaN) and the last column is any code past the last category.
+        nodes = np.flatnonzero(self.category_set >= 0)
+        n_codes = self.category_sets.shape[1]
+        lookup = np.ones((len(self.category_sets) + 1, n_codes + 2), dtype=bool)
+        rows = self.category_set[nodes] + 1
+        lookup[rows, 0] = self.missing_left[nodes]
+        lookup[rows, 1:n_codes + 1] = ~self.category_sets[rows - 1]
+        self._category_row = (self.category_set + 1).astype(np.intp)
+        self._category_lookup = lookup
+
+    def _categorical_split(self, x, node, go_left) -> np.ndarray:
+        n_codes = self.category_sets.shape[1]
+        column = np.where(x >= 0, np.minimum(x, n_codes) + 1, 0).astype(np.intp)
+        row = self._category_row[node]
+        return np.where(row > 0, self._category_lookup[row, column], go_left)
+
+    def predict_proba(self, X) -> np.ndarray:
+        values = self.value[self.leaves(X)]
+        # Trees are accumulated in order, as scikit-learn and xgboost do, so
+        # forests match exactly and boosted margins to float32 precision.
+        if self.aggregation == 'mean':
+            positive = np.cumsum(values, axis=1, dtype=np.float64)[:, -1] / self.n_trees
+        else:
+            margins = np.empty((values.shape[0], values.shape[1] + 1), dtype=np.float32)
+            margins[:, 0] = self.base_margin
+            margins[:, 1:] = values
+            margin = np.cumsum(margins, axis=1, dtype=np.float32)[:, -1]
+            positive = 1.0 / (1.0 + np.exp(-margin.astype(np.float64)))
+        return np.column_stack([1.0 - positive, positive])
+
+    def to_compact(self) -> 'FlatTreeEnsemble':
+        if self.compact:
+            return self
+        return FlatTreeEnsemble(self.feature, self.threshold, self.left, self.right, self.value,
+                                self.missing_left, self.roots, aggregation=self.aggregation,
+                                base_margin=self.base_margin, compact=True,
+                                category_set=self.category_set, category_sets=self.category_sets)
+
+    def concatenate(self, other: 'FlatTreeEnsemble') -> 'FlatTreeEnsemble':
+        """A new ensemble with other's trees appended after these, stored
+        compactly if these are."""
+        if other.aggregation != self.aggregation or other.base_margin != self.base_margin:
+            raise ValueError("Ensembles must share aggregation and base margin")
+        if self.compact:
+            other = other.to_compact()
+        offset = self.n_nodes
+        category_set, category_sets = self._merge_category_sets(other)
+        return FlatTreeEnsemble(
+            np.concatenate([self.feature, other.feature]),
+            np.concatenate([self.threshold, other.threshold]),
+            np.concatenate([self.left, other.left + offset]),
+            np.concatenate([self.right, other.right + offset]),
+            np.concatenate([self.value, other.value]),
+            np.concatenate([self.missing_left, other.missing_left]),
+            np.concatenate([self.roots, other.roots + offset]),
+            aggregation=self.aggregation, base_margin=self.base_margin, compact=self.compact,
+            category_set=category_set, category_sets=category_sets
+        )
+
+    def _merge_category_sets(self, other: 'FlatTreeEnsemble') -> tuple:
+        if self.category_set is None and other.category_set is None:
+            return None, None
+        sets = [e.category_sets if e.category_set is not None else np.zeros((0, 1), dtype=bool) for e in (self, other)]
+        width = max(s.shape[1] for s in sets)
+        sets = [np.pad(s, ((0, 0), (0, width - s.shape[1]))) for s in sets]
+        own = self.category_set if self.category_set is not None else np.full(self.n_nodes, -1)
+        theirs = other.category_set if other.category_set is not None else np.full(other.n_nodes, -1)
+        theirs = np.where(theirs >= 0, theirs + len(sets[0]), -1)
+        return np.concatenate([own, theirs]), np.concatenate(sets)
+
+    @classmethod
+    def from_random_forest(cls, forest) -> 'FlatTreeEnsemble':
+        if getattr(forest, 'n_outputs_', 1) != 1 or len(forest.classes_) != 2:
+            raise ValueError("Only single-output binary forests can be exported")
+        arrays = {k: [] for k in ('feature', 'threshold', 'left', 'right', 'value', 'missing_left')}
+        roots = []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            nodes = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+            counts = tree.value[:, 0, :]
+            totals = counts.sum(axis=1)
+            totals[totals == 0] = 1.0
+            arrays['feature'].append(np.where(is_leaf, 0, tree.feature))
+            arrays['threshold'].append(np.where(is_leaf, np.inf, tree.threshold))
+            arrays['left'].append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            arrays['right'].append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            arrays['value'].append(counts[:, 1] / totals)
+            missing = getattr(tree, 'missing_go_to_left', None)
+            arrays['missing_left'].append(np.zeros(n_nodes, dtype=bool) if missing is None else np.asarray(missing, dtype=bool))
+            roots.append(offset)
+            offset += n_nodes
+        return cls(*(np.concatenate(arrays[k]) for k in ('feature', 'threshold', 'left', 'right', 'value', 'missing_left')),
+                   roots=roots, aggregation='mean')
+
+    @classmethod
+    def from_xgboost(cls, model) -> 'FlatTreeEnsemble':
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        learner = json.loads(booster.save_raw('json'))['learner']
+        if learner['objective']['name'] != 'binary:logistic':
+            raise ValueError(f"Unsupported xgboost objective: {learner['objective']['name']}")
+        trees = learner['gradient_booster']['model']['trees']
+        try:
+            trees = trees[:model.best_iteration + 1]
+        except AttributeError:
+            pass
+        base_score = float(learner['learner_model_param']['base_score'])
+
+        arrays = {k: [] for k in ('feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'category_set')}
+        category_sets = []
+        roots = []
+        offset = 0
+        for tree in trees:
+            left = np.asarray(tree['left_children'])
+            right = np.asarray(tree['right_children'])
+            nodes = np.arange(len(left))
+            is_leaf = left == -1
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            # xgboost goes left when x < condition; in float32 that is
+            # x <= the next representable value below the condition.
+            thresholds = np.nextafter(conditions, np.float32(-np.inf))
+            arrays['feature'].append(np.where(is_leaf, 0, tree['split_indices']))
+            arrays['threshold'].append(np.where(is_leaf, np.inf, thresholds.astype(np.float64)))
+            arrays['left'].append(np.where(is_leaf, nodes, left) + offset)
+            arrays['right'].append(np.where(is_leaf, nodes, right) + offset)
+            arrays['value'].append(np.where(is_leaf, conditions, 0.0))
+            arrays['missing_left'].append(np.asarray(tree['default_left'], dtype=bool))
+            # Categories of each categorical split, stored flat per tree
+            category_set = np.full(len(left), -1)
+            for node, start, size in zip(tree.get('categories_nodes', []), tree.get('categories_segments', []),
+                                         tree.get('categories_sizes', [])):
+                category_set[node] = len(category_sets)
+                category_sets.append(tree['categories'][start:start + size])
+            arrays['category_set'].append(category_set)
+            roots.append(offset)
+            offset += len(left)
+        n_codes = max((max(categories, default=-1) + 1 for categories in category_sets), default=0)
+        sets = np.zeros((len(category_sets), max(n_codes, 1)), dtype=bool)
+        for i, categories in enumerate(category_sets):
+            sets[i, categories] = True
+        return cls(*(np.concatenate(arrays[k]) for k in ('feature', 'threshold', 'left', 'right', 'value', 'missing_left')),
+                   roots=roots, aggregation='logistic', base_margin=np.log(base_score / (1 - base_score)),
+                   category_set=np.concatenate(arrays['category_set']), category_sets=sets)
+
+def export_ensemble(classifier) -> FlatTreeEnsemble:
+    """Export a fitted RandomForestClassifier or XGBClassifier.
+
+    Raises ValueError for models that have no flat-array equivalent.
+    """
+    kind = type(classifier).__name__
+    if kind == 'RandomForestClassifier':
+        return FlatTreeEnsemble.from_random_forest(classifier)
+    if kind == 'XGBClassifier':
+        return FlatTreeEnsemble.from_xgboost(classifier)
+    raise ValueError(f"Cannot export {kind} as a flat tree ensemble")
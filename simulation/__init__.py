@@ -1,14 +1,31 @@
 # simulation/__init__.py
 
+import importlib
 
 from .match import Match, PointOutcome
 from .player import PlayerStats, ShotType
 from .match_formats import MatchFormat, create_match_format
-from .engine import SimulationEngine
 
 # Import VERSION at the end to avoid circular imports
 from config import VERSION as __version__
 
+# The engine pulls in the ML stack (pandas, scikit-learn), so it is only
+# imported the first time it is accessed.
+_LAZY_IMPORTS = {
+    'SimulationEngine': '.engine'
+}
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
 __all__ = [
     'Match',
     'PointOutcome',
@@ -17,4 +34,4 @@ __all__ = [
     'MatchFormat',
     'create_match_format',
     'SimulationEngine'
-]
\ No newline at end of file
+]
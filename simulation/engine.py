@@ -1,14 +1,34 @@
 # simulation/engine.py
 
-from typing import List
+import time
+from typing import List, TYPE_CHECKING
 from .events import TennisEvent, ShotType, ShotOutcome
 from .match import Match
-from models.ml_model import MLModel
-from models.odds_calculator import OddsCalculator
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them eagerly would load pandas
+    # and scikit-learn whenever the simulation package is imported.
+    from models.ml_model import MLModel
+    from models.odds_calculator import OddsCalculator
+    from models.retraining import RetrainingService
+    from models.odds_publisher import OddsPublisher
+    from models.odds_feed import OddsFeed
+
+RALLY_SHOT_TYPES = [st for st in ShotType if st not in [ShotType.SERVE_1ST, ShotType.SERVE_2ND]]
 
 class SimulationEngine:
-    def __init__(self, player1, player2, match_format, surface, is_indoor, weather, event_country, ml_model: MLModel, odds_calculator: OddsCalculator):
-        self.match = Match(player1, player2, match_format, surface, is_indoor, weather, event_country)
+    def __init__(self, player1, player2, match_format, surface, is_indoor, weather, event_country, ml_model: 'MLModel', odds_calculator: 'OddsCalculator',
+                 retraining_service: 'RetrainingService' = None, verbose: bool = True, record_points: bool = False,
+                 odds_publisher: 'OddsPublisher' = None, feed: 'OddsFeed' = None, match_id: str = None):
+        # Headless runs (verbose=False, ml_model=None) print nothing and skip
+        # pricing; with record_points the state at the start of every point
+        # is kept in point_states. Fresh odds are offered to odds_publisher,
+        # which forwards only those that move by a tick. Events, scores and
+        # published odds are streamed to feed, tagged with match_id.
+        self.match = Match(player1, player2, match_format, surface, is_indoor, weather, event_country, verbose=verbose)
+        self.verbose = verbose
+        self.record_points = record_points
+        self.point_states: List[dict] = []
         self.ml_model = ml_model
         self.odds_calculator = odds_calculator
         self.current_odds = {
@@ -17,12 +37,27 @@ class SimulationEngine:
             'game_winner': [2.0, 2.0]
         }
         self.recent_events: List[TennisEvent] = []
+        self.static_features = None
+        self.retraining_service = retraining_service
+        self.odds_publisher = odds_publisher
+        self.feed = feed
+        self.match_id = match_id
+        if retraining_service is not None:
+            retraining_service.register(self)
 
     def run_simulation(self):
-        print("Match starting...")
-        print(f"Initial odds: {self.format_odds(self.current_odds)}")
+        if self.verbose:
+            print("Match starting...")
+            print(f"Initial odds: {self.format_odds(self.current_odds)}")
 
+        match_states = []
         while not self.match.is_match_over():
+            point_state = self.match.get_current_state()
+            if self.record_points:
+                self.point_states.append(point_state)
+            if self.retraining_service is not None:
+                match_states.append(point_state)
+
             # Always start with a serve
             serve_event = self.generate_serve_event()
             self.process_event(serve_event)
@@ -34,9 +69,21 @@ class SimulationEngine:
             
             # Point is over, update match state
             self.match.end_point()
+            self.publish('score', score=self.match.get_score())
 
-        print("\nMatch ended.")
-        self.print_final_results()
+        if self.retraining_service is not None:
+            # Labelled with the match winner, the target the models are
+            # trained on
+            self.retraining_service.record_match(match_states, self.match.get_winner_index())
+        if hasattr(self.ml_model, 'record_match'):
+            # Shadow evaluation labels the states priced during the match
+            # with its winner
+            self.ml_model.record_match(self.match.get_winner_index())
+        if self.odds_publisher is not None:
+            self.publish('odds', odds=self.odds_publisher.flush())
+        if self.verbose:
+            print("\nMatch ended.")
+            self.print_final_results()
     
     def generate_serve_event(self) -> TennisEvent:
         import random
@@ -71,7 +118,7 @@ class SimulationEngine:
         import random
         
         player = random.choice([0, 1])
-        shot_type = random.choice([st for st in ShotType if st not in [ShotType.SERVE_1ST, ShotType.SERVE_2ND]])
+        shot_type = random.choice(RALLY_SHOT_TYPES)
         shot_outcome = random.choices(
             [ShotOutcome.IN_PLAY, ShotOutcome.WINNER, ShotOutcome.FORCED_ERROR, ShotOutcome.UNFORCED_ERROR],
             weights=[0.7, 0.1, 0.1, 0.1]
@@ -87,12 +134,16 @@ class SimulationEngine:
         self.recent_events.append(event)
         if len(self.recent_events) > 10:
             self.recent_events.pop(0)
+        self.publish('event', player=event.player, shot_type=event.shot_type.name,
+                     shot_outcome=event.shot_outcome.name, ball_speed=event.ball_speed, ball_spin=event.ball_spin)
 
-        self.update_odds()
+        if self.ml_model is not None:
+            self.update_odds()
 
-        print(f"\nEvent: {self.format_event(event)}")
-        print(f"Updated odds: {self.format_odds(self.current_odds)}")
-        print(f"Current score: {self.match.get_score()}")
+        if self.verbose:
+            print(f"\nEvent: {self.format_event(event)}")
+            print(f"Updated odds: {self.format_odds(self.current_odds)}")
+            print(f"Current score: {self.match.get_score()}")
 
     def generate_next_event(self) -> TennisEvent:
         import random
@@ -122,10 +173,31 @@ class SimulationEngine:
         
         return TennisEvent(player, shot_type, shot_outcome, ball_speed, ball_spin)
 
+    def set_model(self, ml_model):
+        # Swap the pricing model between events; wrappers such as CachedModel
+        # keep wrapping the new model. The static feature block is
+        # re-encoded on the next event because it belongs to the old encoder.
+        if hasattr(self.ml_model, 'swap_model'):
+            self.ml_model.swap_model(ml_model)
+        else:
+            self.ml_model = ml_model
+
     def update_odds(self):
         match_state = self.match.get_current_state()
-        prediction = self.ml_model.predict(match_state)
+        # Static features are encoded once per match; only the dynamic ones
+        # are encoded for each event.
+        self.static_features = self.ml_model.encode_static(self.match.get_static_state(), self.static_features)
+        prediction = self.ml_model.predict(match_state, static=self.static_features)
         self.current_odds = self.odds_calculator.calculate(prediction, match_state, self.recent_events)
+        odds = self.current_odds
+        if self.odds_publisher is not None:
+            odds = self.odds_publisher.update(self.current_odds)
+        self.publish('odds', odds=odds)
+
+    def publish(self, message_type: str, **fields):
+        # None fields (odds held back by the publisher) are not sent
+        if self.feed is not None and all(value is not None for value in fields.values()):
+            self.feed.publish({'type': message_type, 'match_id': self.match_id, 'time': time.time(), **fields})
 
     def format_event(self, event: TennisEvent) -> str:
         player_name = self.match.players[event.player].name
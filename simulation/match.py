@@ -43,8 +43,9 @@ class MatchState:
 
 class Match:
     def __init__(self, player1: PlayerStats, player2: PlayerStats, match_format: MatchFormat, 
-                 surface: Surface, is_indoor: bool, weather: Weather, event_country: str):
+                 surface: Surface, is_indoor: bool, weather: Weather, event_country: str, verbose: bool = True):
         self.players = [player1, player2]
+        self.verbose = verbose
         self.match_format = match_format
         self.state = MatchState(server=0, receiver=1)
         self.point_history = []
@@ -57,14 +58,28 @@ class Match:
         self.current_ball_spin = 0.0  # Initialize with 0
         self.previous_event: Optional[TennisEvent] = None
         self.current_point_events: List[TennisEvent] = []
+        self.last_point_winner: Optional[int] = None
+        # Cached feature dicts; the static part never changes during a match
+        # and the full state is rebuilt only after something marks it dirty.
+        self._static_state: Optional[Dict] = None
+        self._state_cache: Optional[Dict] = None
+        self._state_dirty = True
     
     def set_current_shot_type(self, shot_type: ShotType):
         self.current_shot_type = shot_type
+        self._state_dirty = True
     
     def set_current_shot_info(self, shot_type: ShotType, ball_speed: float, ball_spin: float):
         self.current_shot_type = shot_type
         self.current_ball_speed = ball_speed
         self.current_ball_spin = ball_spin
+        self._state_dirty = True
+
+    def invalidate_state(self, static: bool = False):
+        # Call after changing players or conditions outside of the Match methods
+        self._state_dirty = True
+        if static:
+            self._static_state = None
 
     
     def calculate_average_odds(self) -> Tuple[float, float]:
@@ -82,27 +97,18 @@ class Match:
         
         return winning_odd, losing_odd
         
-    def get_current_state(self) -> Dict:
+    def get_static_state(self) -> Dict:
+        """Features that are fixed for the whole match, built once."""
+        if self._static_state is not None:
+            return self._static_state
+
         winning_odd, losing_odd = self.calculate_average_odds()
         
-        state = {
+        self._static_state = {
             "surface": self.surface.value,
             "is_indoor": self.is_indoor,
             "weather": self.weather.value,
             "event_country": self.event_country,
-            "server": self.state.server,
-            "receiver": self.state.receiver,
-            "set_score_1": self.state.set_score[0],
-            "set_score_2": self.state.set_score[1],
-            "game_score_1": self.state.game_score[0],
-            "game_score_2": self.state.game_score[1],
-            "point_score_1": self.state.point_score[0],
-            "point_score_2": self.state.point_score[1],
-            "current_set": self.state.current_set,
-            "is_tiebreak": self.state.is_tiebreak,
-            "is_match_tiebreak": self.state.is_match_tiebreak,
-            "fatigue_1": self.players[0].fatigue,
-            "fatigue_2": self.players[1].fatigue,
             "player1_serve_accuracy": self.players[0].serve_accuracy,
             "player2_serve_accuracy": self.players[1].serve_accuracy,
             "player1_ground_accuracy": self.players[0].groundstroke_accuracy,
@@ -125,14 +131,33 @@ class Match:
             "player2_current_injuries": ','.join([f"{k}:{v.value}" for k, v in self.players[1].current_injuries.items()]),
             "player1_previous_injuries": ','.join([f"{k}:{v.value}" for k, v in self.players[0].previous_injuries.items()]),
             "player2_previous_injuries": ','.join([f"{k}:{v.value}" for k, v in self.players[1].previous_injuries.items()]),
-            "current_shot_type": self.current_shot_type.value,
-            "current_ball_speed": self.current_ball_speed,
-            "current_ball_spin": self.current_ball_spin,
             "average_winning_odd": winning_odd,
             "average_losing_odd": losing_odd,
             "player1_wins_vs_opponent": self.players[0].get_wins_vs_opponent(self.players[1].name),
             "player2_wins_vs_opponent": self.players[1].get_wins_vs_opponent(self.players[0].name)
         }
+        return self._static_state
+
+    def get_dynamic_state(self) -> Dict:
+        """Features that change as the match is played."""
+        state = {
+            "server": self.state.server,
+            "receiver": self.state.receiver,
+            "set_score_1": self.state.set_score[0],
+            "set_score_2": self.state.set_score[1],
+            "game_score_1": self.state.game_score[0],
+            "game_score_2": self.state.game_score[1],
+            "point_score_1": self.state.point_score[0],
+            "point_score_2": self.state.point_score[1],
+            "current_set": self.state.current_set,
+            "is_tiebreak": self.state.is_tiebreak,
+            "is_match_tiebreak": self.state.is_match_tiebreak,
+            "fatigue_1": self.players[0].fatigue,
+            "fatigue_2": self.players[1].fatigue,
+            "current_shot_type": self.current_shot_type.value,
+            "current_ball_speed": self.current_ball_speed,
+            "current_ball_spin": self.current_ball_spin
+        }
         
         # Add player stats
         for i, player in enumerate(self.players, 1):
@@ -141,6 +166,16 @@ class Match:
         
         return state
 
+    def get_current_state(self) -> Dict:
+        """All model features. The same dict is returned until the state
+        changes, so callers must treat it as read-only."""
+        if self._state_dirty or self._state_cache is None:
+            state = dict(self.get_static_state())
+            state.update(self.get_dynamic_state())
+            self._state_cache = state
+            self._state_dirty = False
+        return self._state_cache
+
     def update_point_score(self, winner: int):
         if self.state.is_tiebreak or self.state.is_match_tiebreak:
             self.state.point_score[winner] = str(int(self.state.point_score[winner]) + 1)
@@ -232,6 +267,12 @@ class Match:
             "player_fatigue": self.state.player_fatigue.copy()
         }
 
+    def get_winner_index(self) -> Optional[int]:
+        # Index of the player who won more sets, once the match is over
+        if self.is_match_over():
+            return 0 if self.state.set_score[0] > self.state.set_score[1] else 1
+        return None
+
     def get_winner(self) -> Optional[str]:
         if self.is_match_over():
             winner_index = 0 if self.state.set_score[0] > self.state.set_score[1] else 1
@@ -274,6 +315,8 @@ class Match:
             winner = event.player if event.shot_outcome in [ShotOutcome.ACE, ShotOutcome.WINNER, ShotOutcome.FORCED_ERROR] else 1 - event.player
             self.play_point(event.shot_outcome, winner)
             self.update_stats(event)
+            self.last_point_winner = winner
+            self._state_dirty = True
     
     def is_point_over(self) -> bool:
         return len(self.current_point_events) > 0 and self.current_point_events[-1].shot_outcome not in [ShotOutcome.IN_PLAY, ShotOutcome.OUT]
@@ -294,6 +337,7 @@ class Match:
     def end_point(self):
         if self.is_point_over():
             self.current_point_events = []
+            self._state_dirty = True
             if self.is_game_over():
                 self.end_game()
 
@@ -323,6 +367,8 @@ class Match:
             self.state.is_match_tiebreak = True
 
     def end_match(self):
+        if not self.verbose:
+            return
         winner = self.get_winner()
         print(f"Match ended. Winner: {winner}")
         print(f"Final score: {self.get_score()}")
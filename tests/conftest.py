@@ -0,0 +1,85 @@
+# tests/conftest.py
+
+import pytest
+from joblib import dump
+
+@pytest.fixture(scope='session')
+def synthetic_data():
+    from train.data_generation import generate_synthetic_data
+    return generate_synthetic_data(400, seed=0)
+
+@pytest.fixture(scope='session')
+def model_path(tmp_path_factory, synthetic_data):
+    # A small random forest saved in the same layout as train_baseline_model
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+    X = synthetic_data.drop('outcome', axis=1)
+    y = synthetic_data['outcome']
+    numeric_features = X.select_dtypes(include=['number']).columns
+    categorical_features = X.select_dtypes(include=['category']).columns
+    boolean_features = X.select_dtypes(include=['bool']).columns
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), numeric_features),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features),
+            ('bool', 'passthrough', boolean_features)
+        ])
+    pipeline = Pipeline([
+        ('preprocessor', preprocessor),
+        ('model', RandomForestClassifier(n_estimators=10, max_depth=6, random_state=42))
+    ])
+    pipeline.fit(X, y)
+
+    path = tmp_path_factory.mktemp('models') / 'tennis_model_test.joblib'
+    dump({
+        'pipeline': pipeline,
+        'feature_names': X.columns.tolist(),
+        'numeric_features': numeric_features.tolist(),
+        'categorical_features': categorical_features.tolist(),
+        'boolean_features': boolean_features.tolist()
+    }, path)
+    return str(path)
+
+@pytest.fixture
+def feature_rows(synthetic_data):
+    rows = synthetic_data.drop('outcome', axis=1).head(20).to_dict('records')
+    # MLModel also expects the tiebreak flags that Match.get_current_state reports
+    for i, row in enumerate(rows):
+        row['is_tiebreak'] = i % 5 == 0
+        row['is_match_tiebreak'] = False
+    return rows
+
+@pytest.fixture
+def match():
+    from simulation.match import Match, Surface, Weather
+    from simulation.match_formats import create_match_format
+    from simulation.player import create_player, ShotType, Weakness, Strength, TournamentResult, InjurySeverity
+
+    def player(name, country, opponent):
+        return create_player(
+            name=name,
+            country=country,
+            stats={
+                'serve_accuracy': 0.65,
+                'groundstroke_accuracy': 0.75,
+                'volley_accuracy': 0.70,
+                'speed': 85,
+                'stamina': 90,
+                'mental_strength': 95
+            },
+            preferences={ShotType.FOREHAND: 0.6, ShotType.BACKHAND: 0.4},
+            atp_rank=3,
+            previous_atp_rank=4,
+            weaknesses=[Weakness.BACKHAND],
+            strengths=[Strength.FOREHAND, Strength.SERVE],
+            previous_tournament_results=[TournamentResult.WINNER],
+            current_injuries={"wrist": InjurySeverity.MINOR},
+            previous_injuries={},
+            wins_vs_opponents={opponent: 5}
+        )
+
+    return Match(player("Player1", "Spain", "Player2"), player("Player2", "USA", "Player1"),
+                 create_match_format('atp_1000'), Surface.CLAY, False, Weather.SUNNY, "France")
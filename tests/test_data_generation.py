@@ -0,0 +1,23 @@
+# tests/test_data_generation.py
+
+import pandas as pd
+from train.data_generation import generate_synthetic_data
+
+def test_schema(synthetic_data):
+    assert list(synthetic_data.columns[:4]) == ['surface', 'is_indoor', 'weather', 'event_country']
+    assert synthetic_data.columns[-1] == 'outcome'
+    assert synthetic_data['is_indoor'].dtype == bool
+    assert synthetic_data['set_score_1'].dtype == 'int8'
+    assert synthetic_data['player1_atp_rank'].dtype == 'int16'
+    assert synthetic_data['fatigue_1'].dtype == 'float32'
+    assert synthetic_data['outcome'].dtype == 'int8'
+    assert synthetic_data['player1_country'].dtype == 'category'
+    assert set(synthetic_data['set_score_1']) <= {0, 1, 2}
+    assert set(synthetic_data['outcome']) == {0, 1}
+    # Indoor matches always report indoor weather
+    assert (synthetic_data.loc[synthetic_data['is_indoor'], 'weather'] == 'indoor').all()
+    assert synthetic_data['player1_current_injuries'].isna().any()
+
+def test_seed_is_reproducible():
+    pd.testing.assert_frame_equal(generate_synthetic_data(100, seed=1), generate_synthetic_data(100, seed=1))
+    assert not generate_synthetic_data(100, seed=1).equals(generate_synthetic_data(100, seed=2))
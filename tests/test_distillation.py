@@ -0,0 +1,30 @@
+# tests/test_distillation.py
+
+import shutil
+import pytest
+from config import ML_MODEL_CONFIG
+from models.ml_model import MLModel, get_student_path
+
+@pytest.fixture
+def teacher_path(model_path, tmp_path, monkeypatch):
+    path = str(tmp_path / 'teacher.joblib')
+    shutil.copy(model_path, path)
+    monkeypatch.setitem(ML_MODEL_CONFIG['default'], 'path', path)
+    return path
+
+@pytest.mark.parametrize('student_type', ['linear', 'score_table'])
+def test_distilled_student_is_loadable(teacher_path, feature_rows, student_type):
+    from train.distillation import distill_model
+    report = distill_model('default', student_type, n_samples=500)
+    assert report['accuracy_gap'] == pytest.approx(report['teacher_accuracy'] - report['student_accuracy'])
+    assert 0.0 <= report['agreement'] <= 1.0
+
+    student = MLModel(teacher_path, use_student=True)
+    assert student.model_data['student_type'] == student_type
+    assert student.encoder is not None
+    predictions = student.predict_batch(feature_rows)
+    assert ((predictions >= 0) & (predictions <= 1)).all()
+    assert student.predict(feature_rows[0]) == pytest.approx(predictions[0])
+
+def test_student_path():
+    assert get_student_path('models/tennis_model_xgboost.joblib') == 'models/tennis_model_xgboost_student.joblib'
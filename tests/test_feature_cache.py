@@ -0,0 +1,29 @@
+# tests/test_feature_cache.py
+
+import numpy as np
+from train.feature_cache import prepare_features
+
+def test_repeat_run_loads_cached_features(synthetic_data, tmp_path):
+    first = prepare_features(synthetic_data, cache_dir=str(tmp_path), use_cache=True)
+    second = prepare_features(synthetic_data, cache_dir=str(tmp_path), use_cache=True)
+
+    assert not first['cache_hit'] and second['cache_hit']
+    assert isinstance(second['encoded_train'], np.memmap)
+    np.testing.assert_array_equal(second['encoded_train'], first['encoded_train'])
+    np.testing.assert_array_equal(second['y_test'], first['y_test'])
+    np.testing.assert_array_equal(second['test_index'], first['test_index'])
+    np.testing.assert_array_equal(second['preprocessor'].transform(synthetic_data.drop('outcome', axis=1)),
+                                  first['preprocessor'].transform(synthetic_data.drop('outcome', axis=1)))
+
+def test_settings_and_data_change_the_key(synthetic_data, tmp_path):
+    prepare_features(synthetic_data, cache_dir=str(tmp_path), use_cache=True)
+    assert not prepare_features(synthetic_data, dtype='float32', cache_dir=str(tmp_path), use_cache=True)['cache_hit']
+    assert not prepare_features(synthetic_data, test_size=0.3, cache_dir=str(tmp_path), use_cache=True)['cache_hit']
+    changed = synthetic_data.copy()
+    changed.loc[0, 'fatigue_1'] += 0.1
+    assert not prepare_features(changed, cache_dir=str(tmp_path), use_cache=True)['cache_hit']
+
+def test_cache_can_be_disabled(synthetic_data, tmp_path):
+    features = prepare_features(synthetic_data, cache_dir=str(tmp_path), use_cache=False)
+    assert features['train_path'] is None
+    assert not any(tmp_path.iterdir())
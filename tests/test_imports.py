@@ -0,0 +1,53 @@
+# tests/test_imports.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ['pandas', 'sklearn', 'xgboost', 'scipy']
+
+def run_python(code, *args):
+    result = subprocess.run(
+        [sys.executable, *args, '-c', code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return result
+
+def cumulative_import_time(module):
+    # -X importtime reports "self | cumulative | name" in microseconds on stderr
+    result = run_python(f"import {module}", '-X', 'importtime')
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"No import time reported for {module}")
+
+@pytest.mark.parametrize('statement', [
+    'import simulation',
+    'import models',
+    'import train',
+    'from simulation import Match, create_match_format',
+    'from models import OddsCalculator',
+    'from models import OddsPublisher',
+    'from models import OddsFeed',
+])
+def test_light_imports_do_not_load_ml_stack(statement):
+    code = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    loaded = run_python(code).stdout.strip()
+    assert loaded == ''
+
+def test_lazy_names_still_resolve():
+    code = (
+        "import simulation, models, train\n"
+        "print(simulation.SimulationEngine.__name__, models.MLModel.__name__, train.train_model.__name__)"
+    )
+    assert run_python(code).stdout.split() == ['SimulationEngine', 'MLModel', 'train_model']
+
+def test_import_time_benchmark():
+    sklearn = pytest.importorskip('sklearn')
+    light = max(cumulative_import_time('simulation'), cumulative_import_time('models'))
+    heavy = cumulative_import_time(sklearn.__name__)
+    assert light * 5 < heavy
@@ -0,0 +1,196 @@
+# tests/test_ml_model.py
+
+import os
+import pytest
+import numpy as np
+from models.ml_model import MLModel, load_model, clear_model_cache
+
+@pytest.fixture(autouse=True)
+def empty_model_cache():
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+def test_predict_returns_probability(model_path, feature_rows):
+    model = MLModel(model_path)
+    prediction = model.predict(feature_rows[0])
+    assert 0.0 <= prediction <= 1.0
+
+def test_predict_missing_feature(model_path, feature_rows):
+    model = MLModel(model_path)
+    features = dict(feature_rows[0])
+    del features['surface']
+    with pytest.raises(ValueError):
+        model.predict(features)
+
+def test_load_model_returns_shared_instance(model_path):
+    assert load_model(model_path) is load_model(model_path)
+
+def test_load_model_keeps_one_instance_per_load_mode(model_path):
+    mapped = load_model(model_path, mmap_mode='r')
+    in_memory = load_model(model_path, mmap_mode=None)
+    assert in_memory is not mapped and in_memory.mmap_mode is None
+    compact = load_model(model_path, dtype='float32')
+    assert compact is not mapped and compact.float_dtype == np.float32
+    assert load_model(model_path, dtype=np.float32) is compact
+
+def test_load_model_reloads_when_file_changes(model_path):
+    model = load_model(model_path)
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_model(model_path) is not model
+
+def test_mmap_and_regular_load_agree(model_path, feature_rows):
+    mapped = MLModel(model_path, mmap_mode='r')
+    loaded = MLModel(model_path, mmap_mode=None)
+    for features in feature_rows:
+        assert mapped.predict(features) == loaded.predict(features)
+
+def test_compiled_encoder_matches_column_transformer(model_path, feature_rows):
+    model = MLModel(model_path)
+    assert model.encoder is not None
+    preprocessor = model.pipeline.steps[0][1]
+    for features in feature_rows:
+        expected = preprocessor.transform(model._to_frame([features]))
+        assert (model.encoder.encode(features) == expected).all()
+
+def test_compiled_predict_matches_pipeline(model_path, feature_rows):
+    model = MLModel(model_path)
+    for features in feature_rows:
+        expected = model.pipeline.predict_proba(model._to_frame([features]))[0][1]
+        assert model.predict(features) == expected
+
+def test_compiled_encoder_ignores_unknown_categories(model_path, feature_rows):
+    model = MLModel(model_path)
+    features = dict(feature_rows[0], surface='carpet', current_shot_type=3)
+    preprocessor = model.pipeline.steps[0][1]
+    expected = preprocessor.transform(model._to_frame([features]))
+    assert (model.encoder.encode(features) == expected).all()
+
+def test_static_block_encoding_matches_full_encoding(model_path, feature_rows):
+    model = MLModel(model_path)
+    static_names = ['surface', 'is_indoor', 'weather', 'event_country', 'player1_country', 'player2_country',
+                    'player1_atp_rank', 'player2_atp_rank', 'average_winning_odd', 'average_losing_odd']
+    block = model.encode_static({f: feature_rows[0][f] for f in static_names})
+    assert model.encode_static({}, block) is block
+    for features in feature_rows[:5]:
+        features = dict(features, **{f: feature_rows[0][f] for f in static_names})
+        expected = model.encoder.encode(features).copy()
+        assert (model.encoder.encode(features, block) == expected).all()
+        assert model.predict(features, static=block) == model.predict(features)
+
+def test_predict_with_match_state(model_path, match):
+    model = MLModel(model_path)
+    block = model.encode_static(match.get_static_state())
+    state = match.get_current_state()
+    expected = model.pipeline.predict_proba(model._to_frame([state]))[0][1]
+    assert model.predict(state, static=block) == expected
+
+def test_predict_batch_matches_predict(model_path, feature_rows):
+    import pandas as pd
+    model = MLModel(model_path)
+    expected = [model.predict(features) for features in feature_rows]
+    assert list(model.predict_batch(feature_rows)) == expected
+    assert list(model.predict_batch(pd.DataFrame(feature_rows), chunk_size=7)) == expected
+    columns = {f: [row[f] for row in feature_rows] for f in feature_rows[0]}
+    assert list(model.predict_batch(columns, chunk_size=3)) == expected
+
+def test_predict_batch_accepts_encoded_matrix(model_path, feature_rows):
+    model = MLModel(model_path)
+    X = model.encoder.encode_batch(feature_rows)
+    preprocessor = model.pipeline.steps[0][1]
+    assert (X == preprocessor.transform(model._to_frame(feature_rows))).all()
+    assert list(model.predict_batch(X, chunk_size=8)) == list(model.predict_batch(feature_rows))
+
+def test_float32_serving_matches_float64(model_path, feature_rows):
+    reference = MLModel(model_path)
+    reduced = MLModel(model_path, dtype='float32')
+    assert reduced.encoder.encode_batch(feature_rows).dtype == np.float32
+    assert reduced.tree_ensemble.compact
+    np.testing.assert_allclose(reduced.predict_batch(feature_rows), reference.predict_batch(feature_rows), atol=1e-6)
+
+def test_downcast_features(synthetic_data):
+    from train.utils import downcast_features
+    X = downcast_features(synthetic_data.drop('outcome', axis=1))
+    assert X['fatigue_1'].dtype == np.float32
+    assert X['set_score_1'].dtype == np.int8
+    assert X['surface'].dtype == 'category'
+    assert X.memory_usage(deep=True).sum() < synthetic_data.memory_usage(deep=True).sum()
+
+def test_update_buffers_until_batch_is_full(model_path, feature_rows):
+    model = MLModel(model_path)
+    model.online_config['batch_size'] = 8
+    outcomes = [i % 2 for i in range(len(feature_rows))]
+    applied = [model.update(features, outcome) for features, outcome in zip(feature_rows, outcomes)]
+    assert applied == [(i + 1) % 8 == 0 for i in range(len(feature_rows))]
+
+def test_forest_update_keeps_trained_model(model_path, feature_rows):
+    model = MLModel(model_path)
+    n_trees = len(model.classifier.estimators_)
+    first_trees = [tree.random_state for tree in model.classifier.estimators_[1:]]
+    model.online_config['batch_size'] = len(feature_rows)
+    for i, features in enumerate(feature_rows):
+        model.update(features, i % 2)
+    assert len(model.classifier.estimators_) == n_trees
+    assert [tree.random_state for tree in model.classifier.estimators_[:-1]] == first_trees
+    # The compiled trees follow the updated forest
+    assert list(model.predict_batch(feature_rows)) == list(model.classifier.predict_proba(model.encoder.encode_batch(feature_rows))[:, 1])
+    # The loaded file is untouched
+    assert MLModel(model_path).classifier.estimators_[0] is not model.classifier.estimators_[0]
+
+def test_forest_update_waits_for_both_classes(model_path, feature_rows):
+    model = MLModel(model_path)
+    model.online_config['batch_size'] = 4
+    assert not any(model.update(features, 1) for features in feature_rows[:6])
+    assert model.update(feature_rows[6], 0)
+
+def test_partial_fit_update(model_path, feature_rows):
+    from sklearn.neural_network import MLPClassifier
+    model = MLModel(model_path)
+    X = model.encoder.encode_batch(feature_rows)
+    classifier = MLPClassifier(hidden_layer_sizes=(8,), max_iter=50, early_stopping=True, random_state=0)
+    classifier.fit(X, [i % 2 for i in range(len(X))])
+    model.pipeline.steps[-1] = ('model', classifier)
+    model._compile()
+    model.online_config['batch_size'] = 10
+    before = classifier.coefs_[0].copy()
+    for i, features in enumerate(feature_rows[:10]):
+        model.update(features, i % 2)
+    assert not (model.classifier.coefs_[0] == before).all()
+    assert model.classifier.early_stopping
+
+def test_refit_uses_recent_samples(model_path, feature_rows):
+    model = MLModel(model_path)
+    for i, features in enumerate(feature_rows):
+        model.update(features, i % 2)
+    model.refit()
+    assert 0.0 <= model.predict(feature_rows[0]) <= 1.0
+
+def test_xgboost_update_keeps_categorical_splits(synthetic_data, feature_rows, tmp_path):
+    import json
+    from joblib import dump
+    from sklearn.pipeline import Pipeline
+    from models.schema import apply_schema
+    from train.train_baseline_model import create_preprocessor, create_classifier, feature_metadata, category_vocabularies
+
+    X = apply_schema(synthetic_data.drop('outcome', axis=1), float_dtype='float64')
+    preprocessor = create_preprocessor(X, 'float64', 'ordinal')
+    classifier = create_classifier('xgboost', X, 'ordinal').set_params(n_estimators=5, max_depth=3)
+    pipeline = Pipeline([('preprocessor', preprocessor), ('model', classifier)]).fit(X, synthetic_data['outcome'])
+    path = tmp_path / 'ordinal_xgboost.joblib'
+    dump({'pipeline': pipeline, **feature_metadata(X), 'dtype': 'float64', 'encoding': 'ordinal',
+          'categories': category_vocabularies(preprocessor)}, path)
+
+    model = MLModel(str(path))
+    model.online_config.update(batch_size=len(feature_rows), boost_rounds=10)
+    for i, features in enumerate(feature_rows):
+        model.update(features, i % 2)
+
+    booster = model.classifier.get_booster()
+    assert booster.num_boosted_rounds() == 15
+    assert 'c' in booster.feature_types
+    trees = json.loads(booster.save_raw(raw_format='json'))['learner']['gradient_booster']['model']['trees']
+    assert any(tree['categories_nodes'] for tree in trees[5:])
+    # The compiled trees follow the updated booster
+    encoded = model.encoder.to_model_input(model.encoder.encode_batch(feature_rows))
+    np.testing.assert_allclose(model.predict_batch(feature_rows), model.classifier.predict_proba(encoded)[:, 1], atol=1e-6)
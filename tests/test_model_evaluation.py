@@ -0,0 +1,77 @@
+# tests/test_model_evaluation.py
+
+import numpy as np
+import pytest
+from joblib import load
+from sklearn.metrics import accuracy_score, brier_score_loss, f1_score, log_loss, precision_score, recall_score
+from models.metrics import calibration_table
+from train.model_evaluation import (ProbabilityMetrics, evaluate_model, evaluate_precision, evaluate_shards,
+                                    measure_throughput)
+
+def test_streamed_metrics_match_full_batch():
+    rng = np.random.default_rng(0)
+    outcomes = rng.integers(0, 2, 1000)
+    probabilities = rng.random(1000)
+    metrics = ProbabilityMetrics(n_bins=10)
+    for rows in np.array_split(np.arange(1000), 7):
+        metrics.add(outcomes[rows], probabilities[rows])
+    results = metrics.results()
+
+    predicted = probabilities >= 0.5
+    assert results['n_rows'] == 1000
+    assert results['accuracy'] == pytest.approx(accuracy_score(outcomes, predicted))
+    assert results['precision'] == pytest.approx(precision_score(outcomes, predicted))
+    assert results['recall'] == pytest.approx(recall_score(outcomes, predicted))
+    assert results['f1_score'] == pytest.approx(f1_score(outcomes, predicted))
+    assert results['log_loss'] == pytest.approx(log_loss(outcomes, probabilities))
+    assert results['brier_score'] == pytest.approx(brier_score_loss(outcomes, probabilities))
+    expected = calibration_table(outcomes, probabilities, n_bins=10)
+    assert [row['count'] for row in results['calibration']] == [row['count'] for row in expected]
+    assert [row['observed'] for row in results['calibration']] == pytest.approx([row['observed'] for row in expected])
+
+def test_evaluate_model_calls_predict_proba_once_per_chunk(model_path, synthetic_data):
+    pipeline = load(model_path)['pipeline']
+    X, y = synthetic_data.drop('outcome', axis=1), synthetic_data['outcome'].values
+
+    class Counting:
+        calls = 0
+
+        def predict_proba(self, X):
+            Counting.calls += 1
+            return pipeline.predict_proba(X)
+
+    chunked = evaluate_model(Counting(), X, y, chunk_size=150)
+    assert Counting.calls == 3
+    whole = evaluate_model(pipeline, X, y)
+    assert chunked['log_loss'] == pytest.approx(whole['log_loss'])
+    assert chunked['accuracy'] == pytest.approx(accuracy_score(y, pipeline.predict(X)))
+
+def test_evaluate_shards(model_path, tmp_path):
+    import pandas as pd
+    from train.shards import write_shards, read_shards
+
+    write_shards(str(tmp_path), 300, chunk_size=100, seed=3, n_jobs=1)
+    pipeline = load(model_path)['pipeline']
+    results = evaluate_shards(pipeline, str(tmp_path))
+
+    shards = list(read_shards(str(tmp_path)))
+    probabilities = np.concatenate([pipeline.predict_proba(s.drop('outcome', axis=1))[:, 1] for s in shards])
+    y = pd.concat(shards)['outcome'].values
+    assert results['n_rows'] == len(y) == 300
+    assert results['log_loss'] == pytest.approx(log_loss(y, probabilities))
+
+def test_measure_throughput(model_path, synthetic_data):
+    results = measure_throughput(model_path, synthetic_data.drop('outcome', axis=1), n_rows=20, batch_size=100, n_batches=3)
+    assert results['single_rows'] == 20
+    assert results['batch_rows'] == 300
+    assert 0 < results['single_p50_us'] <= results['single_p95_us'] <= results['single_p99_us']
+    assert results['batch_throughput'] > results['single_throughput'] > 0
+
+def test_evaluate_precision_compares_against_float64(model_path, synthetic_data):
+    X = synthetic_data.drop('outcome', axis=1)
+    # The generated frame is already float32
+    assert 'float64' not in set(map(str, X.dtypes))
+    results = evaluate_precision(model_path, X)
+    assert results['feature_bytes_float32'] < results['feature_bytes']
+    assert results['encoded_bytes_float32'] < results['encoded_bytes']
+    assert results['max_drift'] < 1e-4
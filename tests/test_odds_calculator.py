@@ -55,4 +55,37 @@ def test_calculate(odds_calculator):
     assert 'match_winner' in odds
     assert 'set_winner' in odds
     assert 'game_winner' in odds
-    assert all(len(o) == 2 for o in odds.values())  # Each should have odds for both players
\ No newline at end of file
+    assert all(len(o) == 2 for o in odds.values())  # Each should have odds for both players
+
+def test_calculate_batch_matches_calculate(odds_calculator):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    n = 200
+    predictions = np.concatenate([[0.0, 1.0], rng.random(n - 2)])
+    factors = rng.uniform(0.9, 1.1, n)
+    points = np.array(['0', '15', '30', '40', 'Ad', 'Adv'])
+    states = {
+        'set_score_1': rng.integers(0, 3, n),
+        'set_score_2': rng.integers(0, 3, n),
+        'game_score_1': rng.integers(0, 7, n),
+        'game_score_2': rng.integers(0, 7, n),
+        'server': rng.integers(0, 2, n),
+        'point_score_1': rng.choice(points, n),
+        'point_score_2': rng.choice(points, n)
+    }
+    batch = odds_calculator.calculate_batch(predictions, states, factors)
+
+    for i in range(n):
+        state = {name: values[i] for name, values in states.items()}
+        match_odds = odds_calculator.adjust_odds(odds_calculator.convert_probability_to_odds(predictions[i]), factors[i])
+        assert batch['match_winner'][i] == pytest.approx(match_odds)
+        assert batch['set_winner'][i] == pytest.approx(odds_calculator.calculate_set_odds(match_odds, state))
+        assert batch['game_winner'][i] == pytest.approx(odds_calculator.calculate_game_odds(match_odds, state))
+
+def test_calculate_batch_defaults(odds_calculator):
+    batch = odds_calculator.calculate_batch([0.6, 0.3], {})
+    for i, prediction in enumerate([0.6, 0.3]):
+        odds = odds_calculator.calculate(prediction, {}, [])
+        for market, values in odds.items():
+            assert batch[market][i] == pytest.approx(values)
@@ -0,0 +1,161 @@
+# tests/test_odds_feed.py
+
+import socket
+import threading
+import time
+import pytest
+from models.odds_feed import OddsFeed, Subscriber, subscribe, wait_for_subscribers
+
+class Collector:
+    """Local subscriber stand-in: reads a feed on a thread until it closes."""
+
+    def __init__(self, address, framing):
+        self.messages = []
+        self._thread = threading.Thread(target=self._run, args=(address, framing), daemon=True)
+        self._thread.start()
+
+    def _run(self, address, framing):
+        self.messages.extend(subscribe(address, framing, timeout=10))
+
+    def join(self):
+        self._thread.join(timeout=10)
+        return self.messages
+
+class StalledConnection:
+    """A client that accepts nothing until released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.data = b''
+
+    def settimeout(self, timeout):
+        pass
+
+    def send(self, data):
+        self.released.wait()
+        self.data += bytes(data)
+        return len(data)
+
+    def close(self):
+        self.released.set()
+
+@pytest.mark.parametrize('framing, address', [
+    ('ndjson', 'unix'),
+    ('binary', ('127.0.0.1', 0))
+])
+def test_subscribers_receive_every_message(tmp_path, framing, address):
+    if address == 'unix':
+        address = str(tmp_path / 'feed.sock')
+    feed = OddsFeed(address, framing=framing).start()
+    collectors = [Collector(feed.address, framing) for _ in range(3)]
+    assert wait_for_subscribers(feed, 3)
+    for i in range(100):
+        feed.publish({'type': 'odds', 'match_id': 'm1', 'odds': {'match_winner': [1.5 + i / 100, 2.5]}})
+    feed.close()
+
+    for collector in collectors:
+        messages = collector.join()
+        assert [m['seq'] for m in messages] == list(range(100))
+        assert messages[-1]['odds'] == {'match_winner': [2.49, 2.5]}
+    stats = feed.get_stats()
+    assert (stats['published'], stats['sent'], stats['dropped']) == (100, 300, 0)
+
+def test_full_queue_coalesces_updates_of_the_same_match():
+    import json
+
+    connection = StalledConnection()
+    subscriber = Subscriber(connection, queue_size=3, policy='coalesce')
+    subscriber.put(None, b'first\n')
+    # The writer takes the first frame and stalls sending it
+    deadline = time.monotonic() + 5
+    while subscriber._queue and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    def frame(message):
+        return json.dumps(message).encode() + b'\n'
+
+    subscriber.put(('m1', 'odds'), frame({'odds': 1}))
+    subscriber.put(('m1', 'score'), frame({'score': 1}))
+    subscriber.put(None, frame({'event': 1}))
+    subscriber.put(('m1', 'odds'), frame({'odds': 2}))    # replaces odds 1
+    subscriber.put(None, frame({'event': 2}))             # no update to replace: drops score 1
+    connection.released.set()
+    subscriber.close(wait=True)
+
+    lines = connection.data.split(b'\n')[:-1]
+    assert lines[0] == b'first'
+    assert [json.loads(line) for line in lines[1:]] == [{'event': 1}, {'odds': 2}, {'event': 2}]
+    assert (subscriber.coalesced, subscriber.dropped, subscriber.sent) == (1, 1, 4)
+
+def test_slow_subscriber_does_not_block_publishing():
+    feed = OddsFeed(('127.0.0.1', 0), queue_size=10, policy='drop', send_timeout=1.0).start()
+    stalled = socket.create_connection(feed.address)
+    assert wait_for_subscribers(feed, 1)
+    payload = 'x' * 1000
+    start = time.perf_counter()
+    for i in range(20000):
+        feed.publish({'type': 'event', 'match_id': 'm1', 'payload': payload})
+    seconds = time.perf_counter() - start
+    stats = feed.get_stats()
+    feed.close()
+    stalled.close()
+
+    # 20 MB were offered to a client that reads nothing
+    assert seconds < 5
+    assert stats['dropped'] > 0
+    assert stats['sent'] + stats['dropped'] <= 20000
+
+def test_slow_but_steady_subscriber_stays_connected():
+    server, client = socket.socketpair()
+    subscriber = Subscriber(server, queue_size=10, policy='drop', send_timeout=0.3)
+    frame = b'x' * (4 * 1024 * 1024) + b'\n'
+    subscriber.put(None, frame)
+    received = 0
+    # Reading the frame takes well over send_timeout, but no single write waits that long
+    while received < len(frame):
+        chunk = client.recv(256 * 1024)
+        if not chunk:
+            break
+        received += len(chunk)
+        time.sleep(0.02)
+    subscriber.close(wait=True)
+    client.close()
+
+    assert received == len(frame)
+    assert subscriber.sent == 1
+
+def test_engine_streams_events_scores_and_odds():
+    import numpy as np
+    from models.odds_calculator import OddsCalculator
+    from models.odds_publisher import OddsPublisher
+    from simulation.engine import SimulationEngine
+    from simulation.match import Surface, Weather
+    from simulation.match_formats import create_match_format
+    from train.simulation_data import random_player
+
+    class ConstantModel:
+        def encode_static(self, static_state, previous):
+            return previous
+
+        def predict(self, features, static=None):
+            return 0.6
+
+    feed = OddsFeed(('127.0.0.1', 0)).start()
+    collector = Collector(feed.address, 'ndjson')
+    assert wait_for_subscribers(feed, 1)
+    rng = np.random.default_rng(2)
+    engine = SimulationEngine(random_player(rng, 'Player1', 'Player2'), random_player(rng, 'Player2', 'Player1'),
+                              create_match_format('atp_1000'), Surface.CLAY, False, Weather.SUNNY, 'FRA',
+                              ConstantModel(), OddsCalculator(), verbose=False,
+                              odds_publisher=OddsPublisher(window=0), feed=feed, match_id='m1')
+    engine.run_simulation()
+    feed.close()
+
+    messages = collector.join()
+    assert [m['seq'] for m in messages] == list(range(len(messages)))
+    assert {m['match_id'] for m in messages} == {'m1'}
+    types = [m['type'] for m in messages]
+    assert {'event', 'score', 'odds'} <= set(types)
+    assert types.count('odds') == engine.odds_publisher.get_stats()['emitted']
+    scores = [m['score'] for m in messages if m['type'] == 'score']
+    assert scores[-1] == engine.match.get_score()
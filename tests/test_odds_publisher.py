@@ -0,0 +1,92 @@
+# tests/test_odds_publisher.py
+
+import numpy as np
+import pytest
+from config import ODDS_PUBLISHER_CONFIG
+from models.odds_publisher import OddsPublisher, round_to_ladder
+
+def odds(match_winner, game_winner=(2.0, 2.0)):
+    return {'match_winner': list(match_winner), 'game_winner': list(game_winner)}
+
+@pytest.mark.parametrize('price, expected', [
+    (1.0, 1.01), (1.234, 1.23), (1.999, 2.0), (2.517, 2.52), (3.12, 3.1),
+    (7.33, 7.4), (64.0, 65.0), (5000.0, 1000.0)
+])
+def test_round_to_ladder(price, expected):
+    assert round_to_ladder(price, ODDS_PUBLISHER_CONFIG['ladder'], ODDS_PUBLISHER_CONFIG['min_odds']) == expected
+
+def test_only_tick_changes_are_published():
+    published = []
+    publisher = OddsPublisher(published.append, window=0)
+    assert publisher.update(odds([1.501, 2.99]), now=0) == odds([1.5, 3.0])
+    # Both prices stay on the same ticks
+    assert publisher.update(odds([1.503, 2.995]), now=1) is None
+    assert publisher.update(odds([1.52, 2.941]), now=2) == odds([1.52, 2.94])
+    assert published == [odds([1.5, 3.0]), odds([1.52, 2.94])]
+    stats = publisher.get_stats()
+    assert (stats['updates'], stats['emitted'], stats['suppressed'], stats['coalesced']) == (3, 2, 1, 0)
+
+def test_bursts_are_coalesced_within_the_window():
+    published = []
+    publisher = OddsPublisher(published.append, window=1.0)
+    publisher.update(odds([1.5, 3.0]), now=0.0)
+    assert publisher.update(odds([1.6, 2.6]), now=0.1) is None
+    assert publisher.update(odds([1.7, 2.4]), now=0.2) is None
+    assert publisher.update(odds([1.7, 2.4]), now=0.5) is None
+    # The window has passed: the last change goes out on the next offer
+    assert publisher.update(odds([1.7, 2.4]), now=1.2) == odds([1.7, 2.4])
+    assert published == [odds([1.5, 3.0]), odds([1.7, 2.4])]
+    stats = publisher.get_stats()
+    assert (stats['emitted'], stats['suppressed'], stats['coalesced'], stats['pending']) == (2, 2, 1, 0)
+
+def test_change_reverted_within_the_window_is_dropped():
+    published = []
+    publisher = OddsPublisher(published.append, window=1.0)
+    publisher.update(odds([1.5, 3.0]), now=0.0)
+    publisher.update(odds([1.6, 2.6]), now=0.1)
+    publisher.update(odds([1.5, 3.0]), now=0.2)
+    assert publisher.poll(now=2.0) is None
+    assert publisher.flush(now=2.0) is None
+    assert published == [odds([1.5, 3.0])]
+
+def test_flush_publishes_the_held_update():
+    published = []
+    publisher = OddsPublisher(published.append, window=10.0)
+    publisher.update(odds([1.5, 3.0]), now=0.0)
+    publisher.update(odds([1.6, 2.6]), now=0.1)
+    assert publisher.get_stats()['pending'] == 1
+    assert publisher.flush(now=0.2) == odds([1.6, 2.6])
+    assert published[-1] == odds([1.6, 2.6])
+
+def test_engine_publishes_tick_changes():
+    from models.odds_calculator import OddsCalculator
+    from simulation.engine import SimulationEngine
+    from simulation.match import Surface, Weather
+    from simulation.match_formats import create_match_format
+    from train.simulation_data import random_player
+
+    class DriftingModel:
+        # Probabilities that drift by less than a tick most of the time
+        def __init__(self):
+            self.probability = 0.5
+            self.rng = np.random.default_rng(0)
+
+        def encode_static(self, static_state, previous):
+            return previous
+
+        def predict(self, features, static=None):
+            self.probability = min(0.95, max(0.05, self.probability + self.rng.normal(0, 0.002)))
+            return self.probability
+
+    rng = np.random.default_rng(1)
+    published = []
+    publisher = OddsPublisher(published.append, window=0)
+    engine = SimulationEngine(random_player(rng, 'Player1', 'Player2'), random_player(rng, 'Player2', 'Player1'),
+                              create_match_format('atp_1000'), Surface.HARD, False, Weather.SUNNY, 'USA',
+                              DriftingModel(), OddsCalculator(), verbose=False, odds_publisher=publisher)
+    engine.run_simulation()
+
+    stats = publisher.get_stats()
+    assert stats['updates'] == stats['emitted'] + stats['suppressed']
+    assert 0 < stats['emitted'] < stats['updates']
+    assert published[-1] == publisher.to_ticks(engine.current_odds)
@@ -0,0 +1,61 @@
+# tests/test_orchestrator.py
+
+import numpy as np
+import pytest
+from config import ML_MODEL_CONFIG
+from models.ml_model import MLModel
+from models.schema import apply_schema
+from train.orchestrator import train_all_models, thread_budgets
+
+def test_thread_budgets():
+    assert thread_budgets(['a', 'b', 'c'], n_cores=8) == {'a': 3, 'b': 3, 'c': 2}
+    assert thread_budgets(['a', 'b', 'c'], n_cores=2) == {'a': 1, 'b': 1, 'c': 1}
+
+def test_models_share_one_preprocessor(synthetic_data, feature_rows, tmp_path, monkeypatch):
+    model_names = ['default', 'experimental']
+    for name in model_names:
+        monkeypatch.setitem(ML_MODEL_CONFIG[name], 'path', str(tmp_path / f'{name}.joblib'))
+    results = train_all_models(model_names, data=synthetic_data, n_cores=2, use_cache=False)
+
+    assert set(results) == set(model_names)
+    models = [MLModel(ML_MODEL_CONFIG[name]['path']) for name in model_names]
+    assert type(models[0].classifier).__name__ == 'RandomForestClassifier'
+    assert type(models[1].classifier).__name__ == 'MLPClassifier'
+    # The same fitted preprocessor was saved with both models
+    np.testing.assert_array_equal(models[0].encoder.means, models[1].encoder.means)
+    for model in models:
+        assert 0.0 <= model.predict(feature_rows[0]) <= 1.0
+
+def test_ordinal_encoding(synthetic_data, tmp_path, monkeypatch):
+    model_names = ['default', 'xgboost']
+    for name in model_names:
+        monkeypatch.setitem(ML_MODEL_CONFIG[name], 'path', str(tmp_path / f'{name}.joblib'))
+    train_all_models(model_names, data=synthetic_data, n_cores=1, use_cache=False, encoding='ordinal')
+
+    X = synthetic_data.drop('outcome', axis=1)
+    # The pipeline of a float64 model takes float64 features, as in training
+    X_float64 = apply_schema(X, float_dtype='float64')
+    for name in model_names:
+        model = MLModel(ML_MODEL_CONFIG[name]['path'])
+        # One column per feature, and the vocabularies saved with the model
+        assert model.encoder.n_columns == X.shape[1]
+        assert model.model_data['categories']['surface'] == list(X['surface'].cat.categories)
+        assert model.tree_ensemble is not None
+        np.testing.assert_allclose(model.predict_batch(X), model.pipeline.predict_proba(X_float64)[:, 1], atol=1e-6)
+
+    with pytest.raises(ValueError):
+        train_all_models(['experimental'], data=synthetic_data, n_cores=1, use_cache=False, encoding='ordinal')
+
+def test_ordinal_xgboost_from_string_columns(synthetic_data, tmp_path, monkeypatch):
+    # Frames from elsewhere may hold plain strings instead of categoricals
+    df = synthetic_data.copy()
+    for column in df.select_dtypes(include=['category']).columns:
+        df[column] = df[column].astype(object)
+    monkeypatch.setitem(ML_MODEL_CONFIG['xgboost'], 'path', str(tmp_path / 'xgboost.joblib'))
+    train_all_models(['xgboost'], data=df, n_cores=1, use_cache=False, encoding='ordinal')
+
+    model = MLModel(ML_MODEL_CONFIG['xgboost']['path'])
+    assert 'c' in model.classifier.get_booster().feature_types
+    X = df.drop('outcome', axis=1)
+    np.testing.assert_allclose(model.predict_batch(X), model.pipeline.predict_proba(apply_schema(X, 'float64'))[:, 1],
+                               atol=1e-6)
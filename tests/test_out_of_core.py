@@ -0,0 +1,53 @@
+# tests/test_out_of_core.py
+
+import pytest
+from config import ML_MODEL_CONFIG
+from models.ml_model import MLModel
+from train.shards import write_shards
+from train.out_of_core import ShardReader, fit_preprocessor, fit_random_forest, train_from_shards
+
+@pytest.fixture(scope='module')
+def shard_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp('shards')
+    write_shards(str(path), 600, chunk_size=200, seed=3, n_jobs=1)
+    return str(path)
+
+def test_split_is_stable_and_disjoint(shard_dir):
+    reader = ShardReader(shard_dir, test_size=0.25)
+    X_train, _ = reader.read(1)
+    X_test, _ = reader.read(1, part='test')
+    assert len(X_train) + len(X_test) == 200
+    assert not set(X_train.index) & set(X_test.index)
+    assert list(reader.read(1)[0].index) == list(X_train.index)
+
+def test_scaler_matches_in_memory_fit(shard_dir):
+    import numpy as np
+    import pandas as pd
+
+    reader = ShardReader(shard_dir)
+    preprocessor = fit_preprocessor(reader)
+    X = pd.concat([X for X, _ in reader.iter_shards()])
+    scaler = preprocessor.named_transformers_['num']
+    np.testing.assert_allclose(scaler.mean_, X[scaler.feature_names_in_].mean().values)
+
+def test_forest_needs_a_shard_with_both_classes(shard_dir, monkeypatch):
+    import numpy as np
+
+    reader = ShardReader(shard_dir)
+    preprocessor = fit_preprocessor(reader)
+    shards = [(X, np.ones(len(y), dtype=int)) for X, y in reader.iter_shards()]
+    monkeypatch.setattr(reader, 'iter_shards', lambda part='train': iter(shards))
+    with pytest.raises(ValueError, match='single class'):
+        fit_random_forest(reader, preprocessor, random_state=0)
+
+@pytest.mark.parametrize('model_name', ['default', 'experimental', 'xgboost'])
+def test_models_train_from_shards(shard_dir, feature_rows, tmp_path, monkeypatch, model_name):
+    monkeypatch.setitem(ML_MODEL_CONFIG[model_name], 'path', str(tmp_path / 'model.joblib'))
+    results = train_from_shards(shard_dir, [model_name], epochs=2)
+
+    assert results[model_name]['accuracy'] > 0.5
+    model = MLModel(str(tmp_path / 'model.joblib'))
+    assert type(model.classifier).__name__ == {'default': 'RandomForestClassifier',
+                                               'experimental': 'MLPClassifier',
+                                               'xgboost': 'XGBClassifier'}[model_name]
+    assert 0.0 <= model.predict(feature_rows[0]) <= 1.0
@@ -0,0 +1,47 @@
+# tests/test_prediction_cache.py
+
+import pytest
+from models.ml_model import MLModel
+from models.prediction_cache import CachedModel
+
+@pytest.fixture
+def model(model_path):
+    return MLModel(model_path)
+
+def test_repeated_state_hits_cache(model, feature_rows):
+    cached = CachedModel(model, quantize=False)
+    first = cached.predict(feature_rows[0])
+    assert cached.predict(feature_rows[0]) == first == model.predict(feature_rows[0])
+    assert cached.get_stats()['hits'] == 1
+    assert cached.get_stats()['misses'] == 1
+    assert cached.hit_rate == 0.5
+
+def test_quantization_shares_nearby_states(model, feature_rows):
+    cached = CachedModel(model, quantization={'current_ball_speed': 10.0})
+    features = dict(feature_rows[0], current_ball_speed=101.0)
+    nearby = dict(features, current_ball_speed=103.0)
+    prediction = cached.predict(features)
+    assert cached.predict(nearby) == prediction
+    assert prediction == model.predict(dict(features, current_ball_speed=100.0))
+    assert cached.hits == 1
+
+def test_exact_mode_distinguishes_nearby_states(model, feature_rows):
+    cached = CachedModel(model, quantize=False)
+    cached.predict(dict(feature_rows[0], current_ball_speed=101.0))
+    cached.predict(dict(feature_rows[0], current_ball_speed=103.0))
+    assert cached.hits == 0
+
+def test_cache_is_bounded(model, feature_rows):
+    cached = CachedModel(model, max_size=5, quantize=False)
+    for features in feature_rows:
+        cached.predict(features)
+    stats = cached.get_stats()
+    assert stats['size'] == 5
+    assert stats['evictions'] == len(feature_rows) - 5
+
+def test_static_block_keys(model, match):
+    cached = CachedModel(model)
+    block = cached.encode_static(match.get_static_state())
+    state = match.get_current_state()
+    assert cached.predict(state, static=block) == cached.predict(state, static=block)
+    assert cached.hits == 1
@@ -0,0 +1,80 @@
+# tests/test_retraining.py
+
+import os
+from models.ml_model import MLModel, load_model
+from models.prediction_cache import CachedModel
+from models.retraining import RetrainingService, retrain_model
+
+class StubEngine:
+    def __init__(self, ml_model=None):
+        self.ml_model = ml_model
+
+    def set_model(self, ml_model):
+        if hasattr(self.ml_model, 'swap_model'):
+            self.ml_model.swap_model(ml_model)
+        else:
+            self.ml_model = ml_model
+
+def labelled(feature_rows):
+    return [(row, i % 2) for i, row in enumerate(feature_rows)]
+
+def test_retrain_model_saves_versioned_pipeline(model_path, feature_rows, tmp_path):
+    output_path = str(tmp_path / 'retrained.joblib')
+    samples = labelled(feature_rows)
+    report = retrain_model(model_path, output_path, samples, samples, version=3)
+
+    assert report['accepted']
+    assert report['holdout_log_loss'] <= report['base_log_loss']
+    assert report['version'] == 3
+    assert report['n_samples'] == len(feature_rows)
+    retrained = MLModel(output_path)
+    assert retrained.model_data['version'] == 3
+    assert 0.0 <= retrained.predict(feature_rows[0]) <= 1.0
+    # The classifier is extended; the fitted preprocessing is kept
+    original = MLModel(model_path)
+    assert (retrained.pipeline.steps[0][1].named_transformers_['num'].mean_ ==
+            original.pipeline.steps[0][1].named_transformers_['num'].mean_).all()
+    assert len(retrained.classifier.estimators_) == len(original.classifier.estimators_)
+
+def test_retrain_model_rejects_a_worse_model(model_path, feature_rows, tmp_path):
+    output_path = str(tmp_path / 'retrained.joblib')
+    samples = labelled(feature_rows)
+    holdout = [(row, 1 - outcome) for row, outcome in samples]
+    report = retrain_model(model_path, output_path, samples, holdout, version=1)
+
+    assert not report['accepted']
+    assert report['holdout_log_loss'] > report['base_log_loss']
+    assert report['model_path'] is None
+    assert not os.path.exists(output_path)
+
+def test_service_swaps_retrained_model_into_engines(model_path, feature_rows, tmp_path):
+    service = RetrainingService(model_path=model_path, retrain_interval=len(feature_rows), output_dir=str(tmp_path),
+                                holdout_fraction=0.5)
+    plain = StubEngine()
+    cached = StubEngine(CachedModel(None))
+    service.register(plain)
+    service.register(cached)
+    assert plain.ml_model is load_model(model_path)
+    assert cached.ml_model.model is load_model(model_path)
+
+    try:
+        # Every other match is held out, and the held-out states are also
+        # trained on with the same label, so the retrained model scores
+        # better. The third match brings the samples to retrain_interval.
+        service.record_match(feature_rows[:10], 0)
+        service.record_match(feature_rows[:10], 0)
+        assert not service.reports and service._future is None
+        service.record_match(feature_rows[10:], 1)
+        assert service.wait(timeout=120)
+    finally:
+        service.shutdown()
+
+    assert len(service.reports) == 1
+    report = service.reports[0]
+    assert report['accepted'] and report['n_samples'] == len(feature_rows) and report['n_holdout'] == 10
+    assert report['model_path'] == os.path.join(str(tmp_path), 'tennis_model_test_v1.joblib')
+    assert report['swap_latency_ms'] >= 0
+    assert service.version == 1
+    assert plain.ml_model is service.model
+    assert cached.ml_model.model is service.model
+    assert plain.ml_model is not load_model(model_path)
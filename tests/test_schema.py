@@ -0,0 +1,32 @@
+# tests/test_schema.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from models.schema import FEATURE_SCHEMA, apply_schema, cast_column, memory_report
+
+def test_generated_columns_follow_the_schema(synthetic_data):
+    for name, dtype in synthetic_data.dtypes.items():
+        assert str(dtype) == FEATURE_SCHEMA[name]
+
+def test_integers_outside_the_range_are_rejected():
+    assert cast_column('set_score_1', [0, 1, 2]).dtype == np.int8
+    with pytest.raises(ValueError):
+        cast_column('set_score_1', [0, 300])
+
+def test_apply_schema(synthetic_data):
+    wide = synthetic_data.astype({name: 'float64' for name in synthetic_data.select_dtypes('number').columns})
+    compact = apply_schema(wide)
+    pd.testing.assert_frame_equal(compact, synthetic_data)
+    assert apply_schema(wide, float_dtype='float64')['fatigue_1'].dtype == np.float64
+    # Columns outside the schema are downcast by kind
+    extra = apply_schema(pd.DataFrame({'rally_length': np.arange(10), 'current_shot_type': [1] * 10}))
+    assert extra['rally_length'].dtype == np.int8
+    assert list(extra['current_shot_type'].cat.categories) == ['1']
+
+def test_memory_report(synthetic_data):
+    report = memory_report(synthetic_data)
+    assert list(report.index) == list(synthetic_data.columns)
+    assert report.loc['set_score_1', 'bytes'] == len(synthetic_data)
+    assert report.loc['set_score_1', 'default_bytes'] == 8 * len(synthetic_data)
+    assert report['bytes'].sum() < report['default_bytes'].sum()
@@ -0,0 +1,89 @@
+# tests/test_shadow.py
+
+import numpy as np
+import pytest
+from models.ml_model import MLModel
+from models.prediction_cache import CachedModel
+from models.metrics import calibration_table, expected_calibration_error, log_loss
+from models.shadow import ShadowEvaluator
+
+def test_metrics():
+    outcomes = np.array([1, 0, 1, 0])
+    probabilities = np.array([0.9, 0.1, 0.6, 0.4])
+    assert log_loss(outcomes, probabilities) == pytest.approx(-np.mean(np.log([0.9, 0.9, 0.6, 0.6])))
+    table = calibration_table(outcomes, probabilities, n_bins=2)
+    assert [row['count'] for row in table] == [2, 2]
+    assert table[1]['observed'] == 1.0
+    assert expected_calibration_error(table) == pytest.approx(0.25)
+
+def test_shadow_scores_the_primary_states(model_path, feature_rows):
+    primary = MLModel(model_path)
+    shadow = MLModel(model_path, compile_trees=False)
+    cached = CachedModel(primary, quantize=False)
+    evaluator = ShadowEvaluator(cached, {'shadow': shadow}, batch_size=8)
+
+    predictions = []
+    for i, row in enumerate(feature_rows):
+        predictions.append(evaluator.predict(row))
+        if i % 4 == 3:
+            evaluator.record_match(i // 4 % 2)
+    evaluator.close()
+    report = evaluator.get_report()
+
+    assert predictions == [primary.predict(row) for row in feature_rows]
+    assert report['primary']['n_predictions'] == report['shadow']['n_predictions'] == len(feature_rows)
+    # Same model, so the shadow's scores match the primary's
+    assert report['shadow']['log_loss'] == pytest.approx(report['primary']['log_loss'])
+    assert report['shadow']['throughput'] > 0
+    assert sum(row['count'] for row in report['shadow']['calibration']) == len(feature_rows)
+    # The primary is timed on its own model in batches, like the shadows;
+    # only the live calls went through the cache
+    assert cached.hits + cached.misses == len(feature_rows)
+    assert report['primary']['throughput'] > 0 and report['primary']['live_latency_us'] > 0
+    # Scores are kept as running sums, not per prediction
+    assert not any(isinstance(value, list) for value in vars(evaluator.stats['shadow']).values())
+
+def test_shadow_delegates_to_primary(model_path, feature_rows):
+    primary = CachedModel(MLModel(model_path))
+    evaluator = ShadowEvaluator(primary, {})
+    assert evaluator.get_stats() == primary.get_stats()
+    replacement = MLModel(model_path)
+    evaluator.swap_model(replacement)
+    assert primary.model is replacement
+    evaluator.close()
+
+def test_states_are_labelled_with_the_match_winner():
+    from models.odds_calculator import OddsCalculator
+    from simulation.engine import SimulationEngine
+    from simulation.match import Surface, Weather
+    from simulation.match_formats import create_match_format
+    from train.simulation_data import random_player
+
+    class ConstantModel:
+        def encode_static(self, static_state, previous):
+            return previous
+
+        def predict(self, features, static=None):
+            return 0.6
+
+        def predict_batch(self, states):
+            return np.full(len(states), 0.6)
+
+    class Oracle:
+        # Knows who won, so it can only score well against match-winner labels
+        def predict_batch(self, states):
+            return np.full(len(states), 1.0 if engine.match.get_winner_index() == 0 else 0.0)
+
+    rng = np.random.default_rng(3)
+    evaluator = ShadowEvaluator(ConstantModel(), {'oracle': Oracle()})
+    engine = SimulationEngine(random_player(rng, 'Player1', 'Player2'), random_player(rng, 'Player2', 'Player1'),
+                              create_match_format('atp_1000'), Surface.HARD, False, Weather.SUNNY, 'USA',
+                              evaluator, OddsCalculator(), verbose=False)
+    engine.run_simulation()
+    evaluator.close()
+    report = evaluator.get_report()
+
+    assert report['oracle']['n_predictions'] == report['primary']['n_predictions'] > 0
+    assert report['oracle']['log_loss'] < 1e-6
+    assert report['oracle']['brier_score'] == 0.0
+    assert report['oracle']['accuracy'] == 1.0
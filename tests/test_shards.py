@@ -0,0 +1,23 @@
+# tests/test_shards.py
+
+import pandas as pd
+from train.data_generation import generate_synthetic_data, iter_synthetic_data
+from train.shards import write_shards, read_shards, load_manifest
+
+def test_chunks_are_reproducible():
+    chunks = list(iter_synthetic_data(250, 100, seed=7))
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    for chunk, again in zip(chunks, iter_synthetic_data(250, 100, seed=7)):
+        pd.testing.assert_frame_equal(chunk, again)
+    assert list(chunks[0].columns) == list(generate_synthetic_data(10, seed=0).columns)
+
+def test_shards_round_trip(tmp_path):
+    manifest = write_shards(str(tmp_path), 250, chunk_size=100, seed=7, n_jobs=2)
+    assert manifest == load_manifest(str(tmp_path))
+    assert [shard['n_rows'] for shard in manifest['shards']] == [100, 100, 50]
+
+    for shard, chunk in zip(read_shards(str(tmp_path)), iter_synthetic_data(250, 100, seed=7)):
+        pd.testing.assert_frame_equal(shard, chunk)
+    subset = next(read_shards(str(tmp_path), columns=['surface', 'outcome']))
+    assert list(subset.columns) == ['surface', 'outcome']
+    assert subset['surface'].dtype == 'category'
@@ -83,4 +83,21 @@ def test_update_player_stats(simulation_engine):
     event = simulation_engine.generate_next_event()
     simulation_engine.update_player_stats(event)
     assert simulation_engine.match.players[0].confidence != initial_confidence
-    assert simulation_engine.match.players[0].fatigue > initial_fatigue
\ No newline at end of file
+    assert simulation_engine.match.players[0].fatigue > initial_fatigue
+
+def test_current_state_is_cached_until_point_ends(match):
+    from simulation.events import TennisEvent, ShotType as EventShotType, ShotOutcome
+    state = match.get_current_state()
+    match.update_state(TennisEvent(0, EventShotType.SERVE_1ST, ShotOutcome.IN_PLAY, 120, 2000))
+    assert match.get_current_state() is state
+
+    match.update_state(TennisEvent(1, EventShotType.FOREHAND, ShotOutcome.WINNER, 100, 2500))
+    updated = match.get_current_state()
+    assert updated is not state
+    assert updated['point_score_2'] == '15'
+    assert updated['player2_winners'] == 1
+
+def test_current_state_combines_static_and_dynamic(match):
+    state = match.get_current_state()
+    assert state == {**match.get_static_state(), **match.get_dynamic_state()}
+    assert match.get_static_state() is match.get_static_state()
@@ -0,0 +1,26 @@
+# tests/test_simulation_data.py
+
+import pandas as pd
+from train.simulation_data import generate_simulation_data
+from train.shards import write_shards, read_shards
+
+def test_rows_match_current_state_schema(match):
+    df = generate_simulation_data(2, seed=3)
+    assert list(df.columns) == list(match.get_current_state()) + ['outcome']
+    assert set(df['outcome']) <= {0, 1}
+    # Every match starts at 0-0 with player 1 serving
+    first_points = df[(df['set_score_1'] + df['set_score_2'] + df['game_score_1'] + df['game_score_2'] == 0) &
+                      (df['point_score_1'] == '0') & (df['point_score_2'] == '0')]
+    assert len(first_points) >= 2
+    pd.testing.assert_frame_equal(df, generate_simulation_data(2, seed=3))
+
+def test_headless_engine_prints_nothing(capsys):
+    generate_simulation_data(1, seed=0)
+    assert capsys.readouterr().out == ''
+
+def test_simulation_shards(tmp_path):
+    manifest = write_shards(str(tmp_path), 3, chunk_size=2, seed=5, generator=generate_simulation_data)
+    shards = list(read_shards(str(tmp_path)))
+    assert manifest['generator'] == 'train.simulation_data.generate_simulation_data'
+    assert manifest['n_rows'] == sum(len(shard) for shard in shards)
+    assert shards[0]['player1_country'].dtype == 'category'
@@ -0,0 +1,72 @@
+# tests/test_tree_ensemble.py
+
+import numpy as np
+import pytest
+from models.ml_model import MLModel
+from models.tree_ensemble import FlatTreeEnsemble, export_ensemble
+
+@pytest.fixture
+def encoded(model_path, synthetic_data):
+    model = MLModel(model_path, compile_trees=False)
+    X = model.pipeline.steps[0][1].transform(synthetic_data.drop('outcome', axis=1))
+    return model, X, synthetic_data['outcome'].values
+
+def test_random_forest_matches_sklearn(encoded):
+    model, X, _ = encoded
+    ensemble = export_ensemble(model.classifier)
+    assert ensemble.n_trees == len(model.classifier.estimators_)
+    expected = model.classifier.predict_proba(X)
+    assert (ensemble.predict_proba(X)[:, 1] == expected[:, 1]).all()
+    np.testing.assert_allclose(ensemble.predict_proba(X)[:, 0], expected[:, 0])
+
+def test_single_row_matches_batch(encoded):
+    model, X, _ = encoded
+    ensemble = export_ensemble(model.classifier)
+    batch = ensemble.predict_proba(X[:10])
+    for i in range(10):
+        assert (ensemble.predict_proba(X[i]) == batch[i]).all()
+
+def test_compact_ensemble_keeps_split_decisions(encoded):
+    model, X, _ = encoded
+    ensemble = export_ensemble(model.classifier)
+    compact = ensemble.to_compact()
+    assert compact.threshold.dtype == np.float32 and compact.left.dtype == np.int32
+    assert compact.nbytes < 0.6 * ensemble.nbytes
+    assert (compact.leaves(X) == ensemble.leaves(X)).all()
+    np.testing.assert_allclose(compact.predict_proba(X), ensemble.predict_proba(X), atol=1e-6)
+
+def test_xgboost_matches_booster(encoded):
+    xgboost = pytest.importorskip('xgboost')
+    _, X, y = encoded
+    classifier = xgboost.XGBClassifier(n_estimators=20, max_depth=4, random_state=42).fit(X, y)
+    ensemble = FlatTreeEnsemble.from_xgboost(classifier)
+    np.testing.assert_allclose(ensemble.predict_proba(X), classifier.predict_proba(X), atol=1e-6)
+
+def test_xgboost_categorical_splits_match_booster():
+    xgboost = pytest.importorskip('xgboost')
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 10, 2000), rng.normal(size=2000), rng.integers(0, 6, 2000)]).astype(float)
+    y = (np.isin(X[:, 0], [1, 3, 7]) ^ (X[:, 1] > 0.5) ^ (X[:, 2] > 3)).astype(int)
+    X[::11, 2] = np.nan
+    classifier = xgboost.XGBClassifier(n_estimators=20, max_depth=4, enable_categorical=True,
+                                       feature_types=['c', 'q', 'c'], tree_method='hist').fit(X, y)
+    ensemble = FlatTreeEnsemble.from_xgboost(classifier)
+    assert ensemble.category_set is not None
+
+    # Unseen, negative and missing codes included
+    X_test = np.column_stack([rng.integers(-1, 12, 500), rng.normal(size=500), rng.integers(0, 6, 500)]).astype(float)
+    X_test[::7, 0] = np.nan
+    np.testing.assert_allclose(ensemble.predict_proba(X_test), classifier.predict_proba(X_test), atol=1e-6)
+    np.testing.assert_allclose(ensemble.to_compact().predict_proba(X_test), classifier.predict_proba(X_test), atol=1e-6)
+
+def test_unsupported_model(encoded):
+    from sklearn.linear_model import LogisticRegression
+    _, X, y = encoded
+    with pytest.raises(ValueError):
+        export_ensemble(LogisticRegression().fit(X, y))
+
+def test_ml_model_uses_compiled_trees(model_path, feature_rows):
+    compiled = MLModel(model_path)
+    reference = MLModel(model_path, compile_trees=False)
+    assert compiled.tree_ensemble is not None and reference.tree_ensemble is None
+    assert list(compiled.predict_batch(feature_rows)) == list(reference.predict_batch(feature_rows))
@@ -0,0 +1,50 @@
+# tests/test_tuning.py
+
+import numpy as np
+from joblib import dump
+from train import tuning
+from train.tuning import resource_schedule, tune_model
+
+def test_resource_schedule_grows_to_all_rows():
+    assert resource_schedule(10000, 27, 3, 500) == [500, 1500, 10000]
+    assert resource_schedule(400, 27, 3, 500) == [400]
+
+def test_search_resumes_from_saved_state(synthetic_data, tmp_path):
+    params = dict(data=synthetic_data, state_dir=str(tmp_path), use_cache=False,
+                  n_candidates=4, factor=2, cv=2, min_resources=40, n_jobs=1)
+    first = tune_model('neural_network', **params)
+    assert [r['n_candidates'] for r in first['rounds']] == [4, 2]
+    assert first['rounds'][-1]['n_rows'] == 160
+    assert first['best_log_loss'] > 0
+
+    # Every fold score is saved, so a second run has nothing left to fit
+    second = tune_model('neural_network', **params)
+    assert second['best_params'] == first['best_params']
+    assert second['best_log_loss'] == first['best_log_loss']
+    assert second['seconds'] < first['seconds']
+
+def test_xgboost_stops_on_training_rows_not_the_scored_fold(tmp_path, monkeypatch):
+    from xgboost import XGBClassifier
+
+    fits = []
+
+    class Recording(XGBClassifier):
+        def fit(self, X, y, **kwargs):
+            fits.append((X, kwargs['eval_set'][0][0]))
+            return super().fit(X, y, **kwargs)
+
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 4)).astype(np.float32)
+    y = (X[:, 0] > 0.5).astype(int)
+    dump((X, y), str(tmp_path / 'data.joblib'))
+    np.savez(str(tmp_path / 'folds.npz'), train_0=rng.permutation(150), valid_0=np.arange(150, 200))
+    monkeypatch.setattr(tuning, 'create_model', lambda model_type: Recording(n_estimators=20))
+
+    score = tuning.evaluate_candidate('xgboost', {}, str(tmp_path / 'data.joblib'), str(tmp_path / 'folds.npz'), 0, 100)
+    fit_X, stopping_X = fits[0]
+    assert score > 0
+    assert len(fit_X) + len(stopping_X) == 100
+    # Column 0 is unique per row: the stopping rows are training rows left
+    # out of the fit, and none of them is in the scored fold
+    assert not set(stopping_X[:, 0]) & set(fit_X[:, 0])
+    assert not set(stopping_X[:, 0]) & set(X[150:, 0])
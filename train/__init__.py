@@ -1,18 +1,54 @@
 # train/__init__.py
 
+import importlib
+
 from config import VERSION as __version__
 
-# Import main functions from submodules
-from .data_generation import generate_synthetic_data
-from .model_evaluation import evaluate_model, print_evaluation_results
-from .utils import split_data, create_pipeline
-from .train_baseline_model import train_model
+# Submodules import scikit-learn, xgboost and scipy, so they are only
+# imported the first time one of their functions is accessed.
+_LAZY_IMPORTS = {
+    'generate_synthetic_data': '.data_generation',
+    'iter_synthetic_data': '.data_generation',
+    'generate_simulation_data': '.simulation_data',
+    'write_shards': '.shards',
+    'read_shards': '.shards',
+    'evaluate_model': '.model_evaluation',
+    'print_evaluation_results': '.model_evaluation',
+    'evaluate_probabilities': '.model_evaluation',
+    'measure_throughput': '.model_evaluation',
+    'split_data': '.utils',
+    'create_pipeline': '.utils',
+    'train_model': '.train_baseline_model',
+    'train_all_models': '.orchestrator',
+    'tune_model': '.tuning',
+    'train_from_shards': '.out_of_core'
+}
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
 
 __all__ = [
     'generate_synthetic_data',
+    'iter_synthetic_data',
+    'generate_simulation_data',
+    'write_shards',
+    'read_shards',
     'evaluate_model',
     'print_evaluation_results',
+    'evaluate_probabilities',
+    'measure_throughput',
     'split_data',
     'create_pipeline',
-    'train_model'
-]
\ No newline at end of file
+    'train_model',
+    'train_all_models',
+    'tune_model',
+    'train_from_shards'
+]
@@ -1,83 +1,116 @@
 # train/data_generation.py
 
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
 import numpy as np
 import pandas as pd
-from typing import List, Dict
+from typing import Dict, Iterator, Optional
+from models.schema import cast_column
+
+SKILLS = ['forehand', 'backhand', 'serve', 'volley']
+TOURNAMENT_RESULTS = ['winner', 'finalist', 'semifinalist', 'quarterfinalist', 'early_exit']
+INJURY_LEVELS = [None, 'minor', 'moderate', 'severe']
+PLAYER_COUNTRIES = ['USA', 'Spain', 'Serbia', 'Switzerland', 'UK', 'France', 'Germany', 'Russia', 'Japan', 'Australia']
+SURFACES = ['hard', 'clay', 'grass']
+WEATHER_CONDITIONS = ['sunny', 'cloudy', 'windy', 'rainy']
+EVENT_COUNTRIES = ['USA', 'France', 'UK', 'Australia', 'Spain', 'Italy', 'Germany', 'China']
+SHOT_TYPES = ['serve', 'forehand', 'backhand', 'volley']
 
-def generate_player_data() -> Dict[str, any]:
+def categorical(rng: np.random.Generator, choices: list, n: int, p=None) -> pd.Categorical:
+    # Draw category codes; None choices become missing values
+    categories = sorted(c for c in choices if c is not None)
+    lookup = np.array([categories.index(c) if c is not None else -1 for c in choices], dtype=np.int8)
+    return pd.Categorical.from_codes(lookup[rng.choice(len(choices), size=n, p=p)], categories=categories)
+
+def generate_player_data(rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
     return {
-        'serve_accuracy': np.random.uniform(0.5, 0.8),
-        'ground_accuracy': np.random.uniform(0.6, 0.9),
-        'atp_rank': np.random.randint(1, 200),
-        'previous_atp_rank': np.random.randint(1, 200),
-        'weakness': np.random.choice(['forehand', 'backhand', 'serve', 'volley']),
-        'strength': np.random.choice(['forehand', 'backhand', 'serve', 'volley']),
-        'previous_tournament_results': np.random.choice(['winner', 'finalist', 'semifinalist', 'quarterfinalist', 'early_exit']),
-        'current_injuries': np.random.choice([None, 'minor', 'moderate', 'severe'], p=[0.7, 0.2, 0.08, 0.02]),
-        'previous_injuries': np.random.choice([None, 'minor', 'moderate', 'severe'], p=[0.5, 0.3, 0.15, 0.05]),
-        'country': np.random.choice(['USA', 'Spain', 'Serbia', 'Switzerland', 'UK', 'France', 'Germany', 'Russia', 'Japan', 'Australia'])
+        'serve_accuracy': rng.uniform(0.5, 0.8, n),
+        'ground_accuracy': rng.uniform(0.6, 0.9, n),
+        'atp_rank': rng.integers(1, 200, n),
+        'previous_atp_rank': rng.integers(1, 200, n),
+        'weakness': categorical(rng, SKILLS, n),
+        'strength': categorical(rng, SKILLS, n),
+        'previous_tournament_results': categorical(rng, TOURNAMENT_RESULTS, n),
+        'current_injuries': categorical(rng, INJURY_LEVELS, n, p=[0.7, 0.2, 0.08, 0.02]),
+        'previous_injuries': categorical(rng, INJURY_LEVELS, n, p=[0.5, 0.3, 0.15, 0.05]),
+        'country': categorical(rng, PLAYER_COUNTRIES, n)
+    }
+
+def generate_synthetic_data(n_matches: int = 10000, seed: Optional[int] = None) -> pd.DataFrame:
+    """One row per match state, each column drawn as a single array and
+    stored in its models.schema dtype.
+
+    seed is anything np.random.default_rng accepts (an int or a Generator);
+    the same seed always produces the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    player1 = generate_player_data(rng, n_matches)
+    player2 = generate_player_data(rng, n_matches)
+
+    is_indoor = rng.random(n_matches) < 0.5
+    weather = categorical(rng, WEATHER_CONDITIONS, n_matches).add_categories('indoor').reorder_categories(
+        sorted(WEATHER_CONDITIONS + ['indoor']))
+    weather[is_indoor] = 'indoor'
+
+    match_data = {
+        'surface': categorical(rng, SURFACES, n_matches),
+        'is_indoor': is_indoor,
+        'weather': weather,
+        'event_country': categorical(rng, EVENT_COUNTRIES, n_matches),
+        'average_winning_odd': rng.uniform(1.1, 3.0, n_matches),
+        'average_losing_odd': rng.uniform(1.5, 5.0, n_matches),
+        'player1_wins_vs_opponent': rng.integers(0, 10, n_matches),
+        'player2_wins_vs_opponent': rng.integers(0, 10, n_matches),
+        'set_score_1': rng.integers(0, 3, n_matches),
+        'set_score_2': rng.integers(0, 3, n_matches),
+        'game_score_1': rng.integers(0, 6, n_matches),
+        'game_score_2': rng.integers(0, 6, n_matches),
+        'fatigue_1': rng.uniform(0, 1, n_matches),
+        'fatigue_2': rng.uniform(0, 1, n_matches),
+        'current_shot_type': categorical(rng, SHOT_TYPES, n_matches),
+        'current_ball_speed': rng.uniform(60, 160, n_matches),  # km/h
+        'current_ball_spin': rng.uniform(1000, 4000, n_matches),  # rpm
     }
+    match_data.update({f'player1_{k}': v for k, v in player1.items()})
+    match_data.update({f'player2_{k}': v for k, v in player2.items()})
+
+    # Determine point outcome (1 if player 1 wins, 0 if player 2 wins)
+    player1_strength = player1['serve_accuracy'] + player1['ground_accuracy'] - match_data['fatigue_1']
+    player2_strength = player2['serve_accuracy'] + player2['ground_accuracy'] - match_data['fatigue_2']
+    outcome = player1_strength > player2_strength
+
+    # Add some randomness to the outcome (10% chance of upset)
+    outcome ^= rng.random(n_matches) < 0.1
+
+    match_data['outcome'] = outcome
+    # Columns are cast to their schema dtypes one at a time, before the
+    # frame is built, so the wide intermediates are freed early
+    return pd.DataFrame({name: cast_column(name, match_data.pop(name)) for name in list(match_data)})
+
+def iter_synthetic_data(n_matches: int, chunk_size: int, seed: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yield generate_synthetic_data frames of at most chunk_size rows.
+
+    Each chunk is drawn from its own child of seed's SeedSequence, so chunk
+    i is the same whether chunks are generated here, in order, or by
+    separate processes (see chunk_seeds).
+    """
+    for (start, stop), chunk_seed in zip(chunk_bounds(n_matches, chunk_size), chunk_seeds(n_matches, chunk_size, seed)):
+        yield generate_synthetic_data(stop - start, seed=chunk_seed)
+
+def chunk_bounds(n_matches: int, chunk_size: int) -> list:
+    return [(start, min(start + chunk_size, n_matches)) for start in range(0, n_matches, chunk_size)]
+
+def chunk_seeds(n_matches: int, chunk_size: int, seed: Optional[int] = None) -> list:
+    return np.random.SeedSequence(seed).spawn(len(chunk_bounds(n_matches, chunk_size)))
+
+if __name__ == "__main__":
+    from models.schema import memory_report, print_memory_report
 
-def generate_synthetic_data(n_matches: int = 10000) -> pd.DataFrame:
-    data = []
-    surfaces = ['hard', 'clay', 'grass']
-    weather_conditions = ['sunny', 'cloudy', 'windy', 'rainy']
-    
-    for _ in range(n_matches):
-        player1 = generate_player_data()
-        player2 = generate_player_data()
-        
-        surface = np.random.choice(surfaces)
-        is_indoor = np.random.choice([True, False])
-        weather = 'indoor' if is_indoor else np.random.choice(weather_conditions)
-        
-        match_data = {
-            'surface': surface,
-            'is_indoor': is_indoor,
-            'weather': weather,
-            'event_country': np.random.choice(['USA', 'France', 'UK', 'Australia', 'Spain', 'Italy', 'Germany', 'China']),
-            'average_winning_odd': np.random.uniform(1.1, 3.0),
-            'average_losing_odd': np.random.uniform(1.5, 5.0),
-            'player1_wins_vs_opponent': np.random.randint(0, 10),
-            'player2_wins_vs_opponent': np.random.randint(0, 10),
-            'set_score_1': np.random.randint(0, 3),
-            'set_score_2': np.random.randint(0, 3),
-            'game_score_1': np.random.randint(0, 6),
-            'game_score_2': np.random.randint(0, 6),
-            'fatigue_1': np.random.uniform(0, 1),
-            'fatigue_2': np.random.uniform(0, 1),
-            'current_shot_type': np.random.choice(['serve', 'forehand', 'backhand', 'volley']),
-            'current_ball_speed': np.random.uniform(60, 160),  # km/h
-            'current_ball_spin': np.random.uniform(1000, 4000),  # rpm
-        }
-        
-        match_data.update({f'player1_{k}': v for k, v in player1.items()})
-        match_data.update({f'player2_{k}': v for k, v in player2.items()})
-        
-        # Determine point outcome (1 if player 1 wins, 0 if player 2 wins)
-        player1_strength = player1['serve_accuracy'] + player1['ground_accuracy'] - match_data['fatigue_1']
-        player2_strength = player2['serve_accuracy'] + player2['ground_accuracy'] - match_data['fatigue_2']
-        outcome = 1 if player1_strength > player2_strength else 0
-        
-        # Add some randomness to the outcome
-        if np.random.random() < 0.1:  # 10% chance of upset
-            outcome = 1 - outcome
-        
-        match_data['outcome'] = outcome
-        data.append(match_data)
-    
-    df = pd.DataFrame(data)
-    
-    # Handle categorical variables
-    categorical_columns = ['surface', 'weather', 'event_country', 'player1_weakness', 'player1_strength', 
-                           'player1_previous_tournament_results', 'player1_current_injuries', 'player1_previous_injuries', 
-                           'player1_country', 'player2_weakness', 'player2_strength', 'player2_previous_tournament_results', 
-                           'player2_current_injuries', 'player2_previous_injuries', 'player2_country', 'current_shot_type']
-    
-    for col in categorical_columns:
-        df[col] = df[col].astype('category')
-    
-    # Ensure boolean type for is_indoor
-    df['is_indoor'] = df['is_indoor'].astype(bool)
-    
-    return df
\ No newline at end of file
+    # Rows to generate; prints the memory of each column
+    n_matches = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print_memory_report(memory_report(generate_synthetic_data(n_matches, seed=0)))
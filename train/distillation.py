@@ -0,0 +1,106 @@
+# train/distillation.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import time
+import numpy as np
+from sklearn.pipeline import Pipeline
+from joblib import dump
+from config import ML_MODEL_CONFIG
+from models.ml_model import MLModel, get_student_path
+from models.students import LinearStudent, ScoreTableStudent
+from train.data_generation import generate_synthetic_data
+
+SCORE_STATE_FEATURES = ['set_score_1', 'set_score_2', 'game_score_1', 'game_score_2']
+
+def create_student(student_type, teacher):
+    if student_type == 'linear':
+        return LinearStudent()
+    elif student_type == 'score_table':
+        columns = [int(teacher.encoder.numeric_columns[teacher.encoder.numeric_features.index(f)])
+                   for f in SCORE_STATE_FEATURES if f in teacher.encoder.numeric_features]
+        return ScoreTableStudent(columns=columns)
+    else:
+        raise ValueError(f"Unsupported student type: {student_type}")
+
+def measure_latency(model, states, repeats=3):
+    # Median single-row predict time in microseconds
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for features in states:
+            model.predict(features)
+        timings.append((time.perf_counter() - start) / len(states) * 1e6)
+    return float(np.median(timings))
+
+def distill_model(model_name, student_type='linear', n_samples=50000, test_size=0.2, random_state=42):
+    """Fit a small student to the teacher's probabilities and save it next
+    to the teacher, returning the accuracy/latency report."""
+    print(f"Distilling {model_name} model into a {student_type} student...")
+    teacher_path = ML_MODEL_CONFIG[model_name]['path']
+    teacher = MLModel(teacher_path)
+    if teacher.encoder is None:
+        raise ValueError(f"Model {model_name} has no compiled feature encoder to distill from")
+
+    # Teacher probabilities on a large simulated dataset are the targets
+    df = generate_synthetic_data(n_samples, seed=random_state)
+    y = df['outcome'].values
+    X = teacher.encoder.encode_batch(df.drop('outcome', axis=1))
+    teacher_proba = teacher.predict_batch(X, chunk_size=10000)
+
+    n_test = int(len(X) * test_size)
+    X_train, X_test = X[n_test:], X[:n_test]
+    student = create_student(student_type, teacher)
+    student.fit(X_train, teacher_proba[n_test:])
+    student_proba = student.predict_proba(X_test)[:, 1]
+
+    # Save in the same layout as the teacher, so MLModel loads it as is
+    pipeline = Pipeline([
+        ('preprocessor', teacher.pipeline.steps[0][1]),
+        ('model', student)
+    ])
+    model_data = {key: value for key, value in teacher.model_data.items() if key != 'pipeline'}
+    model_data.update({'pipeline': pipeline, 'teacher_path': teacher_path, 'student_type': student_type})
+
+    teacher_accuracy = float(np.mean((teacher_proba[:n_test] >= 0.5) == y[:n_test]))
+    student_accuracy = float(np.mean((student_proba >= 0.5) == y[:n_test]))
+    report = {
+        'teacher_accuracy': teacher_accuracy,
+        'student_accuracy': student_accuracy,
+        'accuracy_gap': teacher_accuracy - student_accuracy,
+        'agreement': float(np.mean((student_proba >= 0.5) == (teacher_proba[:n_test] >= 0.5))),
+        'mean_abs_error': float(np.mean(np.abs(student_proba - teacher_proba[:n_test])))
+    }
+    model_data['distillation_report'] = report
+
+    student_path = get_student_path(teacher_path)
+    dump(model_data, student_path)
+
+    states = df.drop('outcome', axis=1).head(200).to_dict('records')
+    report['teacher_latency_us'] = measure_latency(teacher, states)
+    report['student_latency_us'] = measure_latency(MLModel(student_path), states)
+    print_distillation_report(report)
+    print(f"Student saved to {student_path}")
+    return report
+
+def print_distillation_report(report):
+    print("Distillation Results:")
+    print(f"Teacher Accuracy: {report['teacher_accuracy']:.4f}")
+    print(f"Student Accuracy: {report['student_accuracy']:.4f}")
+    print(f"Accuracy Gap: {report['accuracy_gap']:.4f}")
+    print(f"Agreement With Teacher: {report['agreement']:.4f}")
+    print(f"Mean Absolute Probability Error: {report['mean_abs_error']:.4f}")
+    if 'teacher_latency_us' in report:
+        print(f"Teacher Latency: {report['teacher_latency_us']:.1f} us/prediction")
+        print(f"Student Latency: {report['student_latency_us']:.1f} us/prediction")
+
+if __name__ == "__main__":
+    student_type = sys.argv[1] if len(sys.argv) > 1 else 'linear'
+    for model_name, model_config in ML_MODEL_CONFIG.items():
+        if os.path.exists(model_config['path']):
+            distill_model(model_name, student_type)
@@ -0,0 +1,114 @@
+# train/feature_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from joblib import dump, load
+from config import FEATURE_CACHE_CONFIG
+from train.train_baseline_model import create_preprocessor
+from models.schema import apply_schema
+
+# Encoded train/test matrices and the fitted preprocessor, saved under
+# cache_dir/<key>/ where key hashes the dataset and the preprocessing
+# settings. Entries are written uncompressed so they load memory-mapped.
+
+def dataset_key(data, df: Optional[pd.DataFrame] = None) -> str:
+    """Identify a dataset: a shard directory by its manifest, a DataFrame by
+    its contents."""
+    if isinstance(data, str):
+        from train.shards import MANIFEST_NAME
+        with open(os.path.join(data, MANIFEST_NAME), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    df = data if df is None else df
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(repr(list(df.dtypes.items())).encode())
+    return digest.hexdigest()
+
+def cache_key(dataset_id: str, preprocessor, dtype: str, test_size: float, random_state: int) -> str:
+    params = sorted(preprocessor.get_params(deep=True).items())
+    settings = json.dumps({'dataset': dataset_id, 'dtype': dtype, 'test_size': test_size,
+                           'random_state': random_state, 'preprocessor': repr(params)})
+    return hashlib.sha256(settings.encode()).hexdigest()[:32]
+
+def load_features(key: str, cache_dir: Optional[str] = None) -> Optional[Dict]:
+    path = os.path.join(cache_dir or FEATURE_CACHE_CONFIG['cache_dir'], key)
+    if not os.path.isdir(path):
+        return None
+    encoded_train, y_train = load(os.path.join(path, 'train.joblib'), mmap_mode='r')
+    encoded_test, y_test, test_index = load(os.path.join(path, 'test.joblib'), mmap_mode='r')
+    return {
+        'preprocessor': load(os.path.join(path, 'preprocessor.joblib')),
+        'train_path': os.path.join(path, 'train.joblib'),
+        'encoded_train': encoded_train,
+        'y_train': y_train,
+        'encoded_test': encoded_test,
+        'y_test': y_test,
+        'test_index': test_index,
+        'cache_hit': True
+    }
+
+def save_features(key: str, features: Dict, cache_dir: Optional[str] = None) -> str:
+    cache_dir = cache_dir or FEATURE_CACHE_CONFIG['cache_dir']
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key)
+    # Written next to the final location and renamed, so concurrent runs
+    # never see a partial entry
+    tmp_path = tempfile.mkdtemp(dir=cache_dir, prefix=f'.{key}.')
+    try:
+        dump(features['preprocessor'], os.path.join(tmp_path, 'preprocessor.joblib'))
+        dump((features['encoded_train'], features['y_train']), os.path.join(tmp_path, 'train.joblib'))
+        dump((features['encoded_test'], features['y_test'], features['test_index']), os.path.join(tmp_path, 'test.joblib'))
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another run saved the same entry first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+    return path
+
+def prepare_features(df: pd.DataFrame, dtype: str = 'float64', test_size: float = 0.2, random_state: int = 42,
+                     dataset_id: Optional[str] = None, cache_dir: Optional[str] = None,
+                     use_cache: Optional[bool] = None, encoding: str = 'onehot') -> Dict:
+    """Split df, fit the preprocessor on the training part and encode both
+    parts, or load all of that from the cache.
+
+    Returns the fitted preprocessor, the encoded matrices, the labels and
+    the test rows' index; train_path is the cached (encoded_train, y_train)
+    file when there is one.
+    """
+    use_cache = FEATURE_CACHE_CONFIG['enabled'] if use_cache is None else use_cache
+    X = df.drop('outcome', axis=1)
+    # Floats in the training dtype, so the preprocessor computes in it
+    X = apply_schema(X, float_dtype=dtype)
+    preprocessor = create_preprocessor(X, dtype, encoding)
+
+    key = None
+    if use_cache:
+        key = cache_key(dataset_id or dataset_key(df), preprocessor, dtype, test_size, random_state)
+        features = load_features(key, cache_dir)
+        if features is not None:
+            return features
+
+    X_train, X_test, y_train, y_test = train_test_split(X, df['outcome'].values, test_size=test_size,
+                                                        random_state=random_state)
+    preprocessor.fit(X_train)
+    features = {
+        'preprocessor': preprocessor,
+        'train_path': None,
+        'encoded_train': preprocessor.transform(X_train),
+        'y_train': y_train,
+        'encoded_test': preprocessor.transform(X_test),
+        'y_test': y_test,
+        'test_index': np.asarray(X_test.index),
+        'cache_hit': False
+    }
+    if key is not None:
+        path = save_features(key, features, cache_dir)
+        features['train_path'] = os.path.join(path, 'train.joblib')
+    return features
@@ -1,25 +1,148 @@
 # train/model_evaluation.py
 
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-
-def evaluate_model(model, X_test, y_test):
-    y_pred = model.predict(X_test)
-    
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred)
-    recall = recall_score(y_test, y_pred)
-    f1 = f1_score(y_test, y_pred)
-    
-    return {
-        'accuracy': accuracy,
-        'precision': precision,
-        'recall': recall,
-        'f1_score': f1
-    }
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import numpy as np
+from config import EVALUATION_CONFIG
+from models.metrics import ProbabilityMetrics
+
+def _take(X, rows: slice):
+    # Rows of a DataFrame or an array
+    return X.iloc[rows] if hasattr(X, 'iloc') else X[rows]
+
+def iter_batches(X, y, chunk_size: Optional[int] = None) -> Iterator[Tuple]:
+    """(X, y) in consecutive chunks of chunk_size rows."""
+    chunk_size = chunk_size or EVALUATION_CONFIG['chunk_size']
+    for start in range(0, len(y), chunk_size):
+        rows = slice(start, start + chunk_size)
+        yield _take(X, rows), np.asarray(y)[rows]
+
+def evaluate_probabilities(model, batches: Iterable[Tuple], n_bins: Optional[int] = None) -> Dict:
+    """Score model on an iterable of (X, y) batches, calling predict_proba
+    once per batch; decisions are the probabilities thresholded at 0.5."""
+    metrics = ProbabilityMetrics(n_bins or EVALUATION_CONFIG['calibration_bins'])
+    for X, y in batches:
+        metrics.add(y, model.predict_proba(X)[:, 1])
+    return metrics.results()
+
+def evaluate_model(model, X_test, y_test, chunk_size: Optional[int] = None):
+    return evaluate_probabilities(model, iter_batches(X_test, y_test, chunk_size))
+
+def evaluate_shards(model, data_dir):
+    """evaluate_model over a sharded dataset (see train/shards.py), loading
+    one shard at a time."""
+    from train.shards import read_shards
+
+    return evaluate_probabilities(model, ((shard.drop('outcome', axis=1), shard['outcome'].values)
+                                          for shard in read_shards(data_dir)))
 
 def print_evaluation_results(results):
     print("Model Evaluation Results:")
     print(f"Accuracy: {results['accuracy']:.4f}")
     print(f"Precision: {results['precision']:.4f}")
     print(f"Recall: {results['recall']:.4f}")
-    print(f"F1 Score: {results['f1_score']:.4f}")
\ No newline at end of file
+    print(f"F1 Score: {results['f1_score']:.4f}")
+    if 'log_loss' in results:
+        print(f"Log-Loss: {results['log_loss']:.4f}")
+        print(f"Brier Score: {results['brier_score']:.4f}")
+        print(f"Expected Calibration Error: {results['expected_calibration_error']:.4f}")
+        for row in results['calibration']:
+            low, high = row['bin']
+            print(f"  [{low:.1f}, {high:.1f}): {row['count']} rows, predicted {row['mean_predicted']:.3f}, "
+                  f"observed {row['observed']:.3f}")
+
+def measure_throughput(model_path, X, n_rows: Optional[int] = None, batch_size: Optional[int] = None,
+                       n_batches: Optional[int] = None) -> Dict:
+    """Latency percentiles and throughput of the model saved at model_path
+    as it is served: MLModel.predict on the first n_rows rows of X one state
+    dict at a time, as in the live pricing loop, and MLModel.predict_batch
+    on the first n_batches batches of batch_size rows."""
+    from models.ml_model import MLModel
+
+    model = MLModel(model_path)
+    n_rows = min(n_rows or EVALUATION_CONFIG['latency_rows'], len(X))
+    batch_size = batch_size or EVALUATION_CONFIG['batch_size']
+    n_batches = n_batches or EVALUATION_CONFIG['latency_batches']
+    # States and batches are prepared before timing, as a server receives them
+    states = _take(X, slice(0, n_rows)).to_dict('records')
+    n_batch_rows = min(len(X), batch_size * n_batches)
+    batches = [_take(X, slice(start, start + batch_size)) for start in range(0, n_batch_rows, batch_size)]
+    model.predict(states[0])  # warm-up
+
+    single = np.empty(n_rows)
+    for i, state in enumerate(states):
+        start = time.perf_counter()
+        model.predict(state)
+        single[i] = time.perf_counter() - start
+    batched = np.empty(len(batches))
+    for i, batch in enumerate(batches):
+        start = time.perf_counter()
+        model.predict_batch(batch)
+        batched[i] = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(single, [50, 95, 99]) * 1e6
+    batch_p50, batch_p95, batch_p99 = np.percentile(batched, [50, 95, 99]) * 1e3
+    return {
+        'single_rows': n_rows,
+        'single_p50_us': float(p50),
+        'single_p95_us': float(p95),
+        'single_p99_us': float(p99),
+        'single_throughput': n_rows / single.sum(),
+        'batch_size': batch_size,
+        'batch_rows': n_batch_rows,
+        'batch_p50_ms': float(batch_p50),
+        'batch_p95_ms': float(batch_p95),
+        'batch_p99_ms': float(batch_p99),
+        'batch_throughput': n_batch_rows / batched.sum()
+    }
+
+def print_throughput_results(results):
+    print("Serving Throughput:")
+    print(f"Single Row (MLModel.predict): p50 {results['single_p50_us']:.1f} us, p95 {results['single_p95_us']:.1f} us, "
+          f"p99 {results['single_p99_us']:.1f} us ({results['single_throughput']:.0f} rows/s)")
+    print(f"Batches of {results['batch_size']} (MLModel.predict_batch): p50 {results['batch_p50_ms']:.2f} ms, "
+          f"p95 {results['batch_p95_ms']:.2f} ms, p99 {results['batch_p99_ms']:.2f} ms "
+          f"({results['batch_throughput']:.0f} rows/s)")
+
+def evaluate_precision(model_path, X_test):
+    """Memory and prediction drift of float32 serving against float64 for
+    the model saved at model_path."""
+    from models.ml_model import MLModel
+    from models.schema import apply_schema
+
+    reference = MLModel(model_path, dtype='float64')
+    reduced = MLModel(model_path, dtype='float32')
+    # X_test may already be float32 (the generators emit the schema dtypes),
+    # so both frames are cast explicitly
+    X_full = apply_schema(X_test, float_dtype='float64')
+    X_compact = apply_schema(X_test, float_dtype='float32')
+    encoded = reference.encoder.encode_batch(X_full) if reference.encoder is not None else None
+    encoded_compact = reduced.encoder.encode_batch(X_compact) if reduced.encoder is not None else None
+
+    reference_proba = reference.predict_batch(X_full)
+    reduced_proba = reduced.predict_batch(X_compact)
+    drift = np.abs(reduced_proba - reference_proba)
+    results = {
+        'feature_bytes': int(X_full.memory_usage(deep=True).sum()),
+        'feature_bytes_float32': int(X_compact.memory_usage(deep=True).sum()),
+        'max_drift': float(drift.max()),
+        'mean_drift': float(drift.mean()),
+        'decision_changes': int(np.sum((reduced_proba >= 0.5) != (reference_proba >= 0.5)))
+    }
+    if encoded is not None:
+        results['encoded_bytes'] = encoded.nbytes
+        results['encoded_bytes_float32'] = encoded_compact.nbytes
+    if reference.tree_ensemble is not None:
+        results['tree_bytes'] = reference.tree_ensemble.nbytes
+        results['tree_bytes_float32'] = reduced.tree_ensemble.nbytes
+    return results
+
+def print_precision_results(results):
+    print("Reduced Precision Results:")
+    for name, label in [('feature', 'Feature Frame'), ('encoded', 'Encoded Features'), ('tree', 'Tree Ensemble')]:
+        if f'{name}_bytes' in results:
+            full, reduced = results[f'{name}_bytes'], results[f'{name}_bytes_float32']
+            print(f"{label}: {full / 1e6:.2f} MB -> {reduced / 1e6:.2f} MB ({1 - reduced / full:.1%} saved)")
+    print(f"Max Prediction Drift: {results['max_drift']:.2e}")
+    print(f"Mean Prediction Drift: {results['mean_drift']:.2e}")
+    print(f"Changed Decisions: {results['decision_changes']}")
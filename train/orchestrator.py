@@ -0,0 +1,142 @@
+# train/orchestrator.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from joblib import dump, load
+from config import ML_MODEL_CONFIG, EVALUATION_CONFIG
+from train.data_generation import generate_synthetic_data
+from train.model_evaluation import (evaluate_model, print_evaluation_results, evaluate_precision, print_precision_results,
+                                    measure_throughput, print_throughput_results)
+from train.feature_cache import prepare_features, dataset_key
+from train.train_baseline_model import feature_metadata, create_classifier, category_vocabularies, trainable_models
+from models.schema import apply_schema
+
+def load_dataset(data=None, seed: Optional[int] = None) -> pd.DataFrame:
+    """data is a DataFrame, a directory of shards (train/shards.py) or None
+    for a freshly generated synthetic dataset."""
+    if data is None:
+        return generate_synthetic_data(seed=seed)
+    if isinstance(data, str):
+        from train.shards import read_shards
+        df = pd.concat(read_shards(data), ignore_index=True)
+        # Shards with different category lists concatenate to object columns
+        for column in df.select_dtypes(include=['object']).columns:
+            df[column] = df[column].astype('category')
+        return df
+    return data
+
+def thread_budgets(model_names: List[str], n_cores: Optional[int] = None) -> Dict[str, int]:
+    # Split the cores evenly between the models, remainder to the first ones
+    n_cores = n_cores or os.cpu_count() or 1
+    share, remainder = divmod(n_cores, len(model_names))
+    return {name: max(1, share + (i < remainder)) for i, name in enumerate(model_names)}
+
+def fit_classifier(model_name: str, data_path: str, n_threads: int, X_sample: pd.DataFrame, encoding: str = 'onehot'):
+    """Fit one configured model on the shared encoded training data. Runs
+    in a worker process; returns (classifier, training seconds)."""
+    from threadpoolctl import threadpool_limits
+
+    X_train, y_train = load(data_path, mmap_mode='r')
+    model = create_classifier(ML_MODEL_CONFIG[model_name]['type'], X_sample, encoding)
+    if 'n_jobs' in model.get_params():
+        # Random forest workers and xgboost threads
+        model.set_params(n_jobs=n_threads)
+    start = time.perf_counter()
+    # BLAS threads (the neural network's matrix products) get the same budget
+    with threadpool_limits(limits=n_threads):
+        model.fit(X_train, y_train)
+    return model, time.perf_counter() - start
+
+def train_all_models(model_names: Optional[List[str]] = None, dtype: str = 'float64', data=None,
+                     n_cores: Optional[int] = None, test_size: float = 0.2, random_state: int = 42,
+                     seed: Optional[int] = None, use_cache: Optional[bool] = None,
+                     encoding: str = 'onehot') -> Dict[str, Dict]:
+    """Train and save every configured model from one dataset.
+
+    The data is loaded and split once and the preprocessor is fitted and
+    applied once, or loaded from the feature cache (train/feature_cache.py)
+    on repeat runs; the encoded training matrix is shared with the worker
+    processes through a memory-mapped file. Models are trained concurrently,
+    each limited to its share of n_cores threads, so the total wall-clock
+    time is close to that of the slowest model.
+
+    Without data, a synthetic dataset is generated from seed; it is only
+    cached when seed is given. With encoding='ordinal' only the tree models
+    are trained by default (see train_baseline_model.ORDINAL_MODEL_TYPES).
+    """
+    model_names = list(model_names or trainable_models(encoding))
+    start = time.perf_counter()
+    df = load_dataset(data, seed)
+    if data is None and seed is None:
+        use_cache = False
+    # Shard directories are identified by their manifest, frames by content
+    features = prepare_features(df, dtype, test_size, random_state,
+                                dataset_id=dataset_key(data) if isinstance(data, str) else None,
+                                use_cache=use_cache, encoding=encoding)
+    preprocessor = features['preprocessor']
+    encoded_test, y_test = features['encoded_test'], features['y_test']
+    X = df.drop('outcome', axis=1)
+    print(f"{'Loaded' if features['cache_hit'] else 'Prepared'} {len(features['y_train'])} training rows "
+          f"({features['encoded_train'].shape[1]} encoded columns) in {time.perf_counter() - start:.1f}s")
+
+    # Test rows the saved models are timed on through MLModel
+    n_timed = EVALUATION_CONFIG['batch_size'] * EVALUATION_CONFIG['latency_batches']
+    X_timed = apply_schema(X.loc[features['test_index'][:n_timed]], float_dtype=dtype)
+
+    budgets = thread_budgets(model_names, n_cores)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = features['train_path']
+        if data_path is None:
+            data_path = os.path.join(tmp_dir, 'train.joblib')
+            dump((features['encoded_train'], features['y_train']), data_path)
+        n_workers = min(len(model_names), n_cores or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            # Column kinds as the preprocessor saw them (xgboost's feature types)
+            X_sample = apply_schema(X.head(0), float_dtype=dtype)
+            futures = {name: executor.submit(fit_classifier, name, data_path, budgets[name], X_sample, encoding)
+                       for name in model_names}
+            for name, future in futures.items():
+                classifier, seconds = future.result()
+                pipeline = Pipeline([
+                    ('preprocessor', preprocessor),
+                    ('model', classifier)
+                ])
+                path = ML_MODEL_CONFIG[name]['path']
+                dump({'pipeline': pipeline, **feature_metadata(X), 'dtype': dtype, 'encoding': encoding,
+                      'categories': category_vocabularies(preprocessor)}, path)
+
+                print(f"Trained {name} model in {seconds:.1f}s with {budgets[name]} thread(s)")
+                evaluation = evaluate_model(classifier, encoded_test, y_test)
+                print_evaluation_results(evaluation)
+                throughput = measure_throughput(path, X_timed)
+                print_throughput_results(throughput)
+                print(f"Model saved to {path}")
+                if dtype != 'float64':
+                    X_reference = df.drop('outcome', axis=1).loc[features['test_index']]
+                    print_precision_results(evaluate_precision(path, X_reference))
+                results[name] = {'training_seconds': seconds, 'n_threads': budgets[name], **evaluation,
+                                 'throughput': throughput}
+
+    wall_clock = time.perf_counter() - start
+    print(f"Trained {len(model_names)} models in {wall_clock:.1f}s "
+          f"(slowest model {max(r['training_seconds'] for r in results.values()):.1f}s)")
+    return results
+
+if __name__ == "__main__":
+    # Optional shard directory to train on (see train/shards.py)
+    dtype = 'float32' if '--float32' in sys.argv else 'float64'
+    encoding = 'ordinal' if '--ordinal' in sys.argv else 'onehot'
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    train_all_models(dtype=dtype, data=args[0] if args else None, encoding=encoding)
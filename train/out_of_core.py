@@ -0,0 +1,226 @@
+# train/out_of_core.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import time
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from joblib import dump
+from config import ML_MODEL_CONFIG, OUT_OF_CORE_CONFIG
+from train.shards import load_manifest, read_shard
+from train.train_baseline_model import (feature_columns, feature_metadata, create_categorical_encoder,
+                                         create_classifier, category_vocabularies, trainable_models)
+from models.schema import apply_schema
+from train.utils import create_model
+
+# Training on a directory of shards (train/shards.py) one shard at a time,
+# so memory use depends on the shard size and not on the dataset size.
+# Every shard is split row by row into training and test rows with a seed
+# derived from the shard index, so each pass sees the same split.
+
+def shard_categories(manifest: Dict) -> Dict[str, List[str]]:
+    # Union of each categorical column's categories over all shards
+    categories = {}
+    schemas = [manifest['schema']] + [shard['schema'] for shard in manifest['shards'] if 'schema' in shard]
+    for schema in schemas:
+        for entry in schema:
+            if entry['dtype'] == 'category':
+                categories.setdefault(entry['name'], set()).update(entry['categories'])
+    return {name: sorted(values) for name, values in categories.items()}
+
+class ShardReader:
+    """Training or test rows of each shard in data_dir, as feature frames
+    and labels."""
+
+    def __init__(self, data_dir: str, dtype: str = 'float64', test_size: float = 0.2, random_state: int = 42):
+        self.data_dir = data_dir
+        self.manifest = load_manifest(data_dir)
+        self.dtype = dtype
+        self.test_size = test_size
+        self.random_state = random_state
+
+    def __len__(self) -> int:
+        return len(self.manifest['shards'])
+
+    def read(self, index: int, part: str = 'train') -> Tuple[pd.DataFrame, np.ndarray]:
+        shard = self.manifest['shards'][index]
+        df = read_shard(os.path.join(self.data_dir, shard['path']), self.manifest, schema=shard.get('schema'))
+        is_test = np.random.default_rng([self.random_state, index]).random(len(df)) < self.test_size
+        df = df[is_test if part == 'test' else ~is_test]
+        X = df.drop('outcome', axis=1)
+        X = apply_schema(X, float_dtype=self.dtype)
+        return X, df['outcome'].values
+
+    def iter_shards(self, part: str = 'train', order: Optional[List[int]] = None) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+        for index in (range(len(self)) if order is None else order):
+            X, y = self.read(index, part)
+            if len(y):
+                yield X, y
+
+def fit_preprocessor(reader: ShardReader, encoding: str = 'onehot') -> ColumnTransformer:
+    """The preprocessor of train_baseline_model.create_preprocessor, fitted
+    in one pass over the training rows: the scaler accumulates its mean and
+    variance shard by shard and the categories come from the manifest."""
+    X_first, _ = next(reader.iter_shards())
+    numeric_features, categorical_features, boolean_features = feature_columns(X_first)
+    scaler = StandardScaler()
+    has_missing = set()
+    for X, _ in reader.iter_shards():
+        scaler.partial_fit(X[numeric_features])
+        has_missing.update(c for c in categorical_features if X[c].isna().any())
+
+    # Missing values are a category of their own (last), as when the
+    # encoder finds the categories itself
+    categories = {c: values + [np.nan] if c in has_missing else values
+                  for c, values in shard_categories(reader.manifest).items()}
+    preprocessor = ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), numeric_features),
+            ('cat', create_categorical_encoder(reader.dtype, encoding, [categories[c] for c in categorical_features]),
+             categorical_features),
+            ('bool', 'passthrough', boolean_features)
+        ])
+    # Fitting on one shard sets up the column bookkeeping; the scaler is
+    # then replaced by the one fitted on every shard
+    preprocessor.fit(X_first)
+    preprocessor.transformers_[0] = ('num', scaler, numeric_features)
+    return preprocessor
+
+def fit_xgboost(reader: ShardReader, preprocessor: ColumnTransformer, classifier):
+    # External-memory DMatrix: xgboost pulls the shards through the
+    # iterator and pages its quantized copy to a cache on disk
+    import xgboost as xgb
+
+    class EncodedShards(xgb.DataIter):
+        def __init__(self, cache_prefix):
+            self._iterator = None
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._iterator is None:
+                self._iterator = reader.iter_shards()
+            batch = next(self._iterator, None)
+            if batch is None:
+                return 0
+            X, y = batch
+            input_data(data=preprocessor.transform(X), label=y, feature_types=classifier.feature_types)
+            return 1
+
+        def reset(self):
+            self._iterator = None
+
+    params = {k: v for k, v in classifier.get_xgb_params().items() if v is not None}
+    params['tree_method'] = 'hist'
+    with tempfile.TemporaryDirectory() as cache_dir:
+        dtrain = xgb.DMatrix(EncodedShards(os.path.join(cache_dir, 'dtrain')),
+                             enable_categorical=classifier.enable_categorical)
+        booster = xgb.train(params, dtrain, num_boost_round=classifier.n_estimators)
+    # Loading the trained booster gives a regular fitted XGBClassifier
+    classifier.load_model(booster.save_raw(raw_format='json'))
+    return classifier
+
+def fit_neural_network(reader: ShardReader, preprocessor: ColumnTransformer, epochs: int, random_state: int):
+    classifier = create_model('neural_network')
+    # partial_fit has no validation split to stop early on
+    classifier.set_params(early_stopping=False)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        for X, y in reader.iter_shards(order=list(rng.permutation(len(reader)))):
+            classifier.partial_fit(preprocessor.transform(X), y, classes=[0, 1])
+    return classifier
+
+def fit_random_forest(reader: ShardReader, preprocessor: ColumnTransformer, random_state: int):
+    # One small forest per shard, merged into a forest of about the
+    # configured size
+    classifier = create_model('random_forest')
+    trees_per_shard = max(1, int(np.ceil(classifier.n_estimators / len(reader))))
+    estimators = []
+    for index, (X, y) in enumerate(reader.iter_shards()):
+        if len(np.unique(y)) < 2:
+            continue
+        forest = create_model('random_forest').set_params(n_estimators=trees_per_shard,
+                                                          random_state=random_state + index)
+        forest.fit(preprocessor.transform(X), y)
+        if not estimators:
+            classifier = forest
+        estimators.extend(forest.estimators_)
+    if not estimators:
+        raise ValueError(f"No random forest trees fitted: every shard in {reader.data_dir} holds a single class")
+    classifier.estimators_ = estimators
+    classifier.n_estimators = len(estimators)
+    return classifier
+
+def evaluate_streaming(classifier, reader: ShardReader, preprocessor: ColumnTransformer) -> Dict:
+    """train.model_evaluation.evaluate_model over the test rows of every
+    shard; only running sums are kept in memory."""
+    from train.model_evaluation import evaluate_probabilities
+
+    return evaluate_probabilities(classifier, ((preprocessor.transform(X), y)
+                                               for X, y in reader.iter_shards(part='test')))
+
+def train_from_shards(data_dir: str, model_names: Optional[List[str]] = None, dtype: str = 'float64',
+                      test_size: float = 0.2, random_state: int = 42, epochs: Optional[int] = None,
+                      encoding: str = 'onehot') -> Dict[str, Dict]:
+    """Train and save the configured models from a shard directory without
+    loading it into memory: xgboost through an external-memory DMatrix, the
+    neural network with partial_fit over epochs passes of the shards, and
+    random forests as one forest per shard merged together. Models are saved
+    in the same layout as train_baseline_model."""
+    from train.model_evaluation import print_evaluation_results, measure_throughput, print_throughput_results
+
+    model_names = list(model_names or trainable_models(encoding))
+    epochs = epochs or OUT_OF_CORE_CONFIG['epochs']
+    reader = ShardReader(data_dir, dtype, test_size, random_state)
+    start = time.perf_counter()
+    preprocessor = fit_preprocessor(reader, encoding)
+    X_sample, _ = reader.read(0)
+    print(f"Fitted preprocessor on {reader.manifest['n_rows']} rows in {len(reader)} shards "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    for name in model_names:
+        model_type = ML_MODEL_CONFIG[name]['type']
+        start = time.perf_counter()
+        if model_type == 'xgboost':
+            classifier = fit_xgboost(reader, preprocessor, create_classifier(model_type, X_sample, encoding))
+        elif model_type == 'neural_network':
+            classifier = fit_neural_network(reader, preprocessor, epochs, random_state)
+        elif model_type == 'random_forest':
+            classifier = fit_random_forest(reader, preprocessor, random_state)
+        else:
+            raise ValueError(f"Unsupported model type: {model_type}")
+        seconds = time.perf_counter() - start
+
+        pipeline = Pipeline([
+            ('preprocessor', preprocessor),
+            ('model', classifier)
+        ])
+        path = ML_MODEL_CONFIG[name]['path']
+        dump({'pipeline': pipeline, **feature_metadata(X_sample), 'dtype': dtype, 'encoding': encoding,
+              'categories': category_vocabularies(preprocessor)}, path)
+        print(f"Trained {name} model out of core in {seconds:.1f}s")
+        evaluation = evaluate_streaming(classifier, reader, preprocessor)
+        print_evaluation_results(evaluation)
+        # Timed on the first shard's test rows
+        throughput = measure_throughput(path, reader.read(0, part='test')[0])
+        print_throughput_results(throughput)
+        print(f"Model saved to {path}")
+        results[name] = {'training_seconds': seconds, **evaluation, 'throughput': throughput}
+    return results
+
+if __name__ == "__main__":
+    # Shard directory, then optional model names
+    dtype = 'float32' if '--float32' in sys.argv else 'float64'
+    encoding = 'ordinal' if '--ordinal' in sys.argv else 'onehot'
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    train_from_shards(args[0] if args else 'data/synthetic', args[1:] or None, dtype=dtype, encoding=encoding)
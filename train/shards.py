@@ -0,0 +1,122 @@
+# train/shards.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from config import DATA_GENERATION_CONFIG
+from train.data_generation import generate_synthetic_data, chunk_bounds, chunk_seeds
+
+MANIFEST_NAME = 'manifest.json'
+
+def column_schema(df: pd.DataFrame) -> List[Dict]:
+    schema = []
+    for column, dtype in df.dtypes.items():
+        entry = {'name': column, 'dtype': str(dtype)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            entry['categories'] = [str(c) for c in dtype.categories]
+        schema.append(entry)
+    return schema
+
+def write_shard(df: pd.DataFrame, path: str, shard_format: str):
+    if shard_format == 'npz':
+        # Categorical columns are stored as their integer codes
+        arrays = {column: (df[column].cat.codes.values if isinstance(df[column].dtype, pd.CategoricalDtype)
+                           else df[column].values) for column in df.columns}
+        np.savez_compressed(path, **arrays)
+    elif shard_format == 'parquet':
+        # Needs pyarrow (or fastparquet); pandas raises ImportError otherwise
+        df.to_parquet(path, compression='zstd', index=False)
+    else:
+        raise ValueError(f"Unsupported shard format: {shard_format}")
+
+def generate_shard(path: str, n_rows: int, seed, shard_format: str, generator: Callable) -> Dict:
+    """Generate one chunk and write it to path. Runs in a worker process."""
+    df = generator(n_rows, seed=seed)
+    write_shard(df, path, shard_format)
+    return {'path': os.path.basename(path), 'n_rows': len(df), 'bytes': os.path.getsize(path),
+            'schema': column_schema(df)}
+
+def write_shards(output_dir: Optional[str] = None, n_rows: int = 1000000, chunk_size: Optional[int] = None,
+                 seed: Optional[int] = None, shard_format: Optional[str] = None,
+                 n_jobs: Optional[int] = None, generator: Callable = generate_synthetic_data) -> Dict:
+    """Generate n_rows of synthetic data as shards of chunk_size rows.
+
+    Shards are written in parallel by n_jobs processes, each holding one
+    chunk at a time, so peak memory is bounded by chunk_size per process
+    whatever n_rows is. Returns the manifest, which is also saved as
+    manifest.json in output_dir.
+
+    generator(n, seed=...) makes each chunk; n_rows and chunk_size are in
+    its units (matches for generate_simulation_data, which returns a
+    variable number of rows per match).
+    """
+    output_dir = output_dir or DATA_GENERATION_CONFIG['data_dir']
+    chunk_size = chunk_size or DATA_GENERATION_CONFIG['chunk_size']
+    shard_format = shard_format or DATA_GENERATION_CONFIG['shard_format']
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    seed_sequence = np.random.SeedSequence(seed)
+    bounds = chunk_bounds(n_rows, chunk_size)
+    seeds = chunk_seeds(n_rows, chunk_size, seed_sequence.entropy)
+    extension = 'npz' if shard_format == 'npz' else 'parquet'
+    paths = [os.path.join(output_dir, f"shard_{i:05d}.{extension}") for i in range(len(bounds))]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        shards = list(executor.map(generate_shard, paths, [stop - begin for begin, stop in bounds],
+                                   seeds, [shard_format] * len(bounds), [generator] * len(bounds)))
+
+    # Every shard has the same columns, but category lists can differ
+    # between shards when the generator has open-ended categories
+    schema = shards[0]['schema'] if shards else []
+    manifest = {
+        'format': shard_format,
+        'generator': f"{generator.__module__}.{generator.__name__}",
+        'n_rows': sum(shard['n_rows'] for shard in shards),
+        'chunk_size': chunk_size,
+        'seed': seed_sequence.entropy,
+        'schema': schema,
+        'shards': [{k: v for k, v in shard.items() if k != 'schema' or v != schema} for shard in shards]
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Wrote {manifest['n_rows']} rows in {len(shards)} shards to {output_dir} in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+def load_manifest(data_dir: str) -> Dict:
+    with open(os.path.join(data_dir, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+def read_shard(path: str, manifest: Dict, columns: Optional[List[str]] = None,
+               schema: Optional[List[Dict]] = None) -> pd.DataFrame:
+    schema = [entry for entry in (schema or manifest['schema']) if columns is None or entry['name'] in columns]
+    if manifest['format'] == 'parquet':
+        return pd.read_parquet(path, columns=[entry['name'] for entry in schema])
+    with np.load(path) as arrays:
+        data = {}
+        for entry in schema:
+            values = arrays[entry['name']]
+            if entry['dtype'] == 'category':
+                values = pd.Categorical.from_codes(values, categories=entry['categories'])
+            data[entry['name']] = values
+    return pd.DataFrame(data)
+
+def read_shards(data_dir: str, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Yield the shards in data_dir one DataFrame at a time."""
+    manifest = load_manifest(data_dir)
+    for shard in manifest['shards']:
+        yield read_shard(os.path.join(data_dir, shard['path']), manifest, columns, shard.get('schema'))
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    write_shards(output_dir, n_rows)
@@ -0,0 +1,110 @@
+# train/simulation_data.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import random
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+from config import MATCH_FORMATS
+from models.schema import apply_schema
+from simulation.engine import SimulationEngine
+from simulation.match import Surface, Weather
+from simulation.match_formats import create_match_format
+from simulation.player import create_player, PlayerStats, ShotType, Weakness, TournamentResult, InjurySeverity
+from train.data_generation import PLAYER_COUNTRIES, EVENT_COUNTRIES
+
+BODY_PARTS = ['wrist', 'knee', 'elbow', 'shoulder', 'ankle', 'back']
+SHOT_PREFERENCES = {
+    ShotType.FOREHAND: 0.4,
+    ShotType.BACKHAND: 0.3,
+    ShotType.SLICE_FOREHAND: 0.1,
+    ShotType.SLICE_BACKHAND: 0.1,
+    ShotType.VOLLEY_FOREHAND: 0.05,
+    ShotType.VOLLEY_BACKHAND: 0.03,
+    ShotType.SMASH: 0.02
+}
+
+def random_injuries(rng: np.random.Generator, p_injured: float) -> dict:
+    if rng.random() >= p_injured:
+        return {}
+    severity = rng.choice([InjurySeverity.MINOR, InjurySeverity.MODERATE, InjurySeverity.SEVERE], p=[0.7, 0.25, 0.05])
+    return {str(rng.choice(BODY_PARTS)): severity}
+
+def random_player(rng: np.random.Generator, name: str, opponent: str) -> PlayerStats:
+    skills = list(rng.permutation(list(Weakness)))
+    return create_player(
+        name=name,
+        country=str(rng.choice(PLAYER_COUNTRIES)),
+        stats={
+            'serve_accuracy': rng.uniform(0.5, 0.8),
+            'groundstroke_accuracy': rng.uniform(0.6, 0.9),
+            'volley_accuracy': rng.uniform(0.55, 0.85),
+            'speed': rng.uniform(70, 100),
+            'stamina': rng.uniform(70, 100),
+            'mental_strength': rng.uniform(70, 100)
+        },
+        preferences=SHOT_PREFERENCES,
+        atp_rank=int(rng.integers(1, 200)),
+        previous_atp_rank=int(rng.integers(1, 200)),
+        weaknesses=skills[:1],
+        strengths=skills[1:1 + int(rng.integers(1, 3))],
+        previous_tournament_results=list(rng.choice(list(TournamentResult), size=3)),
+        current_injuries=random_injuries(rng, 0.3),
+        previous_injuries=random_injuries(rng, 0.5),
+        wins_vs_opponents={opponent: int(rng.integers(0, 10))}
+    )
+
+def simulate_match_rows(rng: np.random.Generator) -> List[dict]:
+    """Play one random match headless and return the state at the start of
+    every point, labelled with the match winner (1 if player 1 won)."""
+    player1 = random_player(rng, 'Player1', 'Player2')
+    player2 = random_player(rng, 'Player2', 'Player1')
+    is_indoor = bool(rng.random() < 0.2)
+    engine = SimulationEngine(
+        player1,
+        player2,
+        create_match_format(str(rng.choice(list(MATCH_FORMATS)))),
+        rng.choice(list(Surface)),
+        is_indoor,
+        rng.choice([w for w in Weather if w != Weather.INDOOR]),
+        str(rng.choice(EVENT_COUNTRIES)),
+        ml_model=None,
+        odds_calculator=None,
+        verbose=False,
+        record_points=True
+    )
+    engine.run_simulation()
+    outcome = 1 if engine.match.get_winner_index() == 0 else 0
+    return [dict(state, outcome=outcome) for state in engine.point_states]
+
+def generate_simulation_data(n_matches: int = 1000, seed: Optional[int] = None) -> pd.DataFrame:
+    """Point-level training rows from n_matches simulated matches.
+
+    Columns are exactly Match.get_current_state plus outcome, in their
+    models.schema dtypes. The simulation draws its events
+    from the random module, which is seeded from seed for the duration of
+    the call and then restored.
+    """
+    rng = np.random.default_rng(seed)
+    random_state = random.getstate()
+    random.seed(int(rng.integers(2 ** 63)))
+    try:
+        rows = [row for _ in range(n_matches) for row in simulate_match_rows(rng)]
+    finally:
+        random.setstate(random_state)
+
+    return apply_schema(pd.DataFrame(rows))
+
+if __name__ == "__main__":
+    from train.shards import write_shards
+
+    # Matches to simulate, then output directory
+    n_matches = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else 'data/simulation'
+    write_shards(output_dir, n_matches, chunk_size=500, generator=generate_simulation_data)
@@ -10,16 +10,81 @@ sys.path.insert(0, project_root)
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from joblib import dump
 from config import ML_MODEL_CONFIG
 from train.data_generation import generate_synthetic_data
-from train.model_evaluation import evaluate_model, print_evaluation_results
+from train.model_evaluation import (evaluate_model, print_evaluation_results, evaluate_precision, print_precision_results,
+                                    measure_throughput, print_throughput_results)
+from models.schema import apply_schema
 from train.utils import create_model
 
-def train_model(model_name):
+def feature_columns(X):
+    # Numeric, categorical and boolean columns, as the preprocessor splits them
+    return (X.select_dtypes(include=['number']).columns,
+            X.select_dtypes(include=['category']).columns,
+            X.select_dtypes(include=['bool']).columns)
+
+# Model types that can split on ordinal category codes
+ORDINAL_MODEL_TYPES = ('random_forest', 'xgboost')
+
+def trainable_models(encoding='onehot'):
+    # Configured models that can be trained with encoding
+    return [name for name, config in ML_MODEL_CONFIG.items()
+            if encoding != 'ordinal' or config['type'] in ORDINAL_MODEL_TYPES]
+
+def create_categorical_encoder(dtype='float64', encoding='onehot', categories='auto'):
+    if encoding == 'onehot':
+        return OneHotEncoder(categories=categories, handle_unknown='ignore', dtype=np.dtype(dtype))
+    elif encoding == 'ordinal':
+        # One column of integer codes per feature; missing and unseen
+        # categories are NaN, which both tree models route as missing
+        return OrdinalEncoder(categories=categories, handle_unknown='use_encoded_value', unknown_value=np.nan,
+                              dtype=np.dtype(dtype))
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def create_preprocessor(X, dtype='float64', encoding='onehot'):
+    numeric_features, categorical_features, boolean_features = feature_columns(X)
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), numeric_features),
+            ('cat', create_categorical_encoder(dtype, encoding), categorical_features),
+            ('bool', 'passthrough', boolean_features)
+        ])
+
+def create_classifier(model_type, X, encoding='onehot'):
+    """create_model, with xgboost set up to split natively on the ordinal
+    category codes."""
+    if encoding == 'ordinal' and model_type not in ORDINAL_MODEL_TYPES:
+        raise ValueError(f"Ordinal encoding is not supported for {model_type} models")
+    model = create_model(model_type)
+    if encoding == 'ordinal' and model_type == 'xgboost':
+        numeric_features, categorical_features, boolean_features = feature_columns(X)
+        feature_types = ['q'] * len(numeric_features) + ['c'] * len(categorical_features) + ['q'] * len(boolean_features)
+        model.set_params(enable_categorical=True, feature_types=feature_types, tree_method='hist')
+    return model
+
+def category_vocabularies(preprocessor):
+    # Categories of each categorical feature, in the fitted encoder's order
+    encoder = preprocessor.named_transformers_['cat']
+    columns = next(columns for name, _, columns in preprocessor.transformers_ if name == 'cat')
+    return {feature: [str(c) for c in categories] for feature, categories in zip(columns, encoder.categories_)}
+
+def feature_metadata(X):
+    numeric_features, categorical_features, boolean_features = feature_columns(X)
+    return {
+        'feature_names': X.columns.tolist(),
+        'numeric_features': numeric_features.tolist(),
+        'categorical_features': categorical_features.tolist(),
+        'boolean_features': boolean_features.tolist()
+    }
+
+def train_model(model_name, dtype='float64', encoding='onehot'):
+    """Train and save a model. With dtype='float32' the features are
+    stored, encoded and served in float32. With encoding='ordinal' the
+    categorical features are integer codes instead of one-hot columns."""
     print(f"Training {model_name} model...")
     model_config = ML_MODEL_CONFIG[model_name]
     
@@ -29,22 +94,13 @@ def train_model(model_name):
     # Split features and target
     X = df.drop('outcome', axis=1)
     y = df['outcome']
-    
-    # Identify numeric, categorical, and boolean columns
-    numeric_features = X.select_dtypes(include=['int64', 'float64']).columns
-    categorical_features = X.select_dtypes(include=['category']).columns
-    boolean_features = X.select_dtypes(include=['bool']).columns
+    X = apply_schema(X, float_dtype=dtype)
     
     # Create preprocessor
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numeric_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features),
-            ('bool', 'passthrough', boolean_features)
-        ])
+    preprocessor = create_preprocessor(X, dtype, encoding)
     
     # Create model
-    model = create_model(model_config['type'])
+    model = create_classifier(model_config['type'], X, encoding)
     
     # Create pipeline
     pipeline = Pipeline([
@@ -65,14 +121,24 @@ def train_model(model_name):
     # Save the model
     model_data = {
         'pipeline': pipeline,
-        'feature_names': X.columns.tolist(),
-        'numeric_features': numeric_features.tolist(),
-        'categorical_features': categorical_features.tolist(),
-        'boolean_features': boolean_features.tolist()
+        **feature_metadata(X),
+        'dtype': dtype,
+        'encoding': encoding,
+        'categories': category_vocabularies(preprocessor)
     }
     dump(model_data, model_config['path'])
     print(f"Model saved to {model_config['path']}")
+    print_throughput_results(measure_throughput(model_config['path'], X_test))
+
+    if dtype != 'float64':
+        X_reference = df.drop('outcome', axis=1).loc[X_test.index]
+        print_precision_results(evaluate_precision(model_config['path'], X_reference))
 
 if __name__ == "__main__":
-    for model_name in ML_MODEL_CONFIG.keys():
-        train_model(model_name)
\ No newline at end of file
+    from train.orchestrator import train_all_models
+
+    # All models share one dataset and one fitted preprocessor and are
+    # trained concurrently; see train/orchestrator.py
+    dtype = 'float32' if '--float32' in sys.argv else 'float64'
+    encoding = 'ordinal' if '--ordinal' in sys.argv else 'onehot'
+    train_all_models(dtype=dtype, encoding=encoding)
\ No newline at end of file
@@ -0,0 +1,244 @@
+# train/tuning.py
+
+import sys
+import os
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+import numpy as np
+from joblib import dump, load
+from config import TUNING_CONFIG
+from train.utils import create_model
+
+def search_space(model_type: str) -> Dict:
+    """Parameter distributions for the classifier step of each model type."""
+    from scipy.stats import loguniform, uniform
+
+    if model_type == 'random_forest':
+        return {
+            'n_estimators': [50, 100, 200, 400],
+            'max_depth': [None, 8, 16, 32],
+            'min_samples_leaf': [1, 2, 5, 10],
+            'max_features': ['sqrt', 'log2', 0.3]
+        }
+    elif model_type == 'neural_network':
+        return {
+            'hidden_layer_sizes': [(50,), (100,), (50, 50), (100, 50)],
+            'alpha': loguniform(3e-4, 3e-2),
+            'learning_rate_init': loguniform(3e-4, 3e-2)
+        }
+    elif model_type == 'xgboost':
+        # n_estimators is an upper bound; rounds stop early on the fold
+        return {
+            'n_estimators': [200, 400],
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_depth': [3, 4, 5, 6, 8],
+            'subsample': uniform(0.6, 0.4),
+            'colsample_bytree': uniform(0.6, 0.4),
+            'min_child_weight': [1, 3, 5]
+        }
+    raise ValueError(f"Unsupported model type: {model_type}")
+
+def to_json(params: Dict) -> Dict:
+    return {k: (list(v) if isinstance(v, tuple) else v.item() if isinstance(v, np.generic) else v)
+            for k, v in params.items()}
+
+def from_json(params: Dict) -> Dict:
+    # JSON turns tuples (hidden_layer_sizes) into lists
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in params.items()}
+
+def resource_schedule(n_samples: int, n_candidates: int, factor: int, min_resources: int) -> List[int]:
+    # Training rows per round, growing by factor until every row is used
+    # or a single candidate is left
+    resources = []
+    resource = min(min_resources, n_samples)
+    while True:
+        resources.append(resource)
+        n_candidates = int(np.ceil(n_candidates / factor))
+        if resource >= n_samples or n_candidates <= 1:
+            break
+        resource = min(resource * factor, n_samples)
+    resources[-1] = n_samples
+    return resources
+
+_DATA = {}
+
+def evaluate_candidate(model_type: str, params: Dict, data_path: str, folds_path: str, fold: int, n_rows: int) -> float:
+    """Validation log-loss of one candidate on one fold, trained on n_rows
+    of the fold's training rows. Runs in a worker process."""
+    from threadpoolctl import threadpool_limits
+    from sklearn.metrics import log_loss
+
+    if data_path not in _DATA:
+        _DATA.clear()
+        _DATA[data_path] = load(data_path, mmap_mode='r')
+    X, y = _DATA[data_path]
+    with np.load(folds_path) as folds:
+        train_rows = folds[f'train_{fold}'][:n_rows]
+        valid_rows = folds[f'valid_{fold}']
+
+    model = create_model(model_type).set_params(**from_json(params))
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    fit_params = {}
+    if model_type == 'xgboost':
+        # The stopping round is picked on training rows held out of the fit,
+        # never on the fold the candidate is scored on
+        n_stopping = max(1, int(len(train_rows) * TUNING_CONFIG['early_stopping_fraction']))
+        train_rows, stopping_rows = train_rows[:-n_stopping], train_rows[-n_stopping:]
+        model.set_params(early_stopping_rounds=TUNING_CONFIG['early_stopping_rounds'])
+        fit_params = {'eval_set': [(X[stopping_rows], y[stopping_rows])], 'verbose': False}
+    with threadpool_limits(limits=1):
+        model.fit(X[train_rows], y[train_rows], **fit_params)
+        return float(log_loss(y[valid_rows], model.predict_proba(X[valid_rows])[:, 1], labels=[0, 1]))
+
+class SuccessiveHalvingSearch:
+    """Random search with successive halving over a model type's space.
+
+    Every candidate is scored on cv folds with a small number of training
+    rows; the best 1/factor go on to the next round with factor times more
+    rows, until the full training set. Fold tasks run in parallel across
+    n_jobs processes on the memory-mapped encoded data, and each finished
+    task is saved to state_dir, so a search that is interrupted resumes
+    where it stopped when started again with the same arguments.
+    """
+
+    def __init__(self, model_type: str, data_path: str, state_dir: str, n_candidates: Optional[int] = None,
+                 factor: Optional[int] = None, cv: Optional[int] = None, min_resources: Optional[int] = None,
+                 n_jobs: Optional[int] = None, random_state: int = 42):
+        self.model_type = model_type
+        self.data_path = data_path
+        self.state_dir = state_dir
+        self.n_candidates = n_candidates or TUNING_CONFIG['n_candidates']
+        self.factor = factor or TUNING_CONFIG['factor']
+        self.cv = cv or TUNING_CONFIG['cv']
+        self.min_resources = min_resources or TUNING_CONFIG['min_resources']
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.random_state = random_state
+        self.state_path = os.path.join(state_dir, 'state.json')
+        self.folds_path = os.path.join(state_dir, 'folds.npz')
+        os.makedirs(state_dir, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+
+        from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+        # Folds are computed once and reused by every candidate and round
+        _, y = load(self.data_path, mmap_mode='r')
+        rng = np.random.default_rng(self.random_state)
+        folds = {}
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        for fold, (train_rows, valid_rows) in enumerate(splitter.split(np.zeros(len(y)), y)):
+            # Shuffled, so the first n rows are a random subsample
+            folds[f'train_{fold}'] = rng.permutation(train_rows)
+            folds[f'valid_{fold}'] = valid_rows
+        np.savez(self.folds_path, **folds)
+
+        candidates = ParameterSampler(search_space(self.model_type), self.n_candidates, random_state=self.random_state)
+        n_train = min(len(folds[f'train_{fold}']) for fold in range(self.cv))
+        state = {
+            'model_type': self.model_type,
+            'candidates': [to_json(params) for params in candidates],
+            'resources': resource_schedule(n_train, self.n_candidates, self.factor, self.min_resources),
+            'scores': {}
+        }
+        self._save_state(state)
+        return state
+
+    def _save_state(self, state: Dict):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _round_scores(self, round_index: int, candidates: List[int]) -> Dict[int, float]:
+        scores = self.state['scores']
+        return {c: float(np.mean([scores[f'{round_index}:{c}:{fold}'] for fold in range(self.cv)])) for c in candidates}
+
+    def run(self) -> Dict:
+        start = time.perf_counter()
+        candidates = list(range(len(self.state['candidates'])))
+        history = []
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            for round_index, n_rows in enumerate(self.state['resources']):
+                tasks = [(c, fold) for c in candidates for fold in range(self.cv)
+                         if f'{round_index}:{c}:{fold}' not in self.state['scores']]
+                futures = {executor.submit(evaluate_candidate, self.model_type, self.state['candidates'][c],
+                                           self.data_path, self.folds_path, fold, n_rows): (c, fold)
+                           for c, fold in tasks}
+                for future in as_completed(futures):
+                    c, fold = futures[future]
+                    self.state['scores'][f'{round_index}:{c}:{fold}'] = future.result()
+                    self._save_state(self.state)
+
+                scores = self._round_scores(round_index, candidates)
+                history.append({'round': round_index, 'n_rows': n_rows, 'n_candidates': len(candidates),
+                                'best_log_loss': min(scores.values())})
+                print(f"Round {round_index}: {len(candidates)} candidates on {n_rows} rows, "
+                      f"best log-loss {min(scores.values()):.4f}")
+                if round_index < len(self.state['resources']) - 1:
+                    n_keep = max(1, int(np.ceil(len(candidates) / self.factor)))
+                    candidates = sorted(candidates, key=scores.get)[:n_keep]
+
+        best = min(candidates, key=scores.get)
+        result = {
+            'model_type': self.model_type,
+            'best_params': from_json(self.state['candidates'][best]),
+            'best_log_loss': scores[best],
+            'rounds': history,
+            'seconds': time.perf_counter() - start
+        }
+        self.state['best_params'] = self.state['candidates'][best]
+        self.state['best_log_loss'] = scores[best]
+        self._save_state(self.state)
+        return result
+
+def tune_model(model_type: str, data=None, dtype: str = 'float64', state_dir: Optional[str] = None,
+               seed: Optional[int] = None, use_cache: Optional[bool] = None, **search_params) -> Dict:
+    """Tune one model type on the encoded training split of data (see
+    train.orchestrator.load_dataset). Encoded features come from the feature
+    cache, so repeat searches skip preprocessing."""
+    from train.orchestrator import load_dataset
+    from train.feature_cache import prepare_features, dataset_key
+
+    df = load_dataset(data, seed)
+    features = prepare_features(df, dtype, dataset_id=dataset_key(data) if isinstance(data, str) else None,
+                                use_cache=use_cache)
+    data_path = features['train_path']
+    if data_path is None:
+        data_path = os.path.join(state_dir or TUNING_CONFIG['state_dir'], f'train_{dataset_key(df)[:16]}_{dtype}.joblib')
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        dump((features['encoded_train'], features['y_train']), data_path)
+
+    settings = {k: search_params.get(k) for k in ('n_candidates', 'factor', 'cv', 'min_resources', 'random_state')}
+    key = hashlib.sha256(json.dumps([model_type, os.path.abspath(data_path), settings]).encode()).hexdigest()[:16]
+    search = SuccessiveHalvingSearch(model_type, data_path,
+                                     os.path.join(state_dir or TUNING_CONFIG['state_dir'], f'{model_type}_{key}'),
+                                     **search_params)
+    return search.run()
+
+def print_tuning_results(result: Dict):
+    print(f"Tuning Results ({result['model_type']}):")
+    print(f"Best Parameters: {result['best_params']}")
+    print(f"Best Log-Loss: {result['best_log_loss']:.4f}")
+    print(f"Search Time: {result['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    from config import ML_MODEL_CONFIG
+
+    # Model names to tune (all by default), optionally --data=<shard dir>
+    data = next((arg.split('=', 1)[1] for arg in sys.argv[1:] if arg.startswith('--data=')), None)
+    names = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or list(ML_MODEL_CONFIG)
+    for name in names:
+        print_tuning_results(tune_model(ML_MODEL_CONFIG[name]['type'], data=data, seed=TUNING_CONFIG['seed']))
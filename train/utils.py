@@ -1,26 +1,32 @@
 # train/utils.py
 
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neural_network import MLPClassifier
-from sklearn.model_selection import RandomizedSearchCV
-from scipy.stats import reciprocal, uniform
-from xgboost import XGBClassifier
 from config import ML_MODEL_CONFIG
 
+# xgboost and scipy are only needed by some model types and by tuning, so
+# they are imported where they are used rather than at module import time.
+
 def create_model(model_type):
     if model_type == 'random_forest':
         return RandomForestClassifier(n_estimators=100, random_state=42)
     elif model_type == 'neural_network':
         return MLPClassifier(hidden_layer_sizes=(100, 50), max_iter=1000, random_state=42, early_stopping=True)
     elif model_type == 'xgboost':
+        from xgboost import XGBClassifier
         xgb_params = ML_MODEL_CONFIG['xgboost']['params']
         return XGBClassifier(random_state=42, **xgb_params)
     else:
         raise ValueError(f"Unsupported model type: {model_type}")
 
+def downcast_features(X):
+    """Return X with every column in its compact schema dtype (see
+    models/schema.py) and floats as float32."""
+    from models.schema import apply_schema
+    return apply_schema(X, float_dtype='float32')
+
 # You can keep the split_data function if you're using it elsewhere
 def split_data(X, y, test_size=0.2, random_state=42):
     from sklearn.model_selection import train_test_split
@@ -32,6 +38,7 @@ def create_pipeline(model_type):
     elif model_type == 'neural_network':
         model = MLPClassifier(hidden_layer_sizes=(100, 50), max_iter=1000, random_state=42, early_stopping=True)
     elif model_type == 'xgboost':
+        from xgboost import XGBClassifier
         xgb_params = ML_MODEL_CONFIG['xgboost']['params']
         model = XGBClassifier(random_state=42, **xgb_params)
 
@@ -44,15 +51,18 @@ def create_pipeline(model_type):
     ])
 
 def tune_neural_network(X_train, y_train):
-    param_distributions = {
-        'model__hidden_layer_sizes': [(50,), (100,), (50, 50), (100, 50)],
-        'model__alpha': reciprocal(3e-4, 3e-2),
-        'model__learning_rate_init': reciprocal(3e-4, 3e-2),
-    }
-    
-    model = create_pipeline('neural_network')
-    random_search = RandomizedSearchCV(model, param_distributions, n_iter=20, cv=5, random_state=42)
-    random_search.fit(X_train, y_train)
-    
-    print("Best parameters:", random_search.best_params_)
-    return random_search.best_estimator_
\ No newline at end of file
+    """Tune the neural network with train.tuning and return it refitted on
+    all of X_train with the best parameters."""
+    import pandas as pd
+    from train.tuning import tune_model
+    from train.train_baseline_model import create_preprocessor
+
+    df = X_train.assign(outcome=pd.Series(y_train, index=X_train.index).values)
+    result = tune_model('neural_network', data=df)
+    print("Best parameters:", result['best_params'])
+
+    model = Pipeline([
+        ('preprocessor', create_preprocessor(X_train)),
+        ('model', create_model('neural_network').set_params(**result['best_params']))
+    ])
+    return model.fit(X_train, y_train)